@@ -0,0 +1,67 @@
+"""Audio-bridge scheduling cost per event loop: asyncio vs uvloop.
+
+Same stand-ins as benchmarks/loop_modes.py (real AudioBridge, paced SIP
+frames and Ultravox audio, one process, one loop), run once per loop
+implementation while ramping the number of simultaneous calls.
+
+    python -m benchmarks.event_loops [--calls 25 50 100 200] [--seconds 5] [--cpu-budget 0.5]
+
+Per loop and call count it prints the mean and p99 frame lateness (the
+scheduling overhead each 20 ms frame pays before it is handled), CPU per
+frame and cores used; then the most calls each loop sustained within the
+CPU budget with p99 lateness under one frame.  uvloop rows are skipped
+when it is not installed.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+
+from benchmarks.loop_modes import FRAME_S, child
+
+
+def run_kind(kind: str, calls: int, seconds: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=child, args=(1, calls, seconds, results, kind))
+    proc.start()
+    part = results.get()
+    proc.join()
+
+    lateness = sorted(part["lateness"])
+    return {
+        "mean": sum(lateness) / len(lateness) * 1000,
+        "p99": lateness[min(len(lateness) - 1, int(0.99 * len(lateness)))] * 1000,
+        "cpu_per_frame_us": part["cpu"] / len(lateness) * 1e6,
+        "cores": part["cpu"] / part["wall"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--cpu-budget", type=float, default=0.5, help="cores")
+    args = parser.parse_args()
+
+    kinds = ["asyncio"]
+    try:
+        import uvloop  # noqa: F401
+        kinds.append("uvloop")
+    except ImportError:
+        print("uvloop not installed: asyncio only")
+
+    best = {kind: 0 for kind in kinds}
+    for calls in args.calls:
+        for kind in kinds:
+            r = run_kind(kind, calls, args.seconds)
+            print(f"{kind:<8} calls={calls:<4} meanLate={r['mean']:6.2f}ms p99Late={r['p99']:6.2f}ms "
+                  f"cpuPerFrame={r['cpu_per_frame_us']:6.1f}us cores={r['cores']:5.2f}")
+            if r["cores"] <= args.cpu_budget and r["p99"] <= FRAME_S * 1000:
+                best[kind] = max(best[kind], calls)
+    for kind in kinds:
+        print(f"{kind:<8} maxCalls@{args.cpu_budget:.2f}cores={best[kind]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Audio-bridge capacity: one event loop vs K loop shards vs K processes.
+
+Runs N simulated calls through the real AudioBridge (both directions) with
+local stand-ins: the SIP side delivers a 20 ms frame every 20 ms, the
+Ultravox side streams 20 ms of TTS audio every 20 ms.  Each mode runs in
+freshly spawned processes so memory numbers are not polluted by the
+parent:
+
+- single:  1 process, 1 loop (today's worker)
+- shards:  1 process, K loops in threads (EVENT_LOOP_SHARDS=K): the
+           worker's own ShardedProcessor places and dispatches every call
+- procs:   K processes, 1 loop each (WORKER_PROCESSES=K)
+
+    python -m benchmarks.loop_modes [--calls 20 60 120] [--k 4] [--seconds 10]
+
+Reports, per mode and call count: p99 frame lateness (how late the SIP
+frame was picked up vs its 20 ms schedule; > 20 ms = audible), CPU cores
+actually used, calls per core, total RSS and RSS per call (growth over the
+processes' idle baseline).  The stand-ins never start the LiveKit FFI
+runtime, so the real per-process memory cost of `procs` is higher than
+shown here.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from typing import Awaitable, Callable
+
+FRAME_S = 0.020
+SAMPLE_RATE = 16000
+FRAME_BYTES = int(SAMPLE_RATE * FRAME_S) * 2
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PacedSipStream:
+    """Stand-in for rtc.AudioStream: one frame per 20 ms, records lateness."""
+
+    def __init__(self, seconds: float, lateness: list):
+        self._frames = int(seconds / FRAME_S)
+        self._lateness = lateness
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        from types import SimpleNamespace
+
+        payload = bytearray(FRAME_BYTES)
+        start = time.monotonic()
+        for i in range(self._frames):
+            due = start + i * FRAME_S
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._lateness.append(time.monotonic() - due)
+            yield SimpleNamespace(frame=SimpleNamespace(data=memoryview(payload)))
+
+    async def aclose(self):
+        pass
+
+
+class PacedUltravoxWS:
+    """Stand-in for the Ultravox WS: 20 ms of TTS per 20 ms, swallows sends."""
+
+    def __init__(self, seconds: float):
+        self._frames = int(seconds / FRAME_S)
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        chunk = bytes(FRAME_BYTES)
+        start = time.monotonic()
+        for i in range(self._frames):
+            delay = start + i * FRAME_S - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    async def send(self, payload):
+        pass
+
+
+class NullAudioSource:
+    async def capture_frame(self, frame):
+        pass
+
+    def clear_queue(self):
+        pass
+
+
+def make_call(seconds: float, lateness: list) -> Callable[[], Awaitable[None]]:
+    """One simulated call through the real AudioBridge (both directions)."""
+    import dataclasses
+    import logging
+
+    from livekit import rtc
+
+    from lk_ultravox_bridge.audio_bridge import AudioBridge
+    from lk_ultravox_bridge.config import BridgeConfig
+
+    cfg = dataclasses.replace(BridgeConfig(), sample_rate=SAMPLE_RATE, channels=1, frame_ms=20)
+    quiet = logging.getLogger("bench")
+    quiet.disabled = True
+    rtc.AudioStream.from_track = staticmethod(lambda **kw: PacedSipStream(seconds, lateness))
+
+    async def one_call() -> None:
+        await AudioBridge(cfg, quiet).run(
+            join_url="", remote_audio_track=None, audio_source=NullAudioSource(),
+            stop_evt=asyncio.Event(), ws=PacedUltravoxWS(seconds),
+        )
+
+    return one_call
+
+
+async def run_loop_calls(calls: int, seconds: float, lateness: list) -> None:
+    one_call = make_call(seconds, lateness)
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+
+
+class BenchCallProcessor:
+    """The part of TriggerCallProcessor a loop shard drives: every message
+    is one simulated call."""
+
+    active_rooms: frozenset = frozenset()
+
+    def __init__(self, one_call: Callable[[], Awaitable[None]]):
+        self._one_call = one_call
+
+    async def process_body(self, body: str, ack=None, receive_count=None) -> None:
+        await self._one_call()
+
+    async def end_active_calls(self, reason: str) -> int:
+        return 0
+
+
+async def run_sharded_calls(shards: int, calls: int, seconds: float, lateness: list, loop_kind: str) -> None:
+    import logging
+    from types import SimpleNamespace
+
+    from lk_ultravox_bridge.loop_shards import ShardedProcessor
+
+    one_call = make_call(seconds, lateness)
+
+    async def factory() -> SimpleNamespace:
+        async def aclose() -> None:
+            pass
+
+        return SimpleNamespace(processor=BenchCallProcessor(one_call), reaper=None, aclose=aclose)
+
+    quiet = logging.getLogger("bench")
+    quiet.disabled = True
+    sharded = await ShardedProcessor.start(quiet, shards, factory, loop_kind=loop_kind)
+    try:
+        # As the worker loop does: one process_body per message, placed on
+        # the shard with the fewest calls in flight.
+        await asyncio.gather(*(sharded.process_body("{}") for _ in range(calls)))
+    finally:
+        await sharded.aclose()
+
+
+def child(loops: int, calls: int, seconds: float, results, loop_kind: str = "asyncio") -> None:
+    import logging
+
+    import lk_ultravox_bridge.audio_bridge  # noqa: F401  (baseline includes the imports)
+    from lk_ultravox_bridge.event_loop import run
+
+    logging.getLogger().setLevel(logging.WARNING)
+    baseline = rss_bytes()
+    lateness: list = []
+    peak = [baseline]
+
+    def sample_rss() -> None:
+        while not done.is_set():
+            peak[0] = max(peak[0], rss_bytes())
+            done.wait(0.25)
+
+    done = threading.Event()
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    if loops > 1:
+        run(run_sharded_calls(loops, calls, seconds, lateness, loop_kind), loop_kind)
+    else:
+        run(run_loop_calls(calls, seconds, lateness), loop_kind)
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    done.set()
+    results.put({"lateness": lateness, "cpu": cpu, "wall": wall, "baseline": baseline, "peak": peak[0]})
+
+
+def run_mode(mode: str, k: int, calls: int, seconds: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    if mode == "procs":
+        shares = [calls // k + (1 if i < calls % k else 0) for i in range(k)]
+        specs = [(1, n) for n in shares if n]
+    else:
+        specs = [(k if mode == "shards" else 1, calls)]
+    procs = [ctx.Process(target=child, args=(loops, n, seconds, results)) for loops, n in specs]
+    for p in procs:
+        p.start()
+    parts = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    lateness = sorted(x for part in parts for x in part["lateness"])
+    p99 = lateness[min(len(lateness) - 1, int(0.99 * len(lateness)))] * 1000 if lateness else 0.0
+    cores = sum(part["cpu"] for part in parts) / max(part["wall"] for part in parts)
+    rss_total = sum(part["peak"] for part in parts)
+    rss_growth = sum(part["peak"] - part["baseline"] for part in parts)
+    return {"p99": p99, "cores": cores, "rss_total": rss_total, "rss_per_call": rss_growth / calls}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, nargs="+", default=[20, 60, 120])
+    parser.add_argument("--k", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} k={args.k} seconds={args.seconds:.0f}")
+    for calls in args.calls:
+        for mode in ("single", "shards", "procs"):
+            r = run_mode(mode, args.k, calls, args.seconds)
+            print(f"{mode:<7} calls={calls:<4} p99Late={r['p99']:7.1f}ms cores={r['cores']:5.2f} "
+                  f"callsPerCore={calls / max(r['cores'], 1e-6):7.1f} "
+                  f"rssTotal={r['rss_total'] / 2**20:7.1f}MB rssPerCall={r['rss_per_call'] / 2**10:7.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
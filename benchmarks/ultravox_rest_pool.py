@@ -0,0 +1,127 @@
+"""Per-call Ultravox REST latency: one AsyncClient per call vs the shared pool.
+
+Runs entirely offline against a local HTTPS stand-in for POST /api/calls
+(self-signed certificate generated with the `openssl` CLI), so the TLS
+handshake the per-call client pays is real, only the network is local.
+
+    python -m benchmarks.ultravox_rest_pool [--rounds 5] [--server-delay-ms 5]
+
+Prints p50/p95/max per-call latency for 1, 10 and 50 concurrent call
+creations, for each mode.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+
+from aiohttp import web
+
+from lk_ultravox_bridge.config import BridgeConfig
+from lk_ultravox_bridge.ultravox_client import UltravoxCallClient, build_ultravox_http_client
+
+log = logging.getLogger("bench")
+
+
+def make_cert(tmpdir: str) -> tuple[str, str]:
+    cert, key = os.path.join(tmpdir, "cert.pem"), os.path.join(tmpdir, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+async def start_stand_in(cert: str, key: str, delay_s: float) -> tuple[web.AppRunner, int]:
+    async def create_call(request: web.Request) -> web.Response:
+        await request.read()
+        await asyncio.sleep(delay_s)  # Ultravox's own processing time
+        return web.json_response({"callId": "bench", "joinUrl": "wss://localhost/join"}, status=201)
+
+    app = web.Application()
+    app.router.add_post("/api/calls", create_call)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ctx.load_cert_chain(cert, key)
+    site = web.TCPSite(runner, "localhost", 0, ssl_context=ctx)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port
+
+
+async def measure(client: UltravoxCallClient, concurrency: int, rounds: int) -> list[float]:
+    latencies: list[float] = []
+
+    async def one() -> None:
+        t0 = time.perf_counter()
+        await client.create_ws_call_join_url(system_prompt="bench")
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    for _ in range(rounds):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (never extrapolates past the max)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(mode: str, concurrency: int, latencies: list[float]) -> str:
+    return (f"{mode:<10} concurrency={concurrency:<3} calls={len(latencies):<4} "
+            f"p50={statistics.median(latencies):7.1f}ms p95={percentile(latencies, 95):7.1f}ms "
+            f"max={max(latencies):7.1f}ms")
+
+
+async def run(rounds: int, delay_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_cert(tmp)
+        os.environ["SSL_CERT_FILE"] = cert  # httpx trusts the stand-in's certificate
+        runner, port = await start_stand_in(cert, key, delay_ms / 1000)
+        cfg = dataclasses.replace(
+            BridgeConfig(),
+            ultravox_api_key="bench",
+            ultravox_voice="bench",
+            ultravox_calls_url=f"https://localhost:{port}/api/calls",
+        )
+        try:
+            for concurrency in (1, 10, 50):
+                per_call = await measure(UltravoxCallClient(cfg, log), concurrency, rounds)
+                print(summarize("per-call", concurrency, per_call))
+
+                http = build_ultravox_http_client(cfg, log)
+                try:
+                    shared = UltravoxCallClient(cfg, log, http)
+                    await shared.create_ws_call_join_url(system_prompt="warm-up")
+                    pooled = await measure(shared, concurrency, rounds)
+                finally:
+                    await http.aclose()
+                print(summarize("shared", concurrency, pooled))
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--server-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    # Importing the package configures INFO logging; per-request lines
+    # would drown the results.
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args.rounds, args.server_delay_ms))
+
+
+if __name__ == "__main__":
+    main()
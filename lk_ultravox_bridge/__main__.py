@@ -1,5 +1,3 @@
-import asyncio
-
 from dotenv import load_dotenv
 
 
@@ -7,8 +5,10 @@ def _run() -> None:
     # Load .env before importing compat so BridgeConfig sees environment values.
     load_dotenv(override=True)
     from .compat import main
+    from .config import BridgeConfig
+    from .event_loop import run
 
-    asyncio.run(main())
+    run(main(), BridgeConfig().event_loop)
 
 
 if __name__ == "__main__":
@@ -8,17 +8,27 @@ from typing import Optional
 from livekit import rtc
 
 from .config import BridgeConfig, CountryProfile
-from .livekit_client import LiveKitTokenFactory, LiveKitRoomConnector, LiveKitRoomTerminator, LiveKitSession
+from .livekit_client import (
+    LiveKitApiPool, LiveKitTokenFactory, LiveKitRoomConnector, LiveKitRoomTerminator, LiveKitSession,
+)
 from .audio_bridge import AudioBridge, StopSignal
+from .room_sweeper import BRIDGE_IDENTITY_PREFIX
+from .teardown import RoomTeardownReaper
 
 
 class BridgeAgent:
-    def __init__(self, cfg: BridgeConfig, log: logging.Logger, room_name: str, profile: CountryProfile):
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, room_name: str, profile: CountryProfile,
+                 api_pool: Optional[LiveKitApiPool] = None, reaper: Optional[RoomTeardownReaper] = None):
         self._cfg = cfg
         self._profile = profile
         self._log = log
+        # Worker-owned pooled LiveKit API clients (None = one-shot client).
+        self._api_pool = api_pool
+        # Worker-owned background teardown (None = tear down inline).
+        self._reaper = reaper
         self.room_name = room_name
-        self.identity = f"lk-uv-bridge-{uuid.uuid4().hex[:6]}"
+        # The orphan sweeper treats a room with this participant as owned.
+        self.identity = f"{BRIDGE_IDENTITY_PREFIX}{uuid.uuid4().hex[:6]}"
 
         self.session: Optional[LiveKitSession] = None
         self.remote_audio_track: Optional[rtc.RemoteAudioTrack] = None
@@ -33,6 +43,10 @@ class BridgeAgent:
         """Why the call stopped (first cause wins), or None if still running."""
         return self._stop.reason
 
+    def stop(self, reason: str) -> None:
+        """Hang up from our side: the bridge ends and tears the room down."""
+        self._stop.trigger(reason)
+
     async def connect_livekit(self) -> None:
         self._log.info(
             "[Bridge] connecting to LiveKit room=%s identity=%s country=%s",
@@ -116,11 +130,17 @@ class BridgeAgent:
         Disconnecting only detaches our client; deleting the room is what
         removes the SIP participant and sends BYE to the trunk when we are
         the side ending (or abandoning) the call.
+
+        With a reaper (SQS worker) both steps are handed off and this returns
+        at once, so the call's slot is not held for the round trips.
         """
+        if self._reaper is not None:
+            self._reaper.submit(self.room_name, self._profile, self.session, self._log)
+            return
         if self.session:
             try:
                 await self.session.room.disconnect()
                 self._log.info("[Bridge] LiveKit room disconnected room=%s", self.room_name)
             except Exception:
                 self._log.warning("[Bridge] error disconnecting LiveKit room=%s", self.room_name, exc_info=True)
-        await LiveKitRoomTerminator(self._log).terminate(self.room_name, self._profile)
+        await LiveKitRoomTerminator(self._log, self._api_pool).terminate(self.room_name, self._profile)
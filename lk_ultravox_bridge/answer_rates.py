@@ -0,0 +1,83 @@
+"""Rolling answer rates per number and per number prefix.
+
+Every dial outcome (answered / not answered) updates two exponentially
+decayed counters, one for the dialed number and one for its prefix (the
+first ANSWER_RATE_PREFIX_DIGITS digits: country + area code + the mobile
+digit in Brazil).  ANSWER_RATE_HALF_LIFE_S sets how fast old outcomes
+fade.  A number's rate is smoothed towards its prefix's rate, so a
+number never dialed before gets the rate of its neighbours, not 0 or 1.
+
+With ANSWER_RATE_RANKING=1 the processor dials a contact's numbers
+(first number and phone fallback) in descending rate order instead of the
+producer's `order`.  Ties keep the producer's order, so a cold store
+changes nothing.
+
+The store is per process (shared by its loop shards), bounded to
+ANSWER_RATE_MAX_ENTRIES keys, least recently used evicted first.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import BridgeConfig
+
+# Pseudo-attempts of the prior in each smoothing step: a prefix starts at
+# 1/2 (Laplace), a number at its prefix's rate.
+PREFIX_PRIOR_WEIGHT = 2.0
+NUMBER_PRIOR_WEIGHT = 2.0
+
+
+class AnswerRates:
+    def __init__(self, cfg: BridgeConfig, *, clock: Callable[[], float] = time.monotonic):
+        self._half_life_s = max(1.0, cfg.answer_rate_half_life_s)
+        self._prefix_digits = max(1, cfg.answer_rate_prefix_digits)
+        self._max_entries = max(1, cfg.answer_rate_max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (answered, attempts, updated at); decayed lazily.
+        self._counts: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+
+    def _prefix_key(self, number: str) -> str:
+        return "prefix:" + number.lstrip("+")[:self._prefix_digits]
+
+    def _decayed(self, key: str, now: float) -> Tuple[float, float]:
+        entry = self._counts.get(key)
+        if entry is None:
+            return 0.0, 0.0
+        answered, attempts, updated_at = entry
+        factor = 0.5 ** (max(0.0, now - updated_at) / self._half_life_s)
+        return answered * factor, attempts * factor
+
+    def record(self, number: str, answered: bool) -> None:
+        now = self._clock()
+        with self._lock:
+            for key in (number, self._prefix_key(number)):
+                a, n = self._decayed(key, now)
+                self._counts[key] = (a + (1.0 if answered else 0.0), n + 1.0, now)
+                self._counts.move_to_end(key)
+            while len(self._counts) > self._max_entries:
+                self._counts.popitem(last=False)
+
+    def rate(self, number: str) -> float:
+        now = self._clock()
+        with self._lock:
+            pa, pn = self._decayed(self._prefix_key(number), now)
+            na, nn = self._decayed(number, now)
+        prefix_rate = (pa + 0.5 * PREFIX_PRIOR_WEIGHT) / (pn + PREFIX_PRIOR_WEIGHT)
+        return (na + prefix_rate * NUMBER_PRIOR_WEIGHT) / (nn + NUMBER_PRIOR_WEIGHT)
+
+    def rank(self, numbers: List[str]) -> List[str]:
+        """`numbers` by descending answer rate; stable for ties."""
+        rates: Dict[str, float] = {n: self.rate(n) for n in numbers}
+        return sorted(numbers, key=lambda n: -rates[n])
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def build_answer_rates(cfg: BridgeConfig) -> Optional[AnswerRates]:
+    """The store, or None when ANSWER_RATE_MAX_ENTRIES=0."""
+    return AnswerRates(cfg) if cfg.answer_rate_max_entries > 0 else None
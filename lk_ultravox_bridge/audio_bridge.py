@@ -9,6 +9,15 @@ import websockets
 from livekit import rtc
 
 from .config import BridgeConfig
+from .loop_monitor import SampleWindow
+
+# Per-frame handling time of the SIP -> Ultravox leg, across every call in
+# the process: the synchronous work only, not the awaited WS send (its time
+# includes waiting for the loop, which loop lag already measures).  Read by
+# the adaptive concurrency controller: a frame that takes a sizeable part of
+# its 20 ms budget means the node is running more calls than it can keep
+# real-time.
+FRAME_TIMING = SampleWindow()
 
 
 class StopSignal(asyncio.Event):
@@ -134,7 +143,9 @@ class AudioBridge:
 
         try:
             async for event in audio_stream:
+                t_frame = time.perf_counter()
                 payload = bytes(event.frame.data)
+                FRAME_TIMING.add(time.perf_counter() - t_frame)
                 if first:
                     first = False
                     self._log.info("[LK->UV] first frame bytes=%d", len(payload))
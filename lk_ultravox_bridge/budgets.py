@@ -0,0 +1,10 @@
+"""Budget arithmetic shared by the supervisor and the per-country budgets."""
+from __future__ import annotations
+
+from typing import List
+
+
+def split_budget(total: int, parts: int) -> List[int]:
+    """Split `total` into `parts` near-equal integers (first ones get the remainder)."""
+    base, rest = divmod(total, parts)
+    return [base + (1 if i < rest else 0) for i in range(parts)]
@@ -66,16 +66,19 @@ class NullCallHistoryPublisher:
 
 
 class SqsCallHistoryPublisher:
-    def __init__(self, sqs_client, queue_url: str, log: logging.Logger):
+    def __init__(self, sqs_client, queue_url: str, log: logging.Logger, executor=None):
         self._client = sqs_client
         self._queue_url = queue_url
         self._log = log
+        # The worker's dedicated publish pool (IoExecutors.publish); None =
+        # the loop's default executor.
+        self._run_in_thread = executor.run if executor is not None else asyncio.to_thread
 
     async def publish(self, body: Dict[str, Any]) -> None:
-        # boto3 is sync; to_thread keeps the event loop (and the audio it
+        # boto3 is sync; a thread keeps the event loop (and the audio it
         # drives) unblocked.  Failures are logged and swallowed: best-effort.
         try:
-            await asyncio.to_thread(
+            await self._run_in_thread(
                 self._client.send_message,
                 QueueUrl=self._queue_url,
                 MessageBody=json.dumps(body),
@@ -89,7 +92,7 @@ class SqsCallHistoryPublisher:
             )
 
 
-def build_call_history_publisher(cfg: BridgeConfig, sqs_client, log: logging.Logger):
+def build_call_history_publisher(cfg: BridgeConfig, sqs_client, log: logging.Logger, executor=None):
     """SqsCallHistoryPublisher when configured, Null publisher otherwise."""
     if not cfg.call_history_queue_name:
         return NullCallHistoryPublisher()
@@ -98,7 +101,7 @@ def build_call_history_publisher(cfg: BridgeConfig, sqs_client, log: logging.Log
         f"{cfg.aws_account_id}/{cfg.call_history_queue_name}"
     )
     log.info("[Events] CALL_HISTORY publishing enabled queueUrl=%s", queue_url)
-    return SqsCallHistoryPublisher(sqs_client, queue_url, log)
+    return SqsCallHistoryPublisher(sqs_client, queue_url, log, executor)
 
 
 class CallHistoryEmitter:
@@ -0,0 +1,185 @@
+"""Circuit breakers: stop taking calls an upstream is failing anyway.
+
+When Ultravox REST or a country's LiveKit project starts failing, every
+message still connects, creates and dials, fails, and goes back to the
+queue, burning trunk attempts and call slots on the way.  With
+CIRCUIT_BREAKER_ERROR_RATE set, the processor records the outcome of each
+upstream step in a breaker:
+
+- `ultravox`: Ultravox call creation (one breaker for every country);
+- `livekit-rtc:{CC}`: the room connect on the country's LiveKit project;
+- `livekit-sip:{CC}`: the SIP dial-out through it (a callee who does not
+  answer is a success: the API worked).
+
+A breaker opens once at least CIRCUIT_BREAKER_MIN_CALLS outcomes in the
+last CIRCUIT_BREAKER_WINDOW_S failed at CIRCUIT_BREAKER_ERROR_RATE or
+more.  While any breaker a country depends on is open, the worker hands
+that country's messages back to the queue instead of starting them, and
+stops polling altogether when no country can take a call (always the case
+with `ultravox` open).  After CIRCUIT_BREAKER_OPEN_S the breaker goes
+half-open: CIRCUIT_BREAKER_PROBES messages are let through as probes; as
+many successes close it, any failure opens it again.  A probe that never
+reaches the upstream (settled earlier) frees its slot after another
+CIRCUIT_BREAKER_OPEN_S.
+
+Hand-backs count as receives for the redrive policy, like country caps, so
+the delay starts at CIRCUIT_BREAKER_OPEN_S and grows with the message's
+receive count (see hand_back_delay_s): an outage of an hour does not DLQ
+the backlog it held back.
+
+One instance per worker process, shared by its loop shards.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .config import BridgeConfig, CountryProfile
+
+ULTRAVOX = "ultravox"
+LIVEKIT_RTC = "livekit-rtc"
+LIVEKIT_SIP = "livekit-sip"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class CircuitBreaker:
+    """One upstream's breaker.  Not thread-safe: CircuitBreakers locks."""
+
+    def __init__(self, name: str, cfg: BridgeConfig, log: logging.Logger, clock: Callable[[], float]):
+        self.name = name
+        self._error_rate = cfg.circuit_breaker_error_rate
+        self._min_calls = max(1, cfg.circuit_breaker_min_calls)
+        self._window_s = cfg.circuit_breaker_window_s
+        self._open_s = cfg.circuit_breaker_open_s
+        self._probes = max(1, cfg.circuit_breaker_probes)
+        self._log = log
+        self._clock = clock
+        self._state = CLOSED
+        # Closed: (time, ok) of the outcomes in the window.
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        # Open: when it goes half-open.  Half-open: probe start times, successes.
+        self._opened_until = 0.0
+        self._probes_started: List[float] = []
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() >= self._opened_until:
+            self._state = HALF_OPEN
+            self._probes_started = []
+            self._probe_successes = 0
+            self._log.info("[Breaker] half-open name=%s probes=%d", self.name, self._probes)
+        return self._state
+
+    def _free_probes(self) -> int:
+        now = self._clock()
+        self._probes_started = [t for t in self._probes_started if now - t < self._open_s]
+        return self._probes - self._probe_successes - len(self._probes_started)
+
+    def blocked(self) -> bool:
+        """True when no message may go through right now."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._free_probes() <= 0)
+
+    def start_probe(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_started.append(self._clock())
+
+    def _open(self, why: str) -> None:
+        self._state = OPEN
+        self._opened_until = self._clock() + self._open_s
+        self._outcomes.clear()
+        self._log.warning("[Breaker] open name=%s %s openS=%.0f", self.name, why, self._open_s)
+
+    def record(self, ok: bool) -> None:
+        state = self.state
+        if state == OPEN:
+            return  # a call started before the breaker opened
+        if state == HALF_OPEN:
+            if self._probes_started:
+                self._probes_started.pop(0)
+            if not ok:
+                self._open("probe failed")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._probes:
+                self._state = CLOSED
+                self._log.info("[Breaker] closed name=%s probes=%d", self.name, self._probe_successes)
+            return
+        now = self._clock()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self._window_s:
+            self._outcomes.popleft()
+        calls = len(self._outcomes)
+        failures = sum(1 for _, o in self._outcomes if not o)
+        if calls >= self._min_calls and failures / calls >= self._error_rate:
+            self._open(f"errorRate={failures / calls:.2f} calls={calls}")
+
+
+class CircuitBreakers:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, *, clock: Callable[[], float] = time.monotonic):
+        self._cfg = cfg
+        self._log = log
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # Messages handed back because a breaker was open.
+        self.released = 0
+
+    def _breaker(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, self._cfg, self._log, self._clock)
+        return breaker
+
+    def _for(self, profile: CountryProfile) -> List[CircuitBreaker]:
+        cc = profile.country_code
+        return [self._breaker(ULTRAVOX), self._breaker(f"{LIVEKIT_RTC}:{cc}"), self._breaker(f"{LIVEKIT_SIP}:{cc}")]
+
+    def record(self, upstream: str, ok: bool, profile: Optional[CountryProfile] = None) -> None:
+        """One outcome of `upstream` (ULTRAVOX, or LIVEKIT_* for `profile`)."""
+        name = upstream if upstream == ULTRAVOX else f"{upstream}:{profile.country_code}"
+        with self._lock:
+            self._breaker(name).record(ok)
+
+    def blocked(self, profile: CountryProfile) -> bool:
+        with self._lock:
+            return any(b.blocked() for b in self._for(profile))
+
+    def admit(self, profile: CountryProfile) -> bool:
+        """Whether a message for `profile` may start; takes a probe slot on
+        every half-open breaker it goes through."""
+        with self._lock:
+            breakers = self._for(profile)
+            if any(b.blocked() for b in breakers):
+                return False
+            for b in breakers:
+                b.start_probe()
+            return True
+
+    def all_blocked(self, profiles: Iterable[CountryProfile]) -> bool:
+        """True when no country could start a call (so don't poll)."""
+        return all(self.blocked(p) for p in profiles)
+
+    def open_names(self) -> List[str]:
+        with self._lock:
+            return sorted(name for name, b in self._breakers.items() if b.state != CLOSED)
+
+    def heartbeat_gauges(self) -> Dict[str, Any]:
+        return {"breakersOpen": len(self.open_names()), "breakerReleased": self.released}
+
+
+def build_circuit_breakers(cfg: BridgeConfig, log: logging.Logger) -> Optional[CircuitBreakers]:
+    """The breakers, or None when CIRCUIT_BREAKER_ERROR_RATE is 0."""
+    if cfg.circuit_breaker_error_rate <= 0:
+        return None
+    if cfg.circuit_breaker_error_rate > 1:
+        raise SystemExit(f"CIRCUIT_BREAKER_ERROR_RATE={cfg.circuit_breaker_error_rate}: expected a rate in (0, 1]")
+    log.info("[Breaker] circuit breakers errorRate=%.2f minCalls=%d windowS=%.0f openS=%.0f probes=%d",
+             cfg.circuit_breaker_error_rate, cfg.circuit_breaker_min_calls, cfg.circuit_breaker_window_s,
+             cfg.circuit_breaker_open_s, cfg.circuit_breaker_probes)
+    return CircuitBreakers(cfg, log)
@@ -0,0 +1,94 @@
+"""Adaptive MAX_CONCURRENT_CALLS for the SQS worker.
+
+A static cap has to be tuned by hand per instance size ("raise it while
+watching CPU").  The controller does that continuously, AIMD style:
+
+- every interval it reads three overload signals — event-loop lag (p95),
+  per-frame handling time of the audio bridge (p95) and process CPU;
+- any signal over its threshold -> the limit is cut multiplicatively, so a
+  node that degrades audio backs off fast;
+- all healthy and the limit actually in use -> +1, so capacity is probed
+  one call at a time.  An idle node never ratchets its limit up.
+
+The limit never leaves [ADAPTIVE_CONCURRENCY_MIN, ADAPTIVE_CONCURRENCY_MAX].
+Lowering it never interrupts a running call: the worker just stops pulling
+messages until in-flight drops below the new limit.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, Optional, Union
+
+from .audio_bridge import FRAME_TIMING
+from .config import BridgeConfig
+from .loop_monitor import MultiLoopLag, SampleWindow
+
+# Multiplicative decrease applied on overload (0.75 = drop a quarter).
+DECREASE_FACTOR = 0.75
+
+
+class AdaptiveConcurrencyController:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, loop_lag: Union[SampleWindow, MultiLoopLag],
+                 frame_timing: Optional[SampleWindow] = None, *,
+                 cpu_clock: Callable[[], float] = time.process_time,
+                 wall_clock: Callable[[], float] = time.monotonic):
+        self._cfg = cfg
+        self._log = log
+        self._loop_lag = loop_lag
+        self._frame_timing = frame_timing if frame_timing is not None else FRAME_TIMING
+        self._cpu_clock = cpu_clock
+        self._wall_clock = wall_clock
+        self.floor = max(1, cfg.adaptive_concurrency_min)
+        self.ceiling = max(self.floor, cfg.adaptive_concurrency_max)
+        # Start from the static cap: enabling the controller never jumps
+        # straight to the ceiling.
+        self.limit = min(max(cfg.max_concurrent_calls, self.floor), self.ceiling)
+        # One frame-timing sample per call per frame: at the ceiling the
+        # window must still hold a whole interval, or the p95 would only
+        # see its last few seconds.
+        frames_per_call = math.ceil(cfg.adaptive_concurrency_interval_s * 1000.0 / max(1, cfg.frame_ms))
+        self._frame_timing.ensure_capacity(frames_per_call * self.ceiling)
+        self._last_cpu = cpu_clock()
+        self._last_wall = wall_clock()
+
+    def _cpu_pct(self) -> float:
+        cpu, wall = self._cpu_clock(), self._wall_clock()
+        elapsed = wall - self._last_wall
+        pct = (cpu - self._last_cpu) / elapsed * 100.0 if elapsed > 0 else 0.0
+        self._last_cpu, self._last_wall = cpu, wall
+        return pct
+
+    def evaluate(self, in_flight: int) -> int:
+        """Apply one AIMD step and return the (possibly new) limit."""
+        window = self._cfg.adaptive_concurrency_interval_s
+        lag_ms = self._loop_lag.percentile(95, window) * 1000.0
+        frame_ms = self._frame_timing.percentile(95, window) * 1000.0
+        cpu_pct = self._cpu_pct()
+
+        overloaded = (
+            lag_ms > self._cfg.adaptive_max_loop_lag_ms
+            or frame_ms > self._cfg.adaptive_max_frame_ms
+            or cpu_pct > self._cfg.adaptive_max_cpu_pct
+        )
+        old = self.limit
+        if overloaded:
+            self.limit = max(self.floor, int(self.limit * DECREASE_FACTOR))
+        elif in_flight >= self.limit:
+            self.limit = min(self.ceiling, self.limit + 1)
+
+        if self.limit != old:
+            self._log.info(
+                "[Concurrency] limit %s from=%d to=%d inFlightNow=%d loopLagP95Ms=%.1f "
+                "frameP95Ms=%.2f cpuPct=%.0f",
+                "lowered" if self.limit < old else "raised", old, self.limit, in_flight,
+                lag_ms, frame_ms, cpu_pct,
+            )
+        return self.limit
+
+    async def run(self, in_flight: Callable[[], int]) -> None:
+        while True:
+            await asyncio.sleep(self._cfg.adaptive_concurrency_interval_s)
+            self.evaluate(in_flight())
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from typing import Tuple
 
 from dotenv import load_dotenv
 
@@ -14,6 +15,30 @@ def _env_flag(name: str, default: str) -> bool:
     return os.environ.get(name, default).strip().lower() in ("1", "true", "yes")
 
 
+@dataclass(frozen=True)
+class SipTrunk:
+    """One outbound SIP leg: a LiveKit SIP trunk and the caller id sent on it."""
+
+    trunk_id: str
+    from_number: str
+
+
+# How a dial picks its member of a profile's trunk pool (SIP_POOL_STRATEGY_{CC}).
+POOL_STRATEGIES = ("round-robin", "least-in-flight", "answer-rate")
+
+
+def _parse_trunks(spec: str, default_from_number: str, default_trunk_id: str = "") -> Tuple[SipTrunk, ...]:
+    """"trunkId[:fromNumber],..." -> trunks; fromNumber defaults to the profile's
+    (and trunkId to `default_trunk_id`, for caller-id-only entries)."""
+    trunks = []
+    for item in (i.strip() for i in spec.split(",")):
+        if not item:
+            continue
+        trunk_id, _, from_number = item.partition(":")
+        trunks.append(SipTrunk(trunk_id.strip() or default_trunk_id, from_number.strip() or default_from_number))
+    return tuple(trunks)
+
+
 @dataclass(frozen=True)
 class CountryProfile:
     """Per-country LiveKit project + SIP trunk configuration."""
@@ -31,6 +56,36 @@ class CountryProfile:
     # BCP47 hint sent to Ultravox to guide ASR and TTS (e.g. "pt-BR").
     # Empty = omit the field from the API payload (Ultravox auto-detects).
     language_hint: str = ""
+    # Carrier CPS limit of this profile's trunk: dial-outs are paced at
+    # this many per second (SIP_DIAL_CPS_{CC}; 0 = unpaced), with up to
+    # `sip_dial_burst` sent back to back (SIP_DIAL_BURST_{CC}).
+    sip_dial_cps: float = 0.0
+    sip_dial_burst: int = 1
+    # Calls of this country allowed in flight at once, within the global
+    # MAX_CONCURRENT_CALLS (MAX_CONCURRENT_CALLS_{CC}; 0 = global cap only).
+    # Node-wide under the supervisor: split between worker processes.
+    max_concurrent_calls: int = 0
+    # Cap on this country's calls, over all its trunks, across every worker
+    # sharing the COORDINATION_BACKEND (CLUSTER_MAX_CONCURRENT_CALLS_{CC};
+    # 0 = no cluster-wide cap).
+    cluster_max_concurrent_calls: int = 0
+    # Trunks tried in order, within the same dial, when the leg before
+    # fails with a SIP 5xx or a trunk auth error (SIP_FAILOVER_TRUNKS_{CC}).
+    # Each is paced at this profile's CPS under its own trunk id.
+    sip_failover_trunks: Tuple[SipTrunk, ...] = ()
+    # Trunks / caller ids that share the load with the primary
+    # (SIP_TRUNK_POOL_{CC}): each dial starts on one member, picked by
+    # `sip_pool_strategy` (SIP_POOL_STRATEGY_{CC}, one of POOL_STRATEGIES).
+    sip_trunk_pool: Tuple[SipTrunk, ...] = ()
+    sip_pool_strategy: str = "round-robin"
+
+    def pool_members(self) -> Tuple[SipTrunk, ...]:
+        """The primary trunk (SIP_TRUNK_ID_{CC}) followed by the pool's other members."""
+        return (SipTrunk(self.sip_trunk_id, self.sip_from_number),) + self.sip_trunk_pool
+
+    def sip_trunks(self) -> Tuple[SipTrunk, ...]:
+        """The pool members followed by the failover trunks."""
+        return self.pool_members() + self.sip_failover_trunks
 
     def validate(self) -> None:
         for attr in ("livekit_url", "livekit_wss_url", "livekit_api_key",
@@ -49,6 +104,8 @@ def _build_profile(country_code: str, prefix: str, provider: str,
     # LANGUAGE_HINT_{CC} overrides the code default; set it to "" to stop
     # sending the hint (no-deploy rollback switch).
     language_hint = os.environ.get(f"LANGUAGE_HINT_{cc}", default_language_hint)
+    from_number = os.environ.get(f"SIP_FROM_NUMBER_{cc}", "")
+    trunk_id = os.environ.get(f"SIP_TRUNK_ID_{cc}", "")
     return CountryProfile(
         country_code=cc,
         prefix=prefix,
@@ -57,10 +114,17 @@ def _build_profile(country_code: str, prefix: str, provider: str,
         livekit_wss_url=os.environ.get(f"LIVEKIT_WSS_URL_{cc}", ""),
         livekit_api_key=os.environ.get(f"LIVEKIT_API_KEY_{cc}", ""),
         livekit_api_secret=os.environ.get(f"LIVEKIT_API_SECRET_{cc}", ""),
-        sip_trunk_id=os.environ.get(f"SIP_TRUNK_ID_{cc}", ""),
-        sip_from_number=os.environ.get(f"SIP_FROM_NUMBER_{cc}", ""),
+        sip_trunk_id=trunk_id,
+        sip_from_number=from_number,
         ultravox_voice=voice,
         language_hint=language_hint,
+        sip_dial_cps=float(os.environ.get(f"SIP_DIAL_CPS_{cc}", "0")),
+        sip_dial_burst=int(os.environ.get(f"SIP_DIAL_BURST_{cc}", "1")),
+        max_concurrent_calls=int(os.environ.get(f"MAX_CONCURRENT_CALLS_{cc}", "0")),
+        cluster_max_concurrent_calls=int(os.environ.get(f"CLUSTER_MAX_CONCURRENT_CALLS_{cc}", "0")),
+        sip_failover_trunks=_parse_trunks(os.environ.get(f"SIP_FAILOVER_TRUNKS_{cc}", ""), from_number),
+        sip_trunk_pool=_parse_trunks(os.environ.get(f"SIP_TRUNK_POOL_{cc}", ""), from_number, trunk_id),
+        sip_pool_strategy=os.environ.get(f"SIP_POOL_STRATEGY_{cc}", "round-robin").strip().lower(),
     )
 
 
@@ -87,6 +151,28 @@ class BridgeConfig:
     # (30s) can expire the joinUrl while the callee's phone is still ringing,
     # since we create the Ultravox call before dialing out.
     ultravox_join_timeout: str = os.environ.get("ULTRAVOX_JOIN_TIMEOUT", "60s")
+    # Sequential fallback across a contact's phoneNumbers: when the dial of
+    # one number ends with one of these CallNotAnsweredError reasons (comma
+    # list, e.g. "invalid-number,unavailable"), the next number in `order`
+    # is dialed within the same message.  Empty = only the first number.
+    phone_fallback_reasons: str = os.environ.get("PHONE_FALLBACK_REASONS", "")
+    # Negative dial cache (see dial_outcomes): numbers whose dial ended with
+    # one of these reasons are not dialed again for the given TTL, e.g.
+    # "invalid-number:2592000,unavailable:3600".  Empty = off.  "sqlite" keeps
+    # the cache across restarts (shared by every process on the host).
+    negative_cache_ttls: str = os.environ.get("NEGATIVE_CACHE_TTLS", "")
+    negative_cache_backend: str = os.environ.get("NEGATIVE_CACHE_BACKEND", "sqlite")
+    negative_cache_sqlite_path: str = os.environ.get("NEGATIVE_CACHE_SQLITE_PATH",
+                                                     "/tmp/outbound-call-gateway-dial-outcomes.sqlite")
+    negative_cache_max_entries: int = int(os.environ.get("NEGATIVE_CACHE_MAX_ENTRIES", "100000"))
+    # Rolling answer rates (see answer_rates): every dial outcome updates
+    # decayed counters for the number and its prefix (first N digits).
+    # ANSWER_RATE_RANKING=1 dials a contact's numbers best rate first
+    # instead of the producer's order.  MAX_ENTRIES=0 = not tracked.
+    answer_rate_ranking: bool = _env_flag("ANSWER_RATE_RANKING", "0")
+    answer_rate_half_life_s: float = float(os.environ.get("ANSWER_RATE_HALF_LIFE_S", "604800"))
+    answer_rate_prefix_digits: int = int(os.environ.get("ANSWER_RATE_PREFIX_DIGITS", "5"))
+    answer_rate_max_entries: int = int(os.environ.get("ANSWER_RATE_MAX_ENTRIES", "50000"))
     # How long the agent waits for the callee to speak after pickup before
     # greeting first (firstSpeakerSettings.user.fallback.delay).
     ultravox_greeting_delay: str = os.environ.get("ULTRAVOX_GREETING_DELAY", "4s")
@@ -96,6 +182,28 @@ class BridgeConfig:
     # Prompt-based detection is not telecom-grade AMD; disable here if the
     # false-positive rate ever hurts more than talking to voicemail does.
     ultravox_voicemail_hangup: bool = _env_flag("ULTRAVOX_VOICEMAIL_HANGUP", "1")
+    # Connection pool of the worker's long-lived Ultravox REST client.  One
+    # client is shared by every call so DNS/TCP/TLS setup is paid once, not
+    # per call creation.  HTTP/2 multiplexes concurrent creations over a
+    # single connection; it needs the optional `h2` package (httpx[http2])
+    # and falls back to HTTP/1.1 when it is not installed.
+    ultravox_http_max_connections: int = int(os.environ.get("ULTRAVOX_HTTP_MAX_CONNECTIONS", "20"))
+    ultravox_http_keepalive_s: float = float(os.environ.get("ULTRAVOX_HTTP_KEEPALIVE_S", "60"))
+    ultravox_http2: bool = _env_flag("ULTRAVOX_HTTP2", "0")
+    # Call creation budget: connect / read timeouts of each POST, and up to
+    # ULTRAVOX_RETRIES more attempts (jittered exponential backoff from
+    # ULTRAVOX_RETRY_BACKOFF_S) on connection failures and 429/502/503/504,
+    # all within ULTRAVOX_CREATE_BUDGET_S.
+    ultravox_connect_timeout_s: float = float(os.environ.get("ULTRAVOX_CONNECT_TIMEOUT_S", "3"))
+    ultravox_read_timeout_s: float = float(os.environ.get("ULTRAVOX_READ_TIMEOUT_S", "10"))
+    ultravox_retries: int = int(os.environ.get("ULTRAVOX_RETRIES", "2"))
+    ultravox_retry_backoff_s: float = float(os.environ.get("ULTRAVOX_RETRY_BACKOFF_S", "0.25"))
+    ultravox_create_budget_s: float = float(os.environ.get("ULTRAVOX_CREATE_BUDGET_S", "15"))
+    # Hedged call creation (worker only): a second POST once the first has
+    # taken the recent p95 (never less than ULTRAVOX_HEDGE_MIN_DELAY_S); the
+    # first good response wins and the other call is deleted.
+    ultravox_hedge: bool = _env_flag("ULTRAVOX_HEDGE", "0")
+    ultravox_hedge_min_delay_s: float = float(os.environ.get("ULTRAVOX_HEDGE_MIN_DELAY_S", "1"))
 
     sample_rate: int = int(os.environ.get("SAMPLE_RATE", "48000"))
     channels: int = int(os.environ.get("CHANNELS", "1"))
@@ -113,6 +221,99 @@ class BridgeConfig:
     # streams 20ms audio frames continuously, so raise this gradually while
     # watching CPU.
     max_concurrent_calls: int = int(os.environ.get("MAX_CONCURRENT_CALLS", "3"))
+    # Adaptive concurrency (opt-in): instead of the fixed cap above, the
+    # worker moves its limit between MIN and MAX (AIMD, starting from
+    # MAX_CONCURRENT_CALLS) every interval, cutting it when event-loop lag,
+    # per-frame audio handling time (both p95) or process CPU (% of one
+    # core) cross their thresholds and probing +1 while all stay healthy.
+    adaptive_concurrency: bool = _env_flag("ADAPTIVE_CONCURRENCY", "0")
+    adaptive_concurrency_min: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MIN", "1"))
+    adaptive_concurrency_max: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MAX", "20"))
+    adaptive_concurrency_interval_s: float = float(os.environ.get("ADAPTIVE_CONCURRENCY_INTERVAL_S", "10"))
+    adaptive_max_loop_lag_ms: float = float(os.environ.get("ADAPTIVE_MAX_LOOP_LAG_MS", "20"))
+    adaptive_max_frame_ms: float = float(os.environ.get("ADAPTIVE_MAX_FRAME_MS", "5"))
+    adaptive_max_cpu_pct: float = float(os.environ.get("ADAPTIVE_MAX_CPU_PCT", "80"))
+    # Worker processes started by the supervisor entry point
+    # (`python -m lk_ultravox_bridge.supervisor`).  MAX_CONCURRENT_CALLS and
+    # the ADAPTIVE_CONCURRENCY_MIN/MAX bounds are node-wide budgets split
+    # between them.  Ignored by the single-process worker.
+    worker_processes: int = int(os.environ.get("WORKER_PROCESSES", "1"))
+    # Fraction of each trunk's SIP_DIAL_CPS_{CC} this process may use.  Not
+    # an env var: the supervisor sets 1/WORKER_PROCESSES in each child so the
+    # node as a whole stays within the carrier's limit.
+    sip_dial_rate_share: float = 1.0
+    # A trunk whose dial failed with a SIP 5xx / trunk auth error is tried
+    # after the healthy ones for this long (see sip_trunks).
+    sip_trunk_cooldown_s: float = float(os.environ.get("SIP_TRUNK_COOLDOWN_S", "30"))
+    # Circuit breakers on Ultravox REST and each country's LiveKit project
+    # (see circuit_breakers): open at this error rate over the window once
+    # MIN_CALLS outcomes are in, pause that intake for OPEN_S, then let
+    # PROBES messages through.  0 = off.
+    circuit_breaker_error_rate: float = float(os.environ.get("CIRCUIT_BREAKER_ERROR_RATE", "0"))
+    circuit_breaker_min_calls: int = int(os.environ.get("CIRCUIT_BREAKER_MIN_CALLS", "10"))
+    circuit_breaker_window_s: float = float(os.environ.get("CIRCUIT_BREAKER_WINDOW_S", "60"))
+    circuit_breaker_open_s: float = float(os.environ.get("CIRCUIT_BREAKER_OPEN_S", "30"))
+    circuit_breaker_probes: int = int(os.environ.get("CIRCUIT_BREAKER_PROBES", "1"))
+    # This process's slot among the supervisor's children (index, count);
+    # node-wide per-country budgets are split accordingly.  Not env vars.
+    worker_index: int = 0
+    worker_count: int = 1
+    # Event-loop implementation: "asyncio" (stdlib) or "uvloop" (optional
+    # dependency; falls back to asyncio with a warning when not installed).
+    event_loop: str = os.environ.get("EVENT_LOOP", "asyncio")
+    # Event loops (each in its own thread) the SQS worker spreads calls over;
+    # 1 = everything on the main loop.  In-process alternative to
+    # WORKER_PROCESSES: one LiveKit FFI runtime instead of one per process.
+    event_loop_shards: int = int(os.environ.get("EVENT_LOOP_SHARDS", "1"))
+    # Blocking-call detector (opt-in): when the event loop stays stuck in
+    # synchronous code for longer than this, a watchdog thread logs the
+    # loop's stack trace ("[Loop] event loop blocked").  0 = disabled.
+    loop_block_threshold_ms: float = float(os.environ.get("LOOP_BLOCK_THRESHOLD_MS", "0"))
+    # Dedicated thread pools for the worker's blocking SQS I/O (instead of the
+    # shared asyncio.to_thread pool), so an ack never queues behind a long
+    # poll or a burst of CALL_HISTORY publishes.
+    sqs_poll_threads: int = int(os.environ.get("SQS_POLL_THREADS", "2"))
+    sqs_ack_threads: int = int(os.environ.get("SQS_ACK_THREADS", "4"))
+    call_history_publish_threads: int = int(os.environ.get("CALL_HISTORY_PUBLISH_THREADS", "4"))
+    # Shared store for cluster-wide budgets (CLUSTER_MAX_CONCURRENT_CALLS_{CC}
+    # slots and SIP_DIAL_CPS_{CC} dial pacing across workers): "" = each
+    # worker enforces its own limits, "sqlite" = a SQLite file every worker
+    # on the host can reach, "package.module:factory" = custom backend.
+    coordination_backend: str = os.environ.get("COORDINATION_BACKEND", "")
+    coordination_sqlite_path: str = os.environ.get("COORDINATION_SQLITE_PATH", "/tmp/outbound-call-gateway-leases.sqlite")
+    # Leases not renewed within this long expire: a crashed worker's slots
+    # come back after at most one TTL.
+    coordination_lease_ttl_s: float = float(os.environ.get("COORDINATION_LEASE_TTL_S", "60"))
+    # Idempotency store (see idempotency): a redelivered TRIGGER_CALL whose
+    # id was already answered / not answered within the TTL is acked and
+    # skipped instead of calling the person twice.  "memory" = per-process
+    # LRU, "sqlite" = a file shared by every process on the host, "off".
+    idempotency_backend: str = os.environ.get("IDEMPOTENCY_BACKEND", "memory")
+    idempotency_sqlite_path: str = os.environ.get("IDEMPOTENCY_SQLITE_PATH", "/tmp/outbound-call-gateway-triggers.sqlite")
+    idempotency_ttl_s: float = float(os.environ.get("IDEMPOTENCY_TTL_S", "86400"))
+    idempotency_max_entries: int = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "100000"))
+    # Graceful shutdown (SIGTERM/SIGINT): polling stops at once and in-flight
+    # calls get this long to finish on their own; the rest are then hung up
+    # with endReason=worker-shutdown.  Keep the platform's SIGTERM-to-SIGKILL
+    # grace period above this plus ~30s (room teardown, log/event flush).
+    shutdown_drain_timeout_s: float = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT_S", "120"))
+
+    # Connection cap of each CountryProfile's long-lived LiveKit server API
+    # client (SIP dial-out + room deletion).  One aiohttp session per
+    # profile is shared by every concurrent call of that country.
+    livekit_api_max_connections: int = int(os.environ.get("LIVEKIT_API_MAX_CONNECTIONS", "10"))
+    # Background room teardown (SQS worker): deletions run off the call
+    # path so a finished call frees its slot immediately.  Concurrency caps
+    # simultaneous DeleteRoom requests; attempts bounds retries per room.
+    teardown_max_concurrency: int = int(os.environ.get("TEARDOWN_MAX_CONCURRENCY", "8"))
+    teardown_max_attempts: int = int(os.environ.get("TEARDOWN_MAX_ATTEMPTS", "3"))
+    # Orphaned-room sweeper (SQS worker): rooms left behind by a crashed
+    # worker keep their SIP leg billing until the callee hangs up.  Swept at
+    # startup and every interval (0 = disabled); rooms younger than the min
+    # age are never touched (a call being set up has no bridge yet).
+    orphan_sweep_interval_s: float = float(os.environ.get("ORPHAN_SWEEP_INTERVAL_S", "300"))
+    orphan_room_min_age_s: float = float(os.environ.get("ORPHAN_ROOM_MIN_AGE_S", "120"))
+    orphan_sweep_concurrency: int = int(os.environ.get("ORPHAN_SWEEP_CONCURRENCY", "4"))
 
     # Observability (Grafana Cloud Loki).  All optional: when unset, the
     # worker logs to stdout only, exactly as before.  Metrics are derived
@@ -129,24 +330,45 @@ class BridgeConfig:
     aws_secret_access_key: str = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
     aws_account_id: str = os.environ.get("AWS_ACCOUNT_ID", "")
     sqs_queue_name: str = os.environ.get("SQS_QUEUE_NAME", "TriggerCallQueue")
+    # Several TRIGGER_CALL queues with weights ("Callbacks:4,Campaigns:1"):
+    # free call slots are shared between them in proportion to the weights.
+    # Empty = SQS_QUEUE_NAME alone.
+    sqs_queues: str = os.environ.get("SQS_QUEUES", "")
+    # Fair share of call slots between the senders of one queue: "tenant",
+    # "campaign" or "tenant,campaign" groups messages by that key and serves
+    # the groups deficit-round-robin, so one tenant's 10k-trigger backlog
+    # cannot monopolize the workers.  "" = off (messages start in arrival
+    # order).  Look-ahead = messages received per poll (SQS max 10).
+    fair_share_key: str = os.environ.get("FAIR_SHARE_KEY", "")
+    fair_share_lookahead: int = int(os.environ.get("FAIR_SHARE_LOOKAHEAD", "10"))
+    # The queues' redrive maxReceiveCount: fair share never releases a
+    # message one receive short of it straight back to the queue.
+    sqs_max_receive_count: int = int(os.environ.get("SQS_MAX_RECEIVE_COUNT", "5"))
     # CALL_HISTORY event publishing (CallHistoryQueue).  Optional, same
     # opt-in pattern as GRAFANA_*: empty = events disabled, everything else
     # runs exactly as before.
     call_history_queue_name: str = os.environ.get("CALL_HISTORY_QUEUE_NAME", "")
+    # Parking queue for poison TRIGGER_CALLs (payload that fails validation;
+    # see poison).  Empty = such messages are acked with a SIP_CALL_FAILED
+    # reason=invalid-payload event instead of cycling until the DLQ.
+    poison_queue_name: str = os.environ.get("POISON_QUEUE_NAME", "")
 
     def require(self, name: str, val: str) -> None:
         if not val:
             raise SystemExit(f"Missing required env var: {name}")
 
     def resolve_profile(self, to_number: str) -> CountryProfile:
+        profile = self.route_profile(to_number)
+        profile.validate()
+        return profile
+
+    def route_profile(self, to_number: str) -> CountryProfile:
+        """resolve_profile without validation (routing decisions only)."""
         # +56 routes to Switch (CL); everything else (incl. +55) routes to Twilio (BR) as fallback.
         cl = _PROFILE_MAP["+56"]
         if to_number.startswith(cl.prefix):
-            cl.validate()
             return cl
-        fallback = _PROFILE_MAP["+55"]
-        fallback.validate()
-        return fallback
+        return _PROFILE_MAP["+55"]
 
     @property
     def profiles(self) -> dict[str, CountryProfile]:
@@ -0,0 +1,220 @@
+"""Cluster-wide call-slot and CPS budgets, leased from a shared backend.
+
+Every worker (replica, supervised child) enforces its own caps, so a trunk
+shared by N workers sees N x the limit.  With COORDINATION_BACKEND set,
+workers lease from a shared store instead:
+
+- call slots: one lease per call on `slots:{CC}`, at most
+  CLUSTER_MAX_CONCURRENT_CALLS_{CC} held at once, released when the call
+  ends.  The cap is per country, across its trunk pool and failover
+  trunks: the slot is taken before the message starts, when the trunk
+  that will carry the call is not known yet;
+- dial CPS: one short-lived lease per dial on `cps:{trunk}` (the trunk
+  actually dialed), at most SIP_DIAL_CPS_{CC} alive at a time — a
+  one-second sliding window.
+
+Every lease expires (COORDINATION_LEASE_TTL_S) unless its holder renews it,
+so a worker that crashes mid-call cannot leak slots: they come back on
+their own after one TTL.
+
+Backends:
+
+- `sqlite`: a SQLite file on a shared disk (COORDINATION_SQLITE_PATH) —
+  single-host multi-process deployments (the supervisor, several
+  containers on one volume);
+- `package.module:factory`: any other store (Redis, DynamoDB, etcd...).
+  `factory(cfg)` must return a LeaseBackend.
+
+Backends are synchronous (database/network clients); the async wrappers
+run them in a thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .config import BridgeConfig, CountryProfile
+
+# Lifetime of a dial's CPS lease: the sliding window SIP_DIAL_CPS_{CC} counts
+# over (stretched for rates under 1/s: 0.5 cps = 1 dial per 2 s).
+CPS_WINDOW_S = 1.0
+# How often a denied dial re-checks the CPS window.
+CPS_RETRY_S = 0.05
+
+
+class Lease(NamedTuple):
+    key: str
+    lease_id: str
+
+
+class LeaseBackend:
+    """Contract of a coordination store.  All methods are blocking.
+
+    acquire: grant a lease on `key` if fewer than `limit` unexpired leases
+             are held on it (expired ones do not count), atomically across
+             processes; None when the key is full.
+    renew:   push the lease's expiry `ttl_s` from now; False when it has
+             already expired (the slot may have been handed to someone else).
+    release: drop the lease (no-op when already gone).
+    """
+
+    def acquire(self, key: str, limit: int, ttl_s: float) -> Optional[Lease]:
+        raise NotImplementedError
+
+    def renew(self, lease: Lease, ttl_s: float) -> bool:
+        raise NotImplementedError
+
+    def release(self, lease: Lease) -> None:
+        raise NotImplementedError
+
+
+class SqliteLeaseBackend(LeaseBackend):
+    """Leases in a SQLite file; BEGIN IMMEDIATE serializes writers across processes."""
+
+    def __init__(self, path: str, *, clock: Callable[[], float] = time.time):
+        self._path = path
+        # Wall clock, not monotonic: expiries are compared across processes.
+        self._clock = clock
+        self._holder = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        db = self._connect()
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT NOT NULL, lease_id TEXT PRIMARY KEY, "
+                       "holder TEXT NOT NULL, expires_at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS leases_key ON leases (key, expires_at)")
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per operation: callers come from any thread.
+        # Autocommit mode; acquire() opens its own write transaction.
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def acquire(self, key: str, limit: int, ttl_s: float) -> Optional[Lease]:
+        now = self._clock()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+            (held,) = db.execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()
+            if held >= limit:
+                db.execute("COMMIT")
+                return None
+            lease = Lease(key, uuid.uuid4().hex)
+            db.execute("INSERT INTO leases VALUES (?, ?, ?, ?)", (key, lease.lease_id, self._holder, now + ttl_s))
+            db.execute("COMMIT")
+            return lease
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def renew(self, lease: Lease, ttl_s: float) -> bool:
+        now = self._clock()
+        db = self._connect()
+        try:
+            cur = db.execute("UPDATE leases SET expires_at = ? WHERE lease_id = ? AND expires_at > ?",
+                             (now + ttl_s, lease.lease_id, now))
+            return cur.rowcount == 1
+        finally:
+            db.close()
+
+    def release(self, lease: Lease) -> None:
+        db = self._connect()
+        try:
+            db.execute("DELETE FROM leases WHERE lease_id = ?", (lease.lease_id,))
+        finally:
+            db.close()
+
+
+def build_lease_backend(cfg: BridgeConfig, log: logging.Logger) -> Optional[LeaseBackend]:
+    """The configured backend, or None when COORDINATION_BACKEND is unset."""
+    spec = cfg.coordination_backend.strip()
+    if not spec:
+        return None
+    if spec == "sqlite":
+        log.info("[Coord] sqlite lease backend path=%s leaseTtlS=%.0f",
+                 cfg.coordination_sqlite_path, cfg.coordination_lease_ttl_s)
+        return SqliteLeaseBackend(cfg.coordination_sqlite_path)
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise SystemExit(f"COORDINATION_BACKEND={spec!r}: expected 'sqlite' or 'package.module:factory'")
+    factory = getattr(importlib.import_module(module_name), attr)
+    log.info("[Coord] lease backend %s leaseTtlS=%.0f", spec, cfg.coordination_lease_ttl_s)
+    return factory(cfg)
+
+
+class CallSlotLeases:
+    """Per-country call-slot leases held by this worker for its running calls."""
+
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, backend: LeaseBackend):
+        self._cfg = cfg
+        self._log = log
+        self._backend = backend
+        self._ttl_s = cfg.coordination_lease_ttl_s
+        self._held: Dict[str, Lease] = {}
+        # Messages handed back because their country was at its cluster cap.
+        self.denied = 0
+
+    @staticmethod
+    def applies(profile: CountryProfile) -> bool:
+        return profile.cluster_max_concurrent_calls > 0
+
+    async def acquire(self, profile: CountryProfile) -> Optional[Lease]:
+        """A slot for the profile's country, None when the cluster cap is reached."""
+        lease = await asyncio.to_thread(self._backend.acquire, f"slots:{profile.country_code}",
+                                        profile.cluster_max_concurrent_calls, self._ttl_s)
+        if lease is None:
+            self.denied += 1
+        else:
+            self._held[lease.lease_id] = lease
+        return lease
+
+    async def release(self, lease: Lease) -> None:
+        self._held.pop(lease.lease_id, None)
+        try:
+            await asyncio.to_thread(self._backend.release, lease)
+        except Exception:
+            # It expires on its own after one TTL.
+            self._log.warning("[Coord] lease release failed key=%s", lease.key, exc_info=True)
+
+    async def renew_all(self) -> None:
+        for lease in list(self._held.values()):
+            try:
+                renewed = await asyncio.to_thread(self._backend.renew, lease, self._ttl_s)
+            except Exception:
+                self._log.warning("[Coord] lease renewal failed key=%s", lease.key, exc_info=True)
+                continue
+            if not renewed and self._held.pop(lease.lease_id, None) is not None:
+                # The call keeps running; the cluster may briefly be one over.
+                self._log.warning("[Coord] lease expired before renewal key=%s "
+                                  "(backend unreachable for longer than the TTL?)", lease.key)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._ttl_s / 3)
+            await self.renew_all()
+
+    def heartbeat_gauges(self) -> Dict[str, Any]:
+        return {"clusterLeases": len(self._held), "clusterDenied": self.denied}
+
+
+async def acquire_cps_lease(backend: LeaseBackend, profile: CountryProfile, trunk_id: str = "") -> float:
+    """Wait until the trunk (default: the profile's primary) has fewer than
+    SIP_DIAL_CPS_{CC} dials in the last second, cluster-wide; returns the
+    seconds waited."""
+    if profile.sip_dial_cps >= 1:
+        limit, window_s = int(profile.sip_dial_cps), CPS_WINDOW_S
+    else:
+        limit, window_s = 1, CPS_WINDOW_S / profile.sip_dial_cps
+    started = time.monotonic()
+    while await asyncio.to_thread(backend.acquire, f"cps:{trunk_id or profile.sip_trunk_id}", limit, window_s) is None:
+        await asyncio.sleep(CPS_RETRY_S)
+    return time.monotonic() - started
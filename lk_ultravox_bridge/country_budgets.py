@@ -0,0 +1,89 @@
+"""Per-country concurrency budgets inside one SQS worker.
+
+MAX_CONCURRENT_CALLS is global, so a flood of triggers for one country
+could take every slot while another country's calls — on a different
+LiveKit project and trunk — wait behind them.  MAX_CONCURRENT_CALLS_{CC}
+caps each CountryProfile's calls in flight, alongside the global cap.
+
+Both countries share one queue, so a message's country is only known once
+it has been received.  The worker therefore:
+
+- stops polling while every country is at its cap (nothing it could pull
+  would be runnable);
+- peeks at each received message's destination and, when that country is
+  full, hands the message back to the queue instead of holding it: a
+  message parked in memory would keep its visibility clock running, and
+  would hold one of the global slots the other country needs.  The
+  hand-back counts as a receive for the redrive policy, so its delay
+  starts at COUNTRY_FULL_RETRY_S and grows with the message's receive
+  count (15s, 1 min, 4 min, 16 min, ...): a flood that keeps a country
+  full for minutes is spread out instead of DLQ'd.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from .budgets import split_budget
+from .config import BridgeConfig, CountryProfile
+from .message_models import TriggerCallMessageParser
+
+# Visibility given back to a message whose country is at its cap, on its
+# first receive: long enough for a call slot to free up, short next to the
+# 5-minute retry.  Later hand-backs grow it (hand_back_delay_s).
+COUNTRY_FULL_RETRY_S = 15
+
+
+class CountryBudgets:
+    def __init__(self, cfg: BridgeConfig):
+        self._cfg = cfg
+        self._parser = TriggerCallMessageParser()
+        self._in_flight: Dict[str, int] = {p.country_code: 0 for p in cfg.profiles.values()}
+        # Messages handed back because their country was full.
+        self.released = 0
+
+    def cap(self, profile: CountryProfile) -> Optional[int]:
+        """This process's cap for the country, None when only the global cap applies."""
+        if profile.max_concurrent_calls <= 0:
+            return None
+        return split_budget(profile.max_concurrent_calls, self._cfg.worker_count)[self._cfg.worker_index]
+
+    def route(self, body: str) -> Optional[CountryProfile]:
+        """The profile a message would dial through, None when it does not parse.
+
+        An unparseable message is left to the processor, which fails it the
+        usual way (bad payload -> retried, then DLQ).
+        """
+        try:
+            msg = self._parser.parse(json.loads(body))
+            return self._cfg.route_profile(msg.primary_phone_number())
+        except Exception:
+            return None
+
+    def calls(self, profile: CountryProfile) -> int:
+        return self._in_flight.get(profile.country_code, 0)
+
+    def has_room(self, profile: CountryProfile) -> bool:
+        cap = self.cap(profile)
+        return cap is None or self.calls(profile) < cap
+
+    def all_full(self) -> bool:
+        """True when no country could take another call (so don't poll)."""
+        return all(not self.has_room(p) for p in self._cfg.profiles.values())
+
+    def acquire(self, profile: CountryProfile) -> None:
+        self._in_flight[profile.country_code] = self.calls(profile) + 1
+
+    def release(self, profile: CountryProfile) -> None:
+        self._in_flight[profile.country_code] -= 1
+
+    def heartbeat_gauges(self) -> Dict[str, Any]:
+        gauges: Dict[str, Any] = {f"calls{cc}": n for cc, n in sorted(self._in_flight.items())}
+        gauges["countryReleased"] = self.released
+        return gauges
+
+
+def format_country_fields(gauges: Dict[str, Any]) -> str:
+    """` callsBR=.. callsCL=.. countryReleased=..` heartbeat fields."""
+    calls = "".join(f" {k}={v}" for k, v in gauges.items() if k.startswith("calls") and k[5:].isupper())
+    return f"{calls} countryReleased={gauges['countryReleased']}"
@@ -0,0 +1,218 @@
+"""Negative cache of dial outcomes: numbers known to be unreachable.
+
+A number that came back invalid-number is dialed again on the next
+campaign run, paying room connect, Ultravox call creation and a trunk
+attempt for the same answer.  With NEGATIVE_CACHE_TTLS set (per-reason
+TTLs, e.g. "invalid-number:2592000,unavailable:3600"), every
+CallNotAnsweredError with a listed reason is recorded under the dialed
+number, and the processor looks the number up before connecting to
+LiveKit: a cached number is settled as CALL_NOT_ANSWERED with the cached
+reason and never dialed (or skipped, with PHONE_FALLBACK_REASONS, in
+favour of the contact's next number).
+
+Backends (NEGATIVE_CACHE_BACKEND), each bounded to
+NEGATIVE_CACHE_MAX_ENTRIES numbers:
+
+- `sqlite` (default): a file that survives restarts and is shared by every
+  process on the host (NEGATIVE_CACHE_SQLITE_PATH); when full, the entries
+  closest to expiry are evicted first;
+- `memory`: a per-process LRU, lost on restart; when full, the least
+  recently looked-up or recorded number is evicted first.
+
+A store failure never blocks a call: the number is dialed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import BridgeConfig
+from .livekit_client import SIP_UNREACHABLE_REASONS, CallNotAnsweredError
+
+# number -> (reason, sipStatus or None)
+Outcome = Tuple[str, Optional[int]]
+
+
+def parse_reason_ttls(spec: str) -> Dict[str, float]:
+    """NEGATIVE_CACHE_TTLS "reason:seconds,..." -> {reason: ttl_s}.
+
+    Only SIP-derived reasons: a dial-timeout is the worker's own guard and
+    says nothing about the number, so it must never keep one from being
+    dialed.
+    """
+    ttls: Dict[str, float] = {}
+    for item in (i.strip() for i in spec.split(",")):
+        if not item:
+            continue
+        reason, _, seconds = item.partition(":")
+        reason = reason.strip()
+        if reason == "dial-timeout":
+            raise ValueError("NEGATIVE_CACHE_TTLS: dial-timeout is not a SIP outcome and cannot be cached")
+        if reason not in SIP_UNREACHABLE_REASONS:
+            raise SystemExit(f"NEGATIVE_CACHE_TTLS: unknown reason {reason!r}; "
+                             f"expected {', '.join(sorted(SIP_UNREACHABLE_REASONS))}")
+        try:
+            ttl_s = float(seconds)
+        except ValueError:
+            raise SystemExit(f"NEGATIVE_CACHE_TTLS: bad TTL in {item!r} (expected reason:seconds)") from None
+        if ttl_s <= 0:
+            raise SystemExit(f"NEGATIVE_CACHE_TTLS: TTL must be > 0 in {item!r}")
+        ttls[reason] = ttl_s
+    return ttls
+
+
+class DialOutcomeStore:
+    """Contract of a store.  Methods are synchronous; `blocking` stores
+    (database, network) are called from a thread.
+
+    get: the unexpired outcome of each of `numbers` that has one.
+    put: record `number`'s outcome for `ttl_s`.
+    """
+
+    blocking = False
+
+    def get(self, numbers: List[str]) -> Dict[str, Outcome]:
+        raise NotImplementedError
+
+    def put(self, number: str, outcome: Outcome, ttl_s: float) -> None:
+        raise NotImplementedError
+
+
+class MemoryDialOutcomeStore(DialOutcomeStore):
+    """LRU of numbers; shared by every loop shard of the process."""
+
+    def __init__(self, max_entries: int, *, clock: Callable[[], float] = time.monotonic):
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Outcome, float]]" = OrderedDict()
+
+    def get(self, numbers: List[str]) -> Dict[str, Outcome]:
+        now = self._clock()
+        found: Dict[str, Outcome] = {}
+        with self._lock:
+            for number in numbers:
+                entry = self._entries.get(number)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del self._entries[number]
+                    continue
+                self._entries.move_to_end(number)
+                found[number] = entry[0]
+        return found
+
+    def put(self, number: str, outcome: Outcome, ttl_s: float) -> None:
+        with self._lock:
+            self._entries[number] = (outcome, self._clock() + ttl_s)
+            self._entries.move_to_end(number)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteDialOutcomeStore(DialOutcomeStore):
+    """Outcomes in a SQLite file: survives restarts, shared across processes."""
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, *, clock: Callable[[], float] = time.time):
+        self._path = path
+        self._max_entries = max(1, max_entries)
+        # Wall clock, not monotonic: expiries outlive the process.
+        self._clock = clock
+        db = self._connect()
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS dial_outcomes (number TEXT PRIMARY KEY, reason TEXT NOT NULL, "
+                       "sip_status INTEGER, expires_at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS dial_outcomes_expiry ON dial_outcomes (expires_at)")
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per operation: callers come from any thread.
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def get(self, numbers: List[str]) -> Dict[str, Outcome]:
+        if not numbers:
+            return {}
+        db = self._connect()
+        try:
+            rows = db.execute(
+                f"SELECT number, reason, sip_status FROM dial_outcomes WHERE expires_at > ? "
+                f"AND number IN ({','.join('?' * len(numbers))})",
+                (self._clock(), *numbers),
+            ).fetchall()
+        finally:
+            db.close()
+        return {number: (reason, sip_status) for number, reason, sip_status in rows}
+
+    def put(self, number: str, outcome: Outcome, ttl_s: float) -> None:
+        now = self._clock()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM dial_outcomes WHERE expires_at <= ?", (now,))
+            db.execute("INSERT OR REPLACE INTO dial_outcomes VALUES (?, ?, ?, ?)",
+                       (number, outcome[0], outcome[1], now + ttl_s))
+            (count,) = db.execute("SELECT COUNT(*) FROM dial_outcomes").fetchone()
+            if count > self._max_entries:
+                db.execute("DELETE FROM dial_outcomes WHERE number IN (SELECT number FROM dial_outcomes "
+                           "ORDER BY expires_at LIMIT ?)", (count - self._max_entries,))
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+
+class NegativeDialCache:
+    """Async face of a store for the processor."""
+
+    def __init__(self, cfg: BridgeConfig, store: DialOutcomeStore):
+        self.ttls = parse_reason_ttls(cfg.negative_cache_ttls)
+        self._store = store
+
+    async def _call(self, fn, *args):
+        if self._store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def lookup(self, numbers: List[str]) -> Dict[str, CallNotAnsweredError]:
+        """The cached outcome of each known-unreachable number in `numbers`."""
+        found = await self._call(self._store.get, list(numbers))
+        return {number: CallNotAnsweredError(reason, sip_status) for number, (reason, sip_status) in found.items()}
+
+    async def record(self, number: str, error: CallNotAnsweredError) -> None:
+        ttl_s = self.ttls.get(error.reason)
+        if ttl_s is not None:
+            await self._call(self._store.put, number, (error.reason, error.sip_status), ttl_s)
+
+
+def build_negative_dial_cache(cfg: BridgeConfig, log: logging.Logger) -> Optional[NegativeDialCache]:
+    """The configured cache, or None when NEGATIVE_CACHE_TTLS is unset."""
+    if not cfg.negative_cache_ttls.strip():
+        return None
+    parse_reason_ttls(cfg.negative_cache_ttls)  # fail at startup, before any store is opened
+    backend = cfg.negative_cache_backend.strip().lower()
+    if backend == "sqlite":
+        store: DialOutcomeStore = SqliteDialOutcomeStore(cfg.negative_cache_sqlite_path,
+                                                         cfg.negative_cache_max_entries)
+        where = f"sqlite path={cfg.negative_cache_sqlite_path}"
+    elif backend == "memory":
+        store = MemoryDialOutcomeStore(cfg.negative_cache_max_entries)
+        where = "memory"
+    else:
+        raise SystemExit(f"NEGATIVE_CACHE_BACKEND={cfg.negative_cache_backend!r}: expected sqlite or memory")
+    log.info("[SQS] negative dial cache %s maxEntries=%d ttls=%s",
+             where, cfg.negative_cache_max_entries, cfg.negative_cache_ttls)
+    return NegativeDialCache(cfg, store)
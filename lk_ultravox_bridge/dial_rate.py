@@ -0,0 +1,102 @@
+"""Per-trunk calls-per-second pacing for SIP dial-out.
+
+Carriers enforce a CPS limit per trunk and answer the excess with 503s,
+which would turn a burst of TRIGGER_CALLs into SIP_CALL_FAILED events and
+5-minute visibility retries.  Dials are paced with a token bucket per
+`CountryProfile.sip_trunk_id` (SIP_DIAL_CPS_{CC} tokens/s, up to
+SIP_DIAL_BURST_{CC} at once): a dial over the limit waits for its turn
+instead of being sent and rejected.
+
+One limiter per worker process, shared by every call (and every loop
+shard — buckets are guarded by a thread lock, the wait is an asyncio
+sleep on the caller's own loop).  Under the multi-process supervisor each
+child paces at its `sip_dial_rate_share` of the trunk's rate — unless a
+COORDINATION_BACKEND is configured, in which case every worker draws from
+the trunk's cluster-wide CPS window instead (see coordination).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .config import BridgeConfig, CountryProfile
+from .coordination import LeaseBackend, acquire_cps_lease
+
+
+class TokenBucket:
+    """Reservation-style token bucket: every caller gets a place in line.
+
+    `reserve()` takes a token immediately and returns how long the caller
+    must wait before using it; the balance going negative is the queue.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token; seconds to wait before it is valid (0 = go now)."""
+        self._refill()
+        self._tokens -= 1.0
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Give back a reserved token the caller will not use (cancelled wait)."""
+        self._refill()
+        self._tokens = min(float(self.burst), self._tokens + 1.0)
+
+
+class TrunkDialRateLimiter:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, *, clock: Callable[[], float] = time.monotonic,
+                 backend: Optional[LeaseBackend] = None):
+        self._cfg = cfg
+        self._log = log
+        self._backend = backend
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, profile: CountryProfile, trunk_id: str) -> TokenBucket:
+        bucket = self._buckets.get(trunk_id)
+        if bucket is None:
+            rate = profile.sip_dial_cps * self._cfg.sip_dial_rate_share
+            bucket = TokenBucket(rate, profile.sip_dial_burst, self._clock)
+            self._buckets[trunk_id] = bucket
+            self._log.info("[LiveKit][SIP] dial pacing trunk=%s country=%s cps=%.2f burst=%d",
+                           trunk_id, profile.country_code, rate, bucket.burst)
+        return bucket
+
+    async def acquire(self, profile: CountryProfile, trunk_id: Optional[str] = None) -> float:
+        """Wait for the trunk's next dial slot; returns the seconds waited.
+
+        `trunk_id` defaults to the profile's primary trunk; a failover trunk
+        is paced at the same SIP_DIAL_CPS_{CC} in a bucket of its own.  A
+        profile without SIP_DIAL_CPS_{CC} is not paced.
+        """
+        if profile.sip_dial_cps <= 0:
+            return 0.0
+        trunk_id = trunk_id or profile.sip_trunk_id
+        if self._backend is not None:
+            return await acquire_cps_lease(self._backend, profile, trunk_id)
+        with self._lock:
+            bucket = self._bucket(profile, trunk_id)
+            wait_s = bucket.reserve()
+        if wait_s > 0:
+            try:
+                await asyncio.sleep(wait_s)
+            except asyncio.CancelledError:
+                with self._lock:
+                    bucket.refund()
+                raise
+        return wait_s
@@ -0,0 +1,115 @@
+"""Dedicated thread pools for the worker's blocking (boto3) I/O.
+
+`asyncio.to_thread` runs everything on the loop's default executor
+(min(32, cpus + 4) threads), shared by three very different jobs:
+
+- poll:    SQS long polls — each one holds a thread for up to 20 s;
+- ack:     SQS deletes — the point of no return of an answered call;
+- publish: CALL_HISTORY sends — best-effort, bursty (several per call).
+
+Under load a burst of publishes (or a slow SQS endpoint) queues behind the
+same threads an ack needs, and a delayed ack is a redelivered — redialed —
+call.  IoExecutors gives each class its own bounded pool, so an ack never
+waits behind a publish, and measures per class how many jobs are waiting
+for a thread and how long they waited (heartbeat fields).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from .config import BridgeConfig
+from .loop_monitor import SampleWindow
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """A ThreadPoolExecutor for one I/O class, with queue-depth and wait metrics.
+
+    Safe to await from any event loop (loop shards publish through the same
+    pool as the main loop).
+    """
+
+    def __init__(self, name: str, max_workers: int, *, clock: Callable[[], float] = time.perf_counter):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"io-{name}")
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Jobs submitted but not yet picked up by a thread.
+        self._queued = 0
+        # Seconds each job waited for a thread.
+        self.waits = SampleWindow()
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _adjust(self, delta: int) -> None:
+        with self._lock:
+            self._queued += delta
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Like asyncio.to_thread(fn, ...), on this class's pool."""
+        submitted = self._clock()
+        ctx = contextvars.copy_context()
+
+        def job() -> T:
+            self._adjust(-1)
+            self.waits.add(self._clock() - submitted)
+            return ctx.run(fn, *args, **kwargs)
+
+        self._adjust(1)
+        future: Future = self._pool.submit(job)
+        # A job cancelled before a thread picked it up never runs job().
+        future.add_done_callback(lambda f: self._adjust(-1) if f.cancelled() else None)
+        return await asyncio.wrap_future(future)
+
+    def heartbeat_gauges(self, window_s: float) -> Dict[str, Any]:
+        return {
+            f"{self.name}Queue": self._queued,
+            f"{self.name}WaitP99Ms": self.waits.percentile(99, window_s) * 1000.0,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class IoExecutors:
+    """The worker's three I/O pools, sized from SQS_POLL_THREADS,
+    SQS_ACK_THREADS and CALL_HISTORY_PUBLISH_THREADS."""
+
+    def __init__(self, cfg: BridgeConfig):
+        self.poll = BoundedExecutor("poll", cfg.sqs_poll_threads)
+        self.ack = BoundedExecutor("ack", cfg.sqs_ack_threads)
+        self.publish = BoundedExecutor("publish", cfg.call_history_publish_threads)
+
+    def heartbeat_gauges(self, window_s: float) -> Dict[str, Any]:
+        gauges: Dict[str, Any] = {}
+        for executor in (self.poll, self.ack, self.publish):
+            gauges.update(executor.heartbeat_gauges(window_s))
+        return gauges
+
+    def shutdown(self) -> None:
+        """Blocking: run it off the loop (asyncio.to_thread)."""
+        # The worker loop's drain has already waited out the last long poll
+        # and handed its messages back, so nothing is left to run here.  The
+        # threads are not daemons: exit would still join a stuck one.
+        self.poll.shutdown(wait=False)
+        # Pending deletes and CALL_HISTORY events still go out.
+        self.ack.shutdown(wait=True)
+        self.publish.shutdown(wait=True)
+
+
+def format_io_fields(gauges: Dict[str, Any]) -> str:
+    """` pollQueue=.. pollWaitP99Ms=.. ackQueue=.. ...` heartbeat fields."""
+    return (
+        f" pollQueue={gauges['pollQueue']} pollWaitP99Ms={gauges['pollWaitP99Ms']:.1f}"
+        f" ackQueue={gauges['ackQueue']} ackWaitP99Ms={gauges['ackWaitP99Ms']:.1f}"
+        f" publishQueue={gauges['publishQueue']} publishWaitP99Ms={gauges['publishWaitP99Ms']:.1f}"
+    )
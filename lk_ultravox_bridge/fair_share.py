@@ -0,0 +1,152 @@
+"""Tenant/campaign fair share of call slots within a queue (FAIR_SHARE_KEY).
+
+Slots otherwise go to messages in arrival order: a tenant that enqueues
+10k triggers takes every worker until its backlog drains, and everyone
+else's calls wait behind it.  With FAIR_SHARE_KEY set, each poll receives
+a look-ahead batch, groups it by tenantId and/or campaignId ("flows") and
+starts as many messages as there are free slots, deficit-round-robin
+across the flows: each flow gets a quantum per turn, each call costs one,
+and the round resumes where the previous batch left off.  A flow absent
+from a batch leaves the round and loses its deficit, so it cannot save up
+a burst.
+
+Messages not started are released at once (visibility 0) rather than held
+in memory with their visibility clock running.  Like a country hand-back,
+a release counts as a receive for the redrive policy, so releases are kept
+few:
+
+- the batch is the free slots plus LOOKAHEAD_MARGIN (at most
+  FAIR_SHARE_LOOKAHEAD, up to SQS's 10 messages);
+- after a batch with a single flow there is nothing to be fair between:
+  polls take just the free slots' worth, and look ahead again every
+  SINGLE_FLOW_PROBE_EVERY polls to notice a new flow;
+- a message one receive short of SQS_MAX_RECEIVE_COUNT goes first within
+  its flow and, if still not started, is handed back with a growing delay
+  instead of at once.
+"""
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+
+from .config import BridgeConfig
+from .message_models import TriggerCallMessageParser
+from .sqs_consumer import hand_back_delay_s, receive_count
+
+FAIR_SHARE_KEYS = ("tenant", "campaign")
+# ReceiveMessage's MaxNumberOfMessages ceiling.
+SQS_MAX_BATCH = 10
+# Flow of a message whose tenant/campaign cannot be read (bad payload: the
+# processor fails it the usual way).
+UNKNOWN_FLOW = "-"
+# Messages received beyond the free slots, to see the other flows.
+LOOKAHEAD_MARGIN = 2
+# Polls between look-aheads while batches hold a single flow.
+SINGLE_FLOW_PROBE_EVERY = 8
+# First hand-back delay of a message close to the redrive limit.
+AT_RISK_RETRY_S = 15
+
+T = TypeVar("T")
+
+
+class DeficitRoundRobin:
+    """DRR over flows of unit-cost items; the round persists between batches."""
+
+    def __init__(self, quantum: float = 1.0):
+        self._quantum = quantum
+        # Flows in round order -> deficit.
+        self._deficit: "OrderedDict[str, float]" = OrderedDict()
+        # Flow whose turn was cut short by the previous batch filling up.
+        self._turn: Optional[str] = None
+
+    def pick(self, backlog: Dict[str, List[T]], n: int) -> List[T]:
+        """Up to `n` items from `backlog` (flow -> items, oldest first)."""
+        for key in [k for k in self._deficit if not backlog.get(k)]:
+            del self._deficit[key]
+            if key == self._turn:
+                self._turn = None
+        pending = {k: list(v) for k, v in backlog.items() if v}
+        for key in pending:
+            self._deficit.setdefault(key, 0.0)
+
+        picked: List[T] = []
+        while len(picked) < n and pending:
+            key = next(iter(self._deficit))
+            items = pending.get(key)
+            if items is None:  # already drained in this batch
+                self._deficit.move_to_end(key)
+                continue
+            if self._turn != key:
+                self._deficit[key] += self._quantum
+                self._turn = key
+            while items and self._deficit[key] >= 1 and len(picked) < n:
+                picked.append(items.pop(0))
+                self._deficit[key] -= 1
+            if items and self._deficit[key] >= 1:
+                break  # batch full mid-turn: the next batch resumes it
+            self._turn = None
+            if not items:
+                del pending[key]
+                self._deficit[key] = 0.0
+            self._deficit.move_to_end(key)
+        return picked
+
+
+class FairShare:
+    def __init__(self, cfg: BridgeConfig):
+        self._fields = [f.strip() for f in cfg.fair_share_key.split(",") if f.strip()]
+        unknown = [f for f in self._fields if f not in FAIR_SHARE_KEYS]
+        if not self._fields or unknown:
+            raise SystemExit(f"FAIR_SHARE_KEY={cfg.fair_share_key!r}: expected tenant, campaign or tenant,campaign")
+        self.lookahead = max(1, min(SQS_MAX_BATCH, cfg.fair_share_lookahead))
+        self._max_receives = cfg.sqs_max_receive_count
+        self._parser = TriggerCallMessageParser()
+        self._drr = DeficitRoundRobin()
+        # Consecutive batches with a single flow.
+        self._single_flow_batches = 0
+        # Messages received in a batch but released unstarted.
+        self.released = 0
+
+    def flow(self, body: str) -> str:
+        try:
+            msg = self._parser.parse(json.loads(body))
+        except Exception:
+            return UNKNOWN_FLOW
+        values = {"tenant": msg.tenant_id, "campaign": msg.metadata.campaign_id}
+        return "/".join(values[f] or UNKNOWN_FLOW for f in self._fields)
+
+    def batch_size(self, free_slots: int) -> int:
+        """Messages to receive for `free_slots` free call slots."""
+        margin = 0 if self._single_flow_batches % SINGLE_FLOW_PROBE_EVERY else LOOKAHEAD_MARGIN
+        return max(1, min(self.lookahead, free_slots + margin))
+
+    def at_risk(self, m: Any) -> bool:
+        """One more receive and the redrive policy DLQs `m`."""
+        return receive_count(m) >= self._max_receives - 1
+
+    def release_delay_s(self, m: Any) -> int:
+        """Visibility for a released message: at once, unless it is at risk."""
+        return hand_back_delay_s(AT_RISK_RETRY_S, receive_count(m)) if self.at_risk(m) else 0
+
+    def split(self, msgs: List[T], free_slots: int) -> Tuple[List[T], List[T], Dict[str, int]]:
+        """(messages to start, messages to release, batch size per flow)."""
+        backlog: Dict[str, List[T]] = {}
+        for m in msgs:
+            backlog.setdefault(self.flow(m.body), []).append(m)
+        # Within a flow, messages close to the DLQ go first (stable otherwise).
+        picks = {k: sorted(v, key=lambda m: not self.at_risk(m)) for k, v in backlog.items()}
+        start = self._drr.pick(picks, free_slots)
+        started = {id(m) for m in start}
+        release = [m for m in msgs if id(m) not in started]
+        self.released += len(release)
+        self._single_flow_batches = self._single_flow_batches + 1 if len(backlog) == 1 else 0
+        return start, release, {k: len(v) for k, v in backlog.items()}
+
+    def heartbeat_gauges(self) -> Dict[str, Any]:
+        return {"fairReleased": self.released}
+
+
+def build_fair_share(cfg: BridgeConfig) -> Optional[FairShare]:
+    """The scheduler, or None when FAIR_SHARE_KEY is unset."""
+    return FairShare(cfg) if cfg.fair_share_key.strip() else None
@@ -0,0 +1,193 @@
+"""Idempotency store: a TRIGGER_CALL is dialed at most once per `id`.
+
+The message is acked at answer (or at a not-answered outcome); when that
+SQS delete fails, the message comes back after its visibility timeout and
+the same person would be called again.  The processor therefore records
+each trigger id before any RTC or REST work:
+
+- claim:    the id is being dialed (in-progress, CLAIM_TTL_S) — a crash
+            mid-dial leaves no lasting mark, the claim expires when the
+            message becomes visible again;
+- complete: the outcome is final (answered / not answered): a redelivery
+            within IDEMPOTENCY_TTL_S is acked and skipped;
+- release:  a retryable failure before answer; the retry dials normally.
+
+Backends (IDEMPOTENCY_BACKEND):
+
+- `memory` (default): a per-process LRU (IDEMPOTENCY_MAX_ENTRIES) —
+  catches redeliveries landing on the same worker process;
+- `sqlite`: a SQLite file shared by every process on the host
+  (IDEMPOTENCY_SQLITE_PATH) — use it with WORKER_PROCESSES > 1;
+- `off`: no check.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from .config import BridgeConfig
+
+IN_PROGRESS = "in-progress"
+DONE = "done"
+# Lifetime of an in-progress claim: the visibility timeout the worker
+# receives messages with, so a crashed worker's claim expires exactly when
+# its message can be delivered again.
+CLAIM_TTL_S = 300.0
+
+
+class IdempotencyStore:
+    """Contract of a store.  Methods are synchronous; `blocking` stores
+    (database, network) are called from a thread.
+
+    claim:    mark `key` in-progress unless it already has an unexpired
+              entry; returns None when claimed, else the existing state.
+    complete: mark `key` done for `ttl_s`.
+    release:  drop an in-progress claim (a done entry is kept).
+    """
+
+    blocking = False
+
+    def claim(self, key: str, ttl_s: float) -> Optional[str]:
+        raise NotImplementedError
+
+    def complete(self, key: str, ttl_s: float) -> None:
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """LRU of trigger ids; shared by every loop shard of the process."""
+
+    def __init__(self, max_entries: int, *, clock: Callable[[], float] = time.monotonic):
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _put(self, key: str, state: str, ttl_s: float) -> None:
+        self._entries[key] = (state, self._clock() + ttl_s)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def claim(self, key: str, ttl_s: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self._clock():
+                return entry[0]
+            self._put(key, IN_PROGRESS, ttl_s)
+            return None
+
+    def complete(self, key: str, ttl_s: float) -> None:
+        with self._lock:
+            self._put(key, DONE, ttl_s)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == IN_PROGRESS:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteIdempotencyStore(IdempotencyStore):
+    """Trigger ids in a SQLite file; BEGIN IMMEDIATE serializes claims across processes."""
+
+    blocking = True
+
+    def __init__(self, path: str, *, clock: Callable[[], float] = time.time):
+        self._path = path
+        # Wall clock, not monotonic: expiries are compared across processes.
+        self._clock = clock
+        db = self._connect()
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS triggers (key TEXT PRIMARY KEY, state TEXT NOT NULL, "
+                       "expires_at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS triggers_expiry ON triggers (expires_at)")
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per operation: callers come from any thread.
+        return sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+
+    def claim(self, key: str, ttl_s: float) -> Optional[str]:
+        now = self._clock()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM triggers WHERE expires_at <= ?", (now,))
+            row = db.execute("SELECT state FROM triggers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                db.execute("INSERT INTO triggers VALUES (?, ?, ?)", (key, IN_PROGRESS, now + ttl_s))
+            db.execute("COMMIT")
+            return None if row is None else row[0]
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def complete(self, key: str, ttl_s: float) -> None:
+        db = self._connect()
+        try:
+            db.execute("INSERT OR REPLACE INTO triggers VALUES (?, ?, ?)", (key, DONE, self._clock() + ttl_s))
+        finally:
+            db.close()
+
+    def release(self, key: str) -> None:
+        db = self._connect()
+        try:
+            db.execute("DELETE FROM triggers WHERE key = ? AND state = ?", (key, IN_PROGRESS))
+        finally:
+            db.close()
+
+
+class TriggerIdempotency:
+    """Async face of a store for the processor."""
+
+    def __init__(self, cfg: BridgeConfig, store: IdempotencyStore):
+        self._ttl_s = cfg.idempotency_ttl_s
+        self._store = store
+
+    async def _call(self, fn, *args):
+        if self._store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def claim(self, trigger_id: str) -> Optional[str]:
+        return await self._call(self._store.claim, trigger_id, CLAIM_TTL_S)
+
+    async def complete(self, trigger_id: str) -> None:
+        await self._call(self._store.complete, trigger_id, self._ttl_s)
+
+    async def release(self, trigger_id: str) -> None:
+        await self._call(self._store.release, trigger_id)
+
+
+def build_trigger_idempotency(cfg: BridgeConfig, log: logging.Logger) -> Optional[TriggerIdempotency]:
+    """The configured store, or None when IDEMPOTENCY_BACKEND=off."""
+    backend = cfg.idempotency_backend.strip().lower()
+    if backend == "off":
+        return None
+    if backend == "memory":
+        store: IdempotencyStore = MemoryIdempotencyStore(cfg.idempotency_max_entries)
+        log.info("[SQS] idempotency store memory maxEntries=%d ttlS=%.0f",
+                 cfg.idempotency_max_entries, cfg.idempotency_ttl_s)
+    elif backend == "sqlite":
+        store = SqliteIdempotencyStore(cfg.idempotency_sqlite_path)
+        log.info("[SQS] idempotency store sqlite path=%s ttlS=%.0f",
+                 cfg.idempotency_sqlite_path, cfg.idempotency_ttl_s)
+    else:
+        raise SystemExit(f"IDEMPOTENCY_BACKEND={cfg.idempotency_backend!r}: expected memory, sqlite or off")
+    return TriggerIdempotency(cfg, store)
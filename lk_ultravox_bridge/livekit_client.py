@@ -3,13 +3,15 @@ from __future__ import annotations
 import re
 import time
 import logging
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional, Sequence
 
+import aiohttp
 from livekit import rtc
 import livekit.api as api
 
-from .config import BridgeConfig, CountryProfile
+from .config import BridgeConfig, CountryProfile, SipTrunk
 
 
 class CallNotAnsweredError(Exception):
@@ -23,6 +25,8 @@ class CallNotAnsweredError(Exception):
         super().__init__(f"call not completed: {reason} (sipStatus={sip_status})")
         self.reason = reason
         self.sip_status = sip_status
+        # The trunk that carried the unanswered leg, set by dial_out.
+        self.trunk: Optional[SipTrunk] = None
 
 
 # SIP status -> unreachable-callee category.  Only 408 has been observed in
@@ -38,6 +42,11 @@ _UNREACHABLE_SIP_STATUS = {
     404: "invalid-number",
     484: "invalid-number",  # Address Incomplete
 }
+# Reasons the callee's network answered with; only these say something
+# about the number itself.
+SIP_UNREACHABLE_REASONS = frozenset(_UNREACHABLE_SIP_STATUS.values())
+# Every CallNotAnsweredError reason (dial-timeout = the worker's own guard).
+UNREACHABLE_REASONS = SIP_UNREACHABLE_REASONS | {"dial-timeout"}
 
 
 def extract_sip_status(exc: Exception) -> Optional[int]:
@@ -63,6 +72,17 @@ def extract_sip_status(exc: Exception) -> Optional[int]:
     return None
 
 
+# SIP responses of a trunk rejecting our credentials / source (the carrier
+# leg is misconfigured, not the callee): failover material, like 5xx.
+_TRUNK_AUTH_SIP_STATUS = {401, 403, 407}
+
+
+def is_trunk_failure(exc: Exception) -> bool:
+    """A dial failure another trunk may not have: SIP 5xx or trunk auth."""
+    sip_status = extract_sip_status(exc)
+    return sip_status is not None and (500 <= sip_status < 600 or sip_status in _TRUNK_AUTH_SIP_STATUS)
+
+
 def _classify_dial_failure(exc: Exception) -> Optional[CallNotAnsweredError]:
     """Maps a create_sip_participant failure to an unreachable-callee
     category, or None when it looks like a genuine system error (trunk
@@ -113,17 +133,124 @@ class LiveKitTokenFactory:
         )
 
 
-class LiveKitSipDialer:
-    def __init__(self, log: logging.Logger):
+class LiveKitApiPool:
+    """One long-lived LiveKitAPI client per CountryProfile.
+
+    `async with api.LiveKitAPI(...)` per request opens a new aiohttp session
+    (and a new TLS handshake) twice per call — dial-out and room deletion.
+    The pool creates each profile's client lazily on first use and shares
+    it across concurrent calls; each client gets its own session with a
+    connection cap so one country cannot exhaust sockets for the other.
+    The owner (SQS worker) must `await aclose()` on shutdown.
+    """
+
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger):
+        self._cfg = cfg
         self._log = log
+        self._clients: Dict[CountryProfile, api.LiveKitAPI] = {}
+        self._sessions: Dict[CountryProfile, aiohttp.ClientSession] = {}
+
+    def get(self, profile: CountryProfile) -> api.LiveKitAPI:
+        # No await between lookup and insert: concurrent calls on the same
+        # loop can never race into creating two clients for one profile.
+        client = self._clients.get(profile)
+        if client is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._cfg.livekit_api_max_connections),
+                # The SDK default; dial-out overrides it per request with
+                # its own ringing-aware timeout.
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+            client = api.LiveKitAPI(
+                profile.livekit_url, profile.livekit_api_key, profile.livekit_api_secret, session=session,
+            )
+            self._sessions[profile] = session
+            self._clients[profile] = client
+            self._log.info(
+                "[LiveKit][API] pooled client created country=%s url=%s maxConnections=%d",
+                profile.country_code, profile.livekit_url, self._cfg.livekit_api_max_connections,
+            )
+        return client
+
+    async def aclose(self) -> None:
+        clients, sessions = self._clients, self._sessions
+        self._clients, self._sessions = {}, {}
+        for profile, client in clients.items():
+            try:
+                await client.aclose()
+                await sessions[profile].close()  # custom sessions are never closed by the SDK
+            except Exception:
+                self._log.warning("[LiveKit][API] error closing pooled client country=%s",
+                                  profile.country_code, exc_info=True)
+
+
+@asynccontextmanager
+async def _livekit_api(profile: CountryProfile, pool: Optional[LiveKitApiPool]) -> AsyncIterator[api.LiveKitAPI]:
+    """The profile's pooled client, or a one-shot client when there is no pool (CLI)."""
+    if pool is not None:
+        yield pool.get(profile)
+        return
+    async with api.LiveKitAPI(profile.livekit_url, profile.livekit_api_key, profile.livekit_api_secret) as lk:
+        yield lk
 
-    async def dial_out(self, room_name: str, to_number: str, profile: CountryProfile) -> None:
-        profile.validate()
 
+class LiveKitSipDialer:
+    def __init__(self, log: logging.Logger, api_pool: Optional[LiveKitApiPool] = None, *,
+                 trunk_health=None, dial_limiter=None):
+        self._log = log
+        self._api_pool = api_pool
+        # sip_trunks.TrunkHealth: fed with each trunk's outcome (None = untracked).
+        self._trunk_health = trunk_health
+        # Paces the failover trunks; the caller paces the first one itself.
+        self._dial_limiter = dial_limiter
+
+    async def dial_out(self, room_name: str, to_number: str, profile: CountryProfile,
+                       trunks: Optional[Sequence[SipTrunk]] = None) -> SipTrunk:
+        """Dial `to_number` and wait for the answer; returns the trunk that carried it.
+
+        `trunks` (default: the profile's, primary first) are tried in order:
+        a SIP 5xx or trunk auth failure moves on to the next one at once
+        instead of failing the dial.  Any other failure — including the
+        callee not answering — is raised as is.
+        """
+        profile.validate()
+        trunks = list(trunks or profile.sip_trunks())
+        for i, trunk in enumerate(trunks):
+            if i > 0 and self._dial_limiter is not None:
+                await self._dial_limiter.acquire(profile, trunk.trunk_id)
+            try:
+                await self._dial_trunk(room_name, to_number, profile, trunk)
+            except CallNotAnsweredError as e:
+                self._record(trunk, healthy=True)  # the leg worked; the callee did not answer
+                e.trunk = trunk
+                raise
+            except Exception as e:
+                if not is_trunk_failure(e):
+                    raise
+                self._record(trunk, healthy=False)
+                if i == len(trunks) - 1:
+                    raise
+                self._log.warning(
+                    "[LiveKit][SIP] trunk failover to=%s room=%s failedTrunk=%s sipStatus=%s nextTrunk=%s",
+                    to_number, room_name, trunk.trunk_id, extract_sip_status(e), trunks[i + 1].trunk_id,
+                )
+                continue
+            self._record(trunk, healthy=True)
+            return trunk
+
+    def _record(self, trunk: SipTrunk, healthy: bool) -> None:
+        if self._trunk_health is None:
+            return
+        if healthy:
+            self._trunk_health.record_success(trunk)
+        else:
+            self._trunk_health.record_failure(trunk)
+
+    async def _dial_trunk(self, room_name: str, to_number: str, profile: CountryProfile, trunk: SipTrunk) -> None:
         req = api.CreateSIPParticipantRequest(
-            sip_trunk_id=profile.sip_trunk_id,
+            sip_trunk_id=trunk.trunk_id,
             sip_call_to=to_number,
-            sip_number=profile.sip_from_number,
+            sip_number=trunk.from_number,
             room_name=room_name,
             participant_identity=f"sip-{to_number}",
             participant_name=to_number,
@@ -134,11 +261,11 @@ class LiveKitSipDialer:
         t0 = time.time()
         self._log.info(
             "[LiveKit][SIP] CreateSIPParticipant to=%s trunk=%s from=%s room=%s country=%s",
-            to_number, profile.sip_trunk_id, profile.sip_from_number, room_name, profile.country_code,
+            to_number, trunk.trunk_id, trunk.from_number, room_name, profile.country_code,
         )
 
         try:
-            async with api.LiveKitAPI(profile.livekit_url, profile.livekit_api_key, profile.livekit_api_secret) as lk:
+            async with _livekit_api(profile, self._api_pool) as lk:
                 resp = await lk.sip.create_sip_participant(req)
         except Exception as e:
             not_answered = _classify_dial_failure(e)
@@ -152,9 +279,10 @@ class LiveKitSipDialer:
                 )
                 raise not_answered from e
             self._log.error(
-                "[LiveKit][SIP] failed to create SIP participant to=%s room=%s",
+                "[LiveKit][SIP] failed to create SIP participant to=%s room=%s trunk=%s",
                 to_number,
                 room_name,
+                trunk.trunk_id,
                 exc_info=True,
             )
             raise
@@ -180,14 +308,29 @@ class LiveKitRoomTerminator:
     removes the SIP participant and sends BYE to the trunk.
     """
 
-    def __init__(self, log: logging.Logger):
+    def __init__(self, log: logging.Logger, api_pool: Optional[LiveKitApiPool] = None):
         self._log = log
+        self._api_pool = api_pool
 
-    async def terminate(self, room_name: str, profile: CountryProfile) -> None:
+    async def delete(self, room_name: str, profile: CountryProfile) -> None:
+        """Delete the room, raising on failure (the reaper retries on it).
+
+        A room that is already gone counts as deleted: LiveKit closes the
+        empty room by itself when the callee hangs up first.
+        """
         try:
-            async with api.LiveKitAPI(profile.livekit_url, profile.livekit_api_key, profile.livekit_api_secret) as lk:
+            async with _livekit_api(profile, self._api_pool) as lk:
                 await lk.room.delete_room(api.DeleteRoomRequest(room=room_name))
-            self._log.info("[LiveKit][API] room deleted room=%s", room_name)
+        except Exception as e:
+            if getattr(e, "code", None) != "not_found" and getattr(e, "status", None) != 404:
+                raise
+            self._log.info("[LiveKit][API] room already gone room=%s", room_name)
+            return
+        self._log.info("[LiveKit][API] room deleted room=%s", room_name)
+
+    async def terminate(self, room_name: str, profile: CountryProfile) -> None:
+        try:
+            await self.delete(room_name, profile)
         except Exception:
             # Best-effort: the room may already be gone (callee hung up first
             # and LiveKit closed the empty room).  Teardown failure must never
@@ -33,7 +33,7 @@ class ConfigDumper:
 
         for prefix, profile in c.profiles.items():
             self._log.info(
-                "[%s prefix=%s provider=%s] LIVEKIT_URL=%s WSS=%s API_KEY=%s SIP_TRUNK=%s FROM=%s VOICE=%s LANG=%s",
+                "[%s prefix=%s provider=%s] LIVEKIT_URL=%s WSS=%s API_KEY=%s SIP_TRUNK=%s FROM=%s VOICE=%s LANG=%s DIAL_CPS=%s MAX_CALLS=%s CLUSTER_MAX_CALLS=%s",
                 profile.country_code,
                 prefix,
                 profile.provider,
@@ -44,6 +44,9 @@ class ConfigDumper:
                 profile.sip_from_number,
                 profile.ultravox_voice or "(not set)",
                 profile.language_hint or "(not set)",
+                f"{profile.sip_dial_cps:g} burst={profile.sip_dial_burst}" if profile.sip_dial_cps > 0 else "(unpaced)",
+                profile.max_concurrent_calls or "(global cap)",
+                profile.cluster_max_concurrent_calls or "(none)",
             )
 
         self._log.info("ULTRAVOX_CALLS_URL=%s", c.ultravox_calls_url)
@@ -51,6 +54,15 @@ class ConfigDumper:
         self._log.info("ULTRAVOX_VOICE=%s", c.ultravox_voice)
         self._log.info("SAMPLE_RATE=%d CHANNELS=%d FRAME_MS=%d", c.sample_rate, c.channels, c.frame_ms)
         self._log.info("MAX_CONCURRENT_CALLS=%d", c.max_concurrent_calls)
+        if c.adaptive_concurrency:
+            self._log.info(
+                "ADAPTIVE_CONCURRENCY=on min=%d ceiling=%d intervalS=%.0f loopLagMs=%.0f frameMs=%.1f cpuPct=%.0f",
+                c.adaptive_concurrency_min, c.adaptive_concurrency_max, c.adaptive_concurrency_interval_s,
+                c.adaptive_max_loop_lag_ms, c.adaptive_max_frame_ms, c.adaptive_max_cpu_pct,
+            )
+        if c.coordination_backend:
+            self._log.info("COORDINATION_BACKEND=%s leaseTtlS=%.0f", c.coordination_backend,
+                           c.coordination_lease_ttl_s)
         self._log.info(
             "AWS_REGION=%s AWS_PROFILE=%s AWS_ACCOUNT_ID=%s SQS_QUEUE_NAME=%s",
             c.aws_region,
@@ -0,0 +1,214 @@
+"""Event-loop health signals.
+
+Every call's audio shares the worker's single asyncio loop: a 20 ms frame
+is only forwarded on time if the loop gets back to it on time.  Scheduling
+delay ("loop lag") is therefore the most direct measure of how close the
+node is to degrading audio, whatever the cause (CPU, a blocking call, GC).
+
+- LoopLagSampler: always on; its histogram and percentiles ride on the
+  `[HB] alive` heartbeat.
+- BlockingCallDetector: opt-in (LOOP_BLOCK_THRESHOLD_MS); a watchdog thread
+  that logs the loop thread's stack while it is stuck, so the code causing
+  a stall can be found from production logs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+# How often the loop-lag probe wakes up.  Short enough to catch stalls of a
+# few frames, cheap enough (one timer per 50 ms) to run unconditionally.
+LOOP_LAG_SAMPLE_INTERVAL_S = 0.05
+# Upper bounds (ms) of the heartbeat's loop-lag histogram buckets; the last
+# bucket (+Inf) catches everything above.  20 ms = one audio frame.
+LAG_BUCKETS_MS = (1, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already-sorted sequence (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SampleWindow:
+    """Timestamped samples, queried over a trailing time window.
+
+    Bounded by `maxlen` so a burst of samples can never grow memory; readers
+    never reset it, so several consumers can share one window.
+    """
+
+    def __init__(self, maxlen: int = 16384, clock=time.monotonic):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=maxlen)
+        self._clock = clock
+
+    @property
+    def maxlen(self) -> int:
+        return self._samples.maxlen
+
+    def ensure_capacity(self, maxlen: int) -> None:
+        """Grow the bound (never shrink it) so a reader's window fits; kept
+        samples survive.  Meant for startup, before the hot path runs."""
+        if maxlen > self._samples.maxlen:
+            self._samples = deque(list(self._samples), maxlen=maxlen)
+
+    def add(self, value: float) -> None:
+        self._samples.append((self._clock(), value))
+
+    def values(self, window_s: float) -> list:
+        cutoff = self._clock() - window_s
+        # list() copies in one C-level step: safe while other threads (loop
+        # shards) keep appending.
+        return sorted(v for t, v in list(self._samples) if t >= cutoff)
+
+    def percentile(self, q: float, window_s: float) -> float:
+        return percentile(self.values(window_s), q)
+
+
+class LoopLagSampler:
+    """Measures how late the loop wakes a sleeping task (seconds)."""
+
+    def __init__(self, interval_s: float = LOOP_LAG_SAMPLE_INTERVAL_S, window: Optional[SampleWindow] = None):
+        self._interval_s = interval_s
+        self.window = window or SampleWindow()
+        self._buckets: List[int] = [0] * (len(LAG_BUCKETS_MS) + 1)
+
+    def record(self, lag_s: float) -> None:
+        self.window.add(lag_s)
+        lag_ms = lag_s * 1000.0
+        for i, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self._buckets[i] += 1
+                return
+        self._buckets[-1] += 1
+
+    def take_histogram(self) -> List[int]:
+        """Bucket counts since the previous call (resets)."""
+        counts, self._buckets = self._buckets, [0] * len(self._buckets)
+        return counts
+
+    def heartbeat_gauges(self, window_s: float) -> Dict[str, Any]:
+        values = self.window.values(window_s)
+        return {
+            "loopLagP50Ms": percentile(values, 50) * 1000,
+            "loopLagP99Ms": percentile(values, 99) * 1000,
+            "loopLagPeakMs": (values[-1] if values else 0.0) * 1000,
+            "loopLagHist": self.take_histogram(),
+        }
+
+    def heartbeat_fields(self, window_s: float) -> str:
+        """Loop-lag fields appended to the `[HB] alive` line."""
+        return format_lag_fields(self.heartbeat_gauges(window_s))
+
+    async def run(self) -> None:
+        while True:
+            t0 = time.monotonic()
+            await asyncio.sleep(self._interval_s)
+            self.record(max(0.0, time.monotonic() - t0 - self._interval_s))
+
+
+class MultiLoopLag:
+    """Heartbeat view over several loops' samplers (loop shards): the worst
+    loop's percentiles, and the histograms summed."""
+
+    def __init__(self, samplers: Sequence[LoopLagSampler]):
+        self._samplers = list(samplers)
+
+    def percentile(self, q: float, window_s: float) -> float:
+        """The worst loop's percentile: what the adaptive controller reads
+        when calls run on shard loops, not on the (idle) main loop."""
+        return max((s.window.percentile(q, window_s) for s in self._samplers), default=0.0)
+
+    def heartbeat_gauges(self, window_s: float) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for sampler in self._samplers:
+            gauges = sampler.heartbeat_gauges(window_s)
+            for key, value in gauges.items():
+                if key == "loopLagHist":
+                    merged[key] = [a + b for a, b in zip(merged.get(key, [0] * len(value)), value)]
+                else:
+                    merged[key] = max(merged.get(key, 0.0), value)
+        return merged
+
+
+def format_lag_fields(gauges: Dict[str, Any]) -> str:
+    """`loopLag*=` heartbeat fields; the histogram is `le:count|...` (ms)."""
+    bounds = [str(b) for b in LAG_BUCKETS_MS] + ["inf"]
+    hist = "|".join(f"{b}:{n}" for b, n in zip(bounds, gauges["loopLagHist"]))
+    return (
+        f" loopLagP50Ms={gauges['loopLagP50Ms']:.1f}"
+        f" loopLagP99Ms={gauges['loopLagP99Ms']:.1f}"
+        f" loopLagPeakMs={gauges['loopLagPeakMs']:.1f}"
+        f" loopLagHist={hist}"
+    )
+
+
+class BlockingCallDetector:
+    """Watchdog thread that catches the loop stuck in synchronous code.
+
+    A coroutine on the loop stamps a tick every fraction of the threshold;
+    the thread checks the stamp and, when it is older than the threshold,
+    logs the loop thread's current stack (sys._current_frames) — i.e. the
+    exact callback that is blocking every call's audio.  One stack per
+    stall, then a closing line with the stall's total duration.
+    """
+
+    def __init__(self, log: logging.Logger, threshold_ms: float):
+        self._log = log
+        self._threshold_s = threshold_ms / 1000.0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Stalls over the threshold since start (heartbeat loopStalls=).
+        self.stalls = 0
+
+    async def _tick(self) -> None:
+        while True:
+            self._last_tick = time.monotonic()
+            await asyncio.sleep(self._threshold_s / 4)
+
+    def _watch(self) -> None:
+        stalled_since: Optional[float] = None
+        while not self._stop.wait(self._threshold_s / 2):
+            now = time.monotonic()
+            last_tick = self._last_tick
+            if now - last_tick > self._threshold_s:
+                if stalled_since != last_tick:
+                    stalled_since = last_tick
+                    self.stalls += 1
+                    self._log.warning(
+                        "[Loop] event loop blocked for >%.0fms; loop thread stack:\n%s",
+                        (now - last_tick) * 1000, self.loop_stack(),
+                    )
+            elif stalled_since is not None:
+                self._log.warning(
+                    "[Loop] event loop stall ended blockedMs=%.0f", (last_tick - stalled_since) * 1000,
+                )
+                stalled_since = None
+
+    def loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "(loop thread stack unavailable)"
+        return "".join(traceback.format_stack(frame))
+
+    async def run(self) -> None:
+        """Run on the loop to watch; cancelling stops the watchdog thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-block-detector", daemon=True)
+        self._thread.start()
+        try:
+            await self._tick()
+        finally:
+            self._stop.set()
@@ -0,0 +1,144 @@
+"""Thread-sharded event loops for the SQS worker (EVENT_LOOP_SHARDS).
+
+The in-process alternative to the multi-process supervisor: one process
+(one LiveKit FFI runtime, one set of credentials and queues) runs K asyncio
+loops in dedicated threads, and each call is scheduled onto the least busy
+one.  A call's whole life — Ultravox REST, dial-out, the RTC room and the
+per-frame AudioBridge work — stays on its shard's loop, so a single loop no
+longer serializes every call's 20 ms frames.
+
+The main loop keeps the SQS poll, acks, heartbeat and orphan sweeper.  Each
+shard owns its loop-bound clients (Ultravox httpx pool, LiveKit API pool,
+teardown reaper) — those cannot be shared across loops.
+
+Python-level work still contends for the GIL; what spreads out is waiting
+on, and waking for, the native LiveKit/websocket I/O.  benchmarks/loop_modes.py
+measures the difference against one loop and against several processes.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+from .event_loop import new_event_loop
+from .loop_monitor import LoopLagSampler, MultiLoopLag
+from .teardown import RoomTeardownReaper
+
+
+# Builds one shard's call stack on the shard's loop (sqs_worker.build_call_stack).
+CallStackFactory = Callable[[], Awaitable[Any]]
+
+
+class LoopShard:
+    """One event loop running in its own thread, plus its call processor."""
+
+    def __init__(self, index: int, loop_kind: str = "asyncio"):
+        self.index = index
+        self.loop = new_event_loop(loop_kind)
+        self.in_flight = 0  # only touched from the main loop
+        self.lag = LoopLagSampler()
+        self.processor = None
+        self.reaper: Optional[RoomTeardownReaper] = None
+        self._aclose: Optional[Callable[[], Awaitable[None]]] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._thread = threading.Thread(target=self._run, name=f"call-loop-{index}", daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> asyncio.Future:
+        """Run `coro` on this shard; await the result from the calling loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    async def _setup(self, factory: CallStackFactory) -> None:
+        stack = await factory()
+        self.processor, self.reaper, self._aclose = stack.processor, stack.reaper, stack.aclose
+        self._lag_task = asyncio.create_task(self.lag.run())
+
+    async def _teardown(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._aclose is not None:
+            await self._aclose()
+
+    async def start(self, factory: CallStackFactory) -> None:
+        self._thread.start()
+        await self.submit(self._setup(factory))
+
+    async def aclose(self) -> None:
+        try:
+            await self.submit(self._teardown())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            await asyncio.to_thread(self._thread.join)
+            self.loop.close()
+
+
+class _ShardReapers:
+    """Teardown gauges summed over every shard's reaper (heartbeat)."""
+
+    def __init__(self, shards: List[LoopShard]):
+        self._shards = shards
+
+    @property
+    def pending(self) -> int:
+        return sum(s.reaper.pending for s in self._shards if s.reaper is not None)
+
+    @property
+    def failed(self) -> int:
+        return sum(s.reaper.failed for s in self._shards if s.reaper is not None)
+
+
+class ShardedProcessor:
+    """Drop-in for TriggerCallProcessor in run_worker_loop: runs each call on
+    the shard with the fewest calls in flight."""
+
+    def __init__(self, shards: List[LoopShard]):
+        self._shards = shards
+        self.reapers = _ShardReapers(shards)
+        self.loop_lag = MultiLoopLag([s.lag for s in shards])
+
+    @classmethod
+    async def start(cls, log: logging.Logger, count: int, factory: CallStackFactory, *,
+                    loop_kind: str = "asyncio") -> "ShardedProcessor":
+        shards = [LoopShard(i, loop_kind) for i in range(count)]
+        for shard in shards:
+            await shard.start(factory)
+        log.info("[Shards] started eventLoopShards=%d", count)
+        return cls(shards)
+
+    @property
+    def active_rooms(self) -> Set[str]:
+        # set(...) copies each shard's set in one C-level step.
+        rooms: Set[str] = set()
+        for shard in self._shards:
+            rooms |= set(shard.processor.active_rooms)
+        return rooms
+
+    async def process_body(self, body: str, ack: Optional[Callable[[], Awaitable[None]]] = None,
+                           receive_count: Optional[int] = None) -> None:
+        shard = min(self._shards, key=lambda s: s.in_flight)
+        main_loop = asyncio.get_running_loop()
+
+        shard_ack = None
+        if ack is not None:
+            async def shard_ack() -> None:
+                # The ack (SQS delete) belongs to the main loop's consumer.
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(ack(), main_loop))
+
+        shard.in_flight += 1
+        try:
+            await shard.submit(shard.processor.process_body(body, shard_ack, receive_count=receive_count))
+        finally:
+            shard.in_flight -= 1
+
+    async def end_active_calls(self, reason: str) -> int:
+        counts = await asyncio.gather(*(s.submit(s.processor.end_active_calls(reason)) for s in self._shards))
+        return sum(counts)
+
+    async def aclose(self) -> None:
+        for shard in self._shards:
+            await shard.aclose()
@@ -37,10 +37,15 @@ class TriggerCallMessage:
     metadata: TriggerCallMetadata
 
     def primary_phone_number(self) -> str:
-        nums = sorted(self.metadata.phone_numbers, key=lambda p: p.order)
+        nums = self.ordered_phone_numbers()
         if not nums:
             raise ValueError("metadata.phoneNumbers is empty")
-        return "+"+nums[0].number
+        return nums[0]
+
+    def ordered_phone_numbers(self) -> List[str]:
+        """Every number, "+"-prefixed like the primary, lowest `order` first, duplicates dropped."""
+        nums = sorted(self.metadata.phone_numbers, key=lambda p: p.order)
+        return list(dict.fromkeys("+"+p.number for p in nums))
 
 
 class TriggerCallMessageParser:
@@ -0,0 +1,72 @@
+"""Poison messages: TRIGGER_CALLs whose payload can never be dialed.
+
+Invalid JSON, a wrong messageType, no prompt or no phone number fail the
+same way on every delivery.  Left to the normal retry path each one holds
+a call slot, waits out a visibility timeout per attempt and reaches the
+DLQ only after maxReceiveCount deliveries.  The processor decodes the
+payload before any RTC/REST work and, on failure, settles the message at
+once:
+
+- POISON_QUEUE_NAME set: the body is sent unchanged to that parking queue
+  (errorType/error as message attributes, for inspection and replay) and
+  deleted from the trigger queue;
+- unset: the message is acked and, when its tracking ids can be read, a
+  SIP_CALL_FAILED event with reason=invalid-payload carries the error.
+
+Either way the worker logs "[SQS] poison message", which Grafana counts.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from .config import BridgeConfig
+
+# SIP_CALL_FAILED reason of a payload that failed validation.
+INVALID_PAYLOAD_REASON = "invalid-payload"
+# SQS message attribute values are capped at 256 KiB; an error message
+# needs far less, and a runaway repr must not make the send fail.
+MAX_ERROR_ATTRIBUTE_CHARS = 1000
+
+
+class SqsPoisonQueue:
+    def __init__(self, sqs_client, queue_url: str, log: logging.Logger, executor=None):
+        self._client = sqs_client
+        self._queue_url = queue_url
+        self._log = log
+        # Same pool as CALL_HISTORY publishing (IoExecutors.publish).
+        self._run_in_thread = executor.run if executor is not None else asyncio.to_thread
+
+    async def park(self, body: str, error: BaseException) -> bool:
+        """Send `body` to the parking queue; False when the send failed (the
+        caller then leaves the message in its queue to be retried)."""
+        error_type = type(error).__name__
+        try:
+            await self._run_in_thread(
+                self._client.send_message,
+                QueueUrl=self._queue_url,
+                MessageBody=body,
+                MessageAttributes={
+                    "errorType": {"DataType": "String", "StringValue": error_type},
+                    "error": {"DataType": "String",
+                              "StringValue": (str(error) or error_type)[:MAX_ERROR_ATTRIBUTE_CHARS]},
+                },
+            )
+        except Exception:
+            self._log.warning("[SQS] could not park poison message errorType=%s", error_type, exc_info=True)
+            return False
+        return True
+
+
+def build_poison_queue(cfg: BridgeConfig, sqs_client, log: logging.Logger,
+                       executor=None) -> Optional[SqsPoisonQueue]:
+    """The parking queue, or None when POISON_QUEUE_NAME is unset (ack + event)."""
+    if not cfg.poison_queue_name:
+        return None
+    queue_url = (
+        f"https://sqs.{cfg.aws_region}.amazonaws.com/"
+        f"{cfg.aws_account_id}/{cfg.poison_queue_name}"
+    )
+    log.info("[SQS] poison messages parked in queueUrl=%s", queue_url)
+    return SqsPoisonQueue(sqs_client, queue_url, log, executor)
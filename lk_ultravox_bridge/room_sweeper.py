@@ -0,0 +1,114 @@
+"""Orphaned LiveKit room sweeper.
+
+If the worker crashes or is OOM-killed mid-call, nothing deletes its
+`call-xxxxxx` rooms: the SIP leg behind each one stays up (and billing)
+until the callee hangs up.  The sweeper runs at startup and then
+periodically, per CountryProfile, and deletes rooms that:
+
+- carry this gateway's room-name prefix (never touches other rooms in a
+  shared LiveKit project),
+- are older than a grace period (a room being set up right now has no
+  bridge participant yet),
+- are not owned by a call running in this process, and
+- have no bridge participant (`lk-uv-bridge-*`) connected — a live bridge
+  means some worker replica still owns the call.
+
+Deletions run in bounded-concurrency batches; a failure is logged and the
+room is picked up again on the next sweep.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, List, Optional, Set
+
+import livekit.api as api
+
+from .config import BridgeConfig, CountryProfile
+from .livekit_client import LiveKitApiPool, LiveKitRoomTerminator
+
+# Rooms created by the SQS worker (see TriggerCallProcessor.process_body).
+CALL_ROOM_PREFIX = "call-"
+# Identity prefix of the bridge's own RTC participant (see BridgeAgent).
+BRIDGE_IDENTITY_PREFIX = "lk-uv-bridge-"
+
+
+class OrphanRoomSweeper:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, api_pool: LiveKitApiPool,
+                 live_rooms: Callable[[], Set[str]]):
+        self._cfg = cfg
+        self._log = log
+        self._api_pool = api_pool
+        self._terminator = LiveKitRoomTerminator(log, api_pool)
+        self._live_rooms = live_rooms
+        self._sem = asyncio.Semaphore(max(1, cfg.orphan_sweep_concurrency))
+
+    def _configured_profiles(self) -> List[CountryProfile]:
+        profiles: List[CountryProfile] = []
+        for profile in dict.fromkeys(self._cfg.profiles.values()):
+            try:
+                profile.validate()
+            except SystemExit:
+                # Country without credentials: it cannot have rooms of ours.
+                continue
+            profiles.append(profile)
+        return profiles
+
+    async def find_orphans(self, profile: CountryProfile, now: Optional[float] = None) -> List[str]:
+        lk = self._api_pool.get(profile)
+        resp = await lk.room.list_rooms(api.ListRoomsRequest())
+        now = time.time() if now is None else now
+        live = self._live_rooms()
+        candidates = [
+            r.name for r in resp.rooms
+            if r.name.startswith(CALL_ROOM_PREFIX)
+            and r.name not in live
+            and now - r.creation_time >= self._cfg.orphan_room_min_age_s
+        ]
+
+        orphans: List[str] = []
+        for name in candidates:
+            participants = await lk.room.list_participants(api.ListParticipantsRequest(room=name))
+            if any(p.identity.startswith(BRIDGE_IDENTITY_PREFIX) for p in participants.participants):
+                continue  # another replica's bridge is still streaming this call
+            orphans.append(name)
+        return orphans
+
+    async def _delete(self, name: str, profile: CountryProfile) -> bool:
+        async with self._sem:
+            try:
+                await self._terminator.delete(name, profile)
+                return True
+            except Exception:
+                self._log.warning("[Sweeper] failed to delete orphan room=%s country=%s; retrying next sweep",
+                                  name, profile.country_code, exc_info=True)
+                return False
+
+    async def sweep_profile(self, profile: CountryProfile) -> int:
+        orphans = await self.find_orphans(profile)
+        if not orphans:
+            return 0
+        self._log.warning("[Sweeper] orphan rooms found country=%s count=%d rooms=%s",
+                          profile.country_code, len(orphans), ",".join(orphans))
+        results = await asyncio.gather(*(self._delete(name, profile) for name in orphans))
+        deleted = sum(results)
+        self._log.info("[Sweeper] orphan rooms deleted country=%s deleted=%d failed=%d",
+                       profile.country_code, deleted, len(orphans) - deleted)
+        return deleted
+
+    async def sweep(self, profiles: Optional[Iterable[CountryProfile]] = None) -> int:
+        deleted = 0
+        for profile in (profiles if profiles is not None else self._configured_profiles()):
+            try:
+                deleted += await self.sweep_profile(profile)
+            except Exception:
+                # Listing failed (network, auth): never fatal, next sweep retries.
+                self._log.warning("[Sweeper] sweep failed country=%s", profile.country_code, exc_info=True)
+        return deleted
+
+    async def run(self) -> None:
+        """Sweep at startup, then every ORPHAN_SWEEP_INTERVAL_S until cancelled."""
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self._cfg.orphan_sweep_interval_s)
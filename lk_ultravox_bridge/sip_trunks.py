@@ -0,0 +1,148 @@
+"""SIP trunk pools and failover: which trunk and caller id a dial uses.
+
+A profile's pool (SIP_TRUNK_ID_{CC} plus SIP_TRUNK_POOL_{CC}) spreads dials
+over several trunks and/or caller ids, so throughput is not capped at one
+carrier's CPS and spam scoring is not concentrated on one caller id.  Each
+dial starts on one member, picked by SIP_POOL_STRATEGY_{CC}:
+
+- `round-robin` (default): members in turn;
+- `least-in-flight`: the member carrying the fewest calls of this process
+  (ringing or answered), round-robin among ties;
+- `answer-rate`: a random member, weighted by its caller id's rolling
+  answer rate (see answer_rates), so a caller id that carriers started
+  flagging as spam gets fewer dials without being starved of the
+  outcomes that would let it recover.
+
+A trunk 5xx or a trunk auth rejection (SIP 401/403/407) is a system error:
+without a second leg the message goes back to the queue for a whole
+visibility timeout.  With SIP_FAILOVER_TRUNKS_{CC} the dialer tries the
+profile's next trunk at once (see LiveKitSipDialer.dial_out).
+
+Every failure of that kind marks the trunk down for SIP_TRUNK_COOLDOWN_S:
+until then, dials start on the healthy trunks and a down trunk is only
+tried as a last resort.  Any dial the trunk carries (answered or not
+answered) marks it healthy again.
+
+One TrunkPool (and its TrunkHealth) per worker process, shared by its loop
+shards; in-flight counts and answer rates are per process.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .answer_rates import AnswerRates
+from .config import POOL_STRATEGIES, BridgeConfig, CountryProfile, SipTrunk
+
+
+class TrunkHealth:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, *, clock: Callable[[], float] = time.monotonic):
+        self._cooldown_s = cfg.sip_trunk_cooldown_s
+        self._log = log
+        self._clock = clock
+        self._lock = threading.Lock()
+        # trunk id -> monotonic time it is considered healthy again.
+        self._down_until: Dict[str, float] = {}
+        # trunk id -> consecutive trunk failures.
+        self._failures: Dict[str, int] = {}
+
+    def order(self, profile: CountryProfile) -> List[SipTrunk]:
+        """The profile's trunks to try, healthy ones first (configured order),
+        then the down ones, soonest to recover first."""
+        return self.sort(profile.sip_trunks())
+
+    def sort(self, trunks: Sequence[SipTrunk]) -> List[SipTrunk]:
+        """`trunks`, the down ones moved to the back (soonest to recover first)."""
+        now = self._clock()
+        with self._lock:
+            down = {t.trunk_id: self._down_until[t.trunk_id] for t in trunks
+                    if self._down_until.get(t.trunk_id, 0.0) > now}
+        healthy = [t for t in trunks if t.trunk_id not in down]
+        return healthy + sorted((t for t in trunks if t.trunk_id in down), key=lambda t: down[t.trunk_id])
+
+    def record_failure(self, trunk: SipTrunk) -> None:
+        with self._lock:
+            failures = self._failures.get(trunk.trunk_id, 0) + 1
+            self._failures[trunk.trunk_id] = failures
+            self._down_until[trunk.trunk_id] = self._clock() + self._cooldown_s
+        self._log.warning("[LiveKit][SIP] trunk marked down trunk=%s failures=%d cooldownS=%.0f",
+                          trunk.trunk_id, failures, self._cooldown_s)
+
+    def record_success(self, trunk: SipTrunk) -> None:
+        with self._lock:
+            failures = self._failures.pop(trunk.trunk_id, 0)
+            self._down_until.pop(trunk.trunk_id, None)
+        if failures:
+            self._log.info("[LiveKit][SIP] trunk healthy again trunk=%s after failures=%d", trunk.trunk_id, failures)
+
+
+class TrunkPool:
+    """Orders a profile's trunks for one dial: the pool member picked by the
+    profile's strategy first, the rest of the pool, then the failover
+    trunks, with down trunks last (TrunkHealth).
+    """
+
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, *, health: Optional[TrunkHealth] = None,
+                 caller_rates: Optional[AnswerRates] = None, rng: Callable[[], float] = random.random):
+        for profile in cfg.profiles.values():
+            if profile.sip_pool_strategy not in POOL_STRATEGIES:
+                raise SystemExit(f"SIP_POOL_STRATEGY_{profile.country_code}={profile.sip_pool_strategy!r}: "
+                                 f"expected {', '.join(POOL_STRATEGIES)}")
+        self.health = health or TrunkHealth(cfg, log)
+        # Rolling answer rate per caller id (from_number), fed by every dial.
+        self._caller_rates = caller_rates or AnswerRates(cfg)
+        self._rng = rng
+        self._lock = threading.Lock()
+        # country -> round-robin cursor.
+        self._next: Dict[str, int] = {}
+        # member -> calls in flight on it; room -> the member it is on.
+        self._in_flight: Dict[SipTrunk, int] = {}
+        self._rooms: Dict[str, SipTrunk] = {}
+
+    def order(self, profile: CountryProfile) -> List[SipTrunk]:
+        members = list(profile.pool_members())
+        if len(members) > 1:
+            members = self._pick(profile, members)
+        return self.health.sort(members + list(profile.sip_failover_trunks))
+
+    def _pick(self, profile: CountryProfile, members: List[SipTrunk]) -> List[SipTrunk]:
+        with self._lock:
+            cursor = self._next.get(profile.country_code, 0) % len(members)
+            self._next[profile.country_code] = cursor + 1
+            rotated = members[cursor:] + members[:cursor]
+            if profile.sip_pool_strategy == "least-in-flight":
+                return sorted(rotated, key=lambda m: self._in_flight.get(m, 0))
+        if profile.sip_pool_strategy == "answer-rate":
+            rates = {m: self._caller_rates.rate(m.from_number) for m in members}
+            point = self._rng() * sum(rates.values())
+            for chosen in members:
+                point -= rates[chosen]
+                if point < 0:
+                    break
+            return [chosen] + sorted((m for m in members if m != chosen), key=lambda m: -rates[m])
+        return rotated
+
+    def start(self, room_name: str, trunk: SipTrunk) -> None:
+        """Count `room_name`'s call on `trunk` (moving it off its previous member)."""
+        with self._lock:
+            previous = self._rooms.get(room_name)
+            if previous is not None:
+                self._in_flight[previous] -= 1
+            self._rooms[room_name] = trunk
+            self._in_flight[trunk] = self._in_flight.get(trunk, 0) + 1
+
+    def finish(self, room_name: str) -> None:
+        with self._lock:
+            trunk = self._rooms.pop(room_name, None)
+            if trunk is not None:
+                self._in_flight[trunk] -= 1
+
+    def in_flight(self, trunk: SipTrunk) -> int:
+        return self._in_flight.get(trunk, 0)
+
+    def record(self, trunk: SipTrunk, answered: bool) -> None:
+        """A dial outcome for the caller id `trunk` presented."""
+        self._caller_rates.record(trunk.from_number, answered)
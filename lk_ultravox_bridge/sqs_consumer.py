@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import boto3
 
 from .config import BridgeConfig
+from .trigger_queues import parse_queue_weights
+
+
+# SQS's longest visibility timeout (12 h).
+SQS_MAX_VISIBILITY_S = 43200
+# Each hand-back of the same message waits this many times the last one.
+HAND_BACK_BACKOFF_FACTOR = 4
 
 
 @dataclass(frozen=True)
@@ -16,6 +23,25 @@ class SqsMessage:
     attributes: Dict[str, Any]
 
 
+def receive_count(m: SqsMessage) -> int:
+    """The message's ApproximateReceiveCount (0 when absent or malformed)."""
+    try:
+        return int(m.attributes.get("ApproximateReceiveCount", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def hand_back_delay_s(base_s: float, count: int) -> int:
+    """Visibility for a message handed back on its `count`-th receive.
+
+    Every hand-back counts as a receive for the queue's redrive policy: a
+    flat delay DLQs a message after maxReceiveCount short waits.  Growing
+    it (base, x4, x16, ...; capped at SQS's maximum) keeps a message that
+    cannot start yet in the queue for the length of a real outage.
+    """
+    return int(min(SQS_MAX_VISIBILITY_S, base_s * HAND_BACK_BACKOFF_FACTOR ** (max(1, count) - 1)))
+
+
 class SqsClientFactory:
     def __init__(self, cfg: BridgeConfig):
         self._cfg = cfg
@@ -39,8 +65,14 @@ class SqsQueueResolver:
         self._cfg = cfg
         self._log = log
 
-    def resolve_queue_url(self) -> str:
-        return f"https://sqs.{self._cfg.aws_region}.amazonaws.com/{self._cfg.aws_account_id}/{self._cfg.sqs_queue_name}"
+    def resolve_queue_url(self, queue_name: str = "") -> str:
+        name = queue_name or self._cfg.sqs_queue_name
+        return f"https://sqs.{self._cfg.aws_region}.amazonaws.com/{self._cfg.aws_account_id}/{name}"
+
+    def resolve_trigger_queues(self) -> List[Tuple[str, str, int]]:
+        """(name, url, weight) of every TRIGGER_CALL queue: SQS_QUEUES, or SQS_QUEUE_NAME alone."""
+        queues = parse_queue_weights(self._cfg.sqs_queues) or [(self._cfg.sqs_queue_name, 1)]
+        return [(name, self.resolve_queue_url(name), weight) for name, weight in queues]
 
 
 class SqsLongPollConsumer:
@@ -71,3 +103,9 @@ class SqsLongPollConsumer:
 
     def delete(self, receipt_handle: str) -> None:
         self._client.delete_message(QueueUrl=self._queue_url, ReceiptHandle=receipt_handle)
+
+    def change_visibility(self, receipt_handle: str, visibility_timeout: int) -> None:
+        """Hand a received message back: visible to consumers again in `visibility_timeout` s."""
+        self._client.change_message_visibility(
+            QueueUrl=self._queue_url, ReceiptHandle=receipt_handle, VisibilityTimeout=visibility_timeout,
+        )
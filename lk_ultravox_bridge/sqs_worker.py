@@ -3,22 +3,44 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import signal
 import time
 import uuid
-from typing import Awaitable, Callable, Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, List, NamedTuple, Optional, Set, Tuple
 
 from dotenv import load_dotenv
 
 # Load .env before importing BridgeConfig and other modules that depend on environment.
 load_dotenv(override=True)
 
-from .config import BridgeConfig
+from .config import BridgeConfig, SipTrunk
 from .logging_utils import CallLogAdapter, ConfigDumper
-from .sqs_consumer import SqsClientFactory, SqsQueueResolver, SqsLongPollConsumer
-from .message_models import TriggerCallMessageParser
-from .ultravox_client import UltravoxCallClient
-from .livekit_client import CallNotAnsweredError, LiveKitSipDialer, extract_sip_status
+from .sqs_consumer import (SqsClientFactory, SqsQueueResolver, SqsLongPollConsumer, hand_back_delay_s,
+                           receive_count as receive_count_of)
+from .message_models import TriggerCallMessage, TriggerCallMessageParser
+from .ultravox_client import UltravoxCallClient, build_ultravox_http_client
+from .livekit_client import (
+    SIP_UNREACHABLE_REASONS, CallNotAnsweredError, LiveKitApiPool, LiveKitSipDialer, extract_sip_status,
+)
 from .agent import BridgeAgent
+from .concurrency import AdaptiveConcurrencyController
+from .coordination import CallSlotLeases, Lease, build_lease_backend
+from .country_budgets import COUNTRY_FULL_RETRY_S, CountryBudgets, format_country_fields
+from .dial_rate import TrunkDialRateLimiter
+from .sip_trunks import TrunkPool
+from .executors import IoExecutors, format_io_fields
+from .loop_monitor import BlockingCallDetector, LoopLagSampler, format_lag_fields
+from .loop_shards import ShardedProcessor
+from .event_loop import loop_name, run as run_event_loop
+from .room_sweeper import CALL_ROOM_PREFIX, OrphanRoomSweeper
+from .teardown import RoomTeardownReaper
+from .idempotency import DONE as IDEMPOTENCY_DONE, TriggerIdempotency, build_trigger_idempotency
+from .fair_share import FairShare, build_fair_share
+from .answer_rates import AnswerRates, build_answer_rates
+from .circuit_breakers import LIVEKIT_RTC, LIVEKIT_SIP, ULTRAVOX, CircuitBreakers, build_circuit_breakers
+from .dial_outcomes import NegativeDialCache, build_negative_dial_cache
+from .poison import INVALID_PAYLOAD_REASON, SqsPoisonQueue, build_poison_queue
+from .trigger_queues import MULTI_QUEUE_IDLE_WAIT_S, TriggerQueue, WeightedQueueScheduler, format_queue_fields
 from .call_history import CallHistoryEmitter, NullCallHistoryPublisher, build_call_history_publisher
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -31,23 +53,103 @@ DIAL_ANSWER_TIMEOUT_S = 90.0
 # Once the dial is answered the SIP audio track must surface within seconds;
 # this bounds run_bridge's wait so a stuck track can never hang the worker.
 REMOTE_TRACK_TIMEOUT_S = 30.0
+# Phone fallback: an Ultravox call created longer ago than this is not
+# reused for the next number — what is left of its joinUrl lifetime
+# (ULTRAVOX_JOIN_TIMEOUT from creation) could expire while that number rings.
+ULTRAVOX_CALL_REUSE_MAX_AGE_S = 5.0
+# SQS long-poll wait (the ReceiveMessage maximum); also how long a shutdown
+# waits for a poll in progress, to give back what it receives.
+SQS_LONG_POLL_WAIT_S = 20
 # Wait before retrying after an SQS receive error (network blip, DNS, etc.).
 # The poll must survive transient failures — in-flight calls depend on this
 # process staying alive.
 POLL_ERROR_BACKOFF_S = 5.0
+# How often a worker whose every country is behind an open circuit breaker
+# re-checks them (a breaker half-opens on its own clock, not on an event).
+BREAKER_PAUSE_S = 1.0
+# Bound for finishing queued room deletions on shutdown (each one is a SIP
+# leg that may still be billing).
+TEARDOWN_DRAIN_TIMEOUT_S = 15.0
+# endReason of calls hung up because the worker is shutting down.
+WORKER_SHUTDOWN_REASON = "worker-shutdown"
+# After the drain deadline, how long hung-up calls get to wind down (bridge
+# close, SIP_CALL_ENDED) before the remaining call tasks are cancelled.
+SHUTDOWN_END_GRACE_S = 5.0
 # Liveness heartbeat cadence.  The "[HB] alive" line is what the Grafana
 # "worker is down" alert watches; it also carries the in-flight gauge.
 HEARTBEAT_INTERVAL_S = 60.0
 
 
+def parse_fallback_reasons(spec: str) -> Set[str]:
+    """PHONE_FALLBACK_REASONS -> set of CallNotAnsweredError reasons.
+
+    Only SIP-derived reasons: dial-timeout is the worker's own guard firing
+    (a stuck dial, often a trunk or LiveKit problem), not news about the
+    number, and the next number would most likely hit it too.
+    """
+    reasons = {r.strip() for r in spec.split(",") if r.strip()}
+    if "dial-timeout" in reasons:
+        raise ValueError("PHONE_FALLBACK_REASONS: dial-timeout is not a SIP outcome and cannot trigger a fallback")
+    unknown = sorted(reasons - SIP_UNREACHABLE_REASONS)
+    if unknown:
+        raise SystemExit(f"PHONE_FALLBACK_REASONS: unknown reason(s) {', '.join(unknown)}; "
+                         f"expected {', '.join(sorted(SIP_UNREACHABLE_REASONS))}")
+    return reasons
+
+
 class TriggerCallProcessor:
-    def __init__(self, cfg: BridgeConfig, log: logging.Logger, event_publisher=None):
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, event_publisher=None, *,
+                 ultravox_http=None, livekit_api: Optional[LiveKitApiPool] = None,
+                 reaper: Optional[RoomTeardownReaper] = None,
+                 dial_limiter: Optional[TrunkDialRateLimiter] = None,
+                 trunk_pool: Optional[TrunkPool] = None,
+                 idempotency: Optional[TriggerIdempotency] = None,
+                 poison_queue: Optional[SqsPoisonQueue] = None,
+                 negative_cache: Optional[NegativeDialCache] = None,
+                 answer_rates: Optional[AnswerRates] = None,
+                 breakers: Optional[CircuitBreakers] = None):
         self._cfg = cfg
         self._log = log
         self._parser = TriggerCallMessageParser()
-        self._uv = UltravoxCallClient(cfg, log)
-        self._dialer = LiveKitSipDialer(log)
+        # ultravox_http / livekit_api are worker-owned pooled clients (main()
+        # closes them); None keeps the one-client-per-request behavior.
+        self._uv = UltravoxCallClient(cfg, log, ultravox_http)
+        self._livekit_api = livekit_api
+        # Per-trunk CPS pacing; the worker shares one limiter across loop
+        # shards so the process as a whole respects each trunk's limit.
+        self._dial_limiter = dial_limiter or TrunkDialRateLimiter(cfg, log)
+        # Trunk pool members and failover order (SIP_TRUNK_POOL_{CC},
+        # SIP_FAILOVER_TRUNKS_{CC}); shared the same way.
+        self._trunk_pool = trunk_pool or TrunkPool(cfg, log)
+        self._dialer = LiveKitSipDialer(log, livekit_api, trunk_health=self._trunk_pool.health,
+                                        dial_limiter=self._dial_limiter)
+        # Background teardown: a finished call releases its slot without
+        # waiting for RTC disconnect + DeleteRoom (None = inline teardown).
+        self._reaper = reaper
+        # Rooms of calls running in this process; the orphan sweeper never
+        # deletes these.
+        self.active_rooms: Set[str] = set()
+        # Answered calls by room: what a worker shutdown hangs up.
+        self._answered: Dict[str, BridgeAgent] = {}
+        # Trigger ids already dialed (None = no duplicate check); the
+        # worker shares one store across loop shards.
+        self._idempotency = idempotency
+        # Trigger id claimed by each running call, by room.
+        self._claims: Dict[str, str] = {}
+        # Where payloads that fail validation are parked (None = ack them
+        # with a SIP_CALL_FAILED event).
+        self._poison_queue = poison_queue
+        # Numbers known to be unreachable (None = always dial); shared
+        # across loop shards like the idempotency store.
+        self._negative_cache = negative_cache
+        # Rolling answer rates fed by dial outcomes (None = not tracked);
+        # with ANSWER_RATE_RANKING they order a contact's numbers.
+        self._answer_rates = answer_rates
+        # Upstream circuit breakers fed by each step's outcome (None = off);
+        # the worker loop reads them to pause intake.
+        self._breakers = breakers
         self._events = event_publisher or NullCallHistoryPublisher()
+        self._fallback_reasons = parse_fallback_reasons(cfg.phone_fallback_reasons)
 
     def build_ultravox_metadata(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         md = payload.get("metadata") or {}
@@ -75,15 +177,231 @@ class TriggerCallProcessor:
         After answer, retrying would double-call the person, so the message is
         acked first and later failures only end this call.
         """
+        room_name = f"{CALL_ROOM_PREFIX}{uuid.uuid4().hex[:6]}"
+        self.active_rooms.add(room_name)
+        try:
+            await self._process_call(body, room_name, ack, receive_count)
+        except BaseException:
+            # Before a final outcome the retry must dial; after it this is a no-op.
+            await self._release_trigger(room_name)
+            raise
+        finally:
+            self.active_rooms.discard(room_name)
+            self._answered.pop(room_name, None)
+            self._claims.pop(room_name, None)
+            self._trunk_pool.finish(room_name)
+
+    async def _claim_trigger(self, trigger_id: str, room_name: str,
+                             ack: Optional[Callable[[], Awaitable[None]]]) -> bool:
+        """Record the trigger id before any RTC/REST work; False = skip this delivery."""
+        if self._idempotency is None or not trigger_id:
+            return True
+        try:
+            state = await self._idempotency.claim(trigger_id)
+        except Exception:
+            # Fail open: a store outage must not stop every call.
+            self._log.warning("[SQS] idempotency check failed id=%s; dialing anyway", trigger_id, exc_info=True)
+            return True
+        if state is None:
+            self._claims[room_name] = trigger_id
+            return True
+        if state == IDEMPOTENCY_DONE:
+            self._log.warning("[SQS] duplicate TRIGGER_CALL skipped id=%s room=%s (already dialed; acking)",
+                              trigger_id, room_name)
+            if ack is not None:
+                try:
+                    await ack()
+                except Exception:
+                    self._log.exception("[SQS] ack failed for duplicate id=%s", trigger_id)
+        else:
+            # Another delivery of the same trigger is being dialed right now;
+            # this one comes back after its visibility timeout.
+            self._log.warning("[SQS] TRIGGER_CALL already being dialed id=%s room=%s; leaving this delivery "
+                              "in the queue", trigger_id, room_name)
+        return False
+
+    async def _complete_trigger(self, room_name: str) -> None:
+        """The call reached a final outcome: later deliveries are duplicates."""
+        trigger_id = self._claims.get(room_name)
+        if trigger_id is None:
+            return
+        try:
+            await self._idempotency.complete(trigger_id)
+        except Exception:
+            self._log.warning("[SQS] could not record trigger as dialed id=%s", trigger_id, exc_info=True)
+
+    async def _release_trigger(self, room_name: str) -> None:
+        trigger_id = self._claims.pop(room_name, None)
+        if trigger_id is None:
+            return
+        try:
+            await self._idempotency.release(trigger_id)
+        except Exception:
+            # The claim expires on its own (CLAIM_TTL_S).
+            self._log.warning("[SQS] could not release trigger claim id=%s", trigger_id, exc_info=True)
+
+    def _decode(self, body: str) -> Tuple[Dict[str, Any], TriggerCallMessage, str]:
+        """(payload, message, number to dial); raises on a payload no retry can fix."""
         payload = json.loads(body)
+        if not isinstance(payload, dict):
+            raise ValueError(f"payload is a JSON {type(payload).__name__}, not an object")
         msg = self._parser.parse(payload)
+        return payload, msg, msg.primary_phone_number()
+
+    async def _settle_poison(self, body: str, error: Exception, room_name: str,
+                             ack: Optional[Callable[[], Awaitable[None]]],
+                             receive_count: Optional[int]) -> None:
+        """Park or ack a message whose payload failed validation (see poison)."""
+        if self._poison_queue is not None:
+            if not await self._poison_queue.park(body, error):
+                return  # stays in the queue: the next delivery tries again
+            outcome = "parked"
+        else:
+            outcome = "acked"
+        self._log.warning("[SQS] poison message %s errorType=%s receiveCount=%d room=%s error=%s",
+                          outcome, type(error).__name__, receive_count or 0, room_name, error)
+        if outcome == "acked":
+            await self._emit_invalid_payload(body, error, room_name, receive_count)
+        if ack is not None:
+            try:
+                await ack()
+            except Exception:
+                self._log.exception("[SQS] ack failed for poison message room=%s", room_name)
 
-        to_number = msg.primary_phone_number()
+    async def _emit_invalid_payload(self, body: str, error: Exception, room_name: str,
+                                    receive_count: Optional[int]) -> None:
+        # Without readable tracking ids the backend could not attribute the
+        # event to a call: the log line is all there is.
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        if not isinstance(payload, dict):
+            return
+        failure: Dict[str, Any] = {"reason": INVALID_PAYLOAD_REASON, "errorType": type(error).__name__,
+                                   "error": str(error)}
+        if receive_count is not None:
+            failure["attempt"] = receive_count
+        emitter = CallHistoryEmitter(self._events, self._log, self.build_ultravox_metadata(payload),
+                                     base_metadata={"room": room_name})
+        await emitter.emit("SIP_CALL_FAILED", "Invalid TRIGGER_CALL payload; message dropped", failure)
+
+    def _dial_order(self, msg: TriggerCallMessage) -> List[str]:
+        """The contact's numbers in the order they are dialed: the producer's
+        `order`, or by answer rate with ANSWER_RATE_RANKING.
+
+        Ranking only reorders the numbers on the primary's country route:
+        the worker loop charges the message to that country's budget (and
+        breakers, leases) before the processor picks a number.
+        """
+        numbers = msg.ordered_phone_numbers()
+        if not self._cfg.answer_rate_ranking or self._answer_rates is None or len(numbers) < 2:
+            return numbers
+        country = self._cfg.route_profile(numbers[0]).country_code
+        routed = [n for n in numbers if self._cfg.route_profile(n).country_code == country]
+        ranked = self._answer_rates.rank(routed) + [n for n in numbers if n not in routed]
+        if ranked != numbers:
+            self._log.info("[SQS] numbers re-ranked by answer rate id=%s order=%s",
+                           msg.id, ",".join(f"{n}:{self._answer_rates.rate(n):.2f}" for n in ranked))
+        return ranked
+
+    def _record_answer(self, number: str, trunk: SipTrunk, answered: bool) -> None:
+        self._trunk_pool.record(trunk, answered)
+        if self._answer_rates is not None:
+            self._answer_rates.record(number, answered)
+
+    def _record_upstream(self, upstream: str, ok: bool, profile=None) -> None:
+        if self._breakers is not None:
+            self._breakers.record(upstream, ok, profile)
+
+    def _fallback_numbers(self, msg: TriggerCallMessage, numbers: List[str], to_number: str,
+                          profile) -> List[str]:
+        """The numbers after `to_number` in dial order that fallback may dial.
+
+        Only numbers on the same country route: the room lives on that
+        country's LiveKit project and the Ultravox call carries its voice
+        and language hint.
+        """
+        if not self._fallback_reasons:
+            return []
+        fallback = []
+        for number in numbers:
+            if number == to_number:
+                continue
+            if self._cfg.route_profile(number).country_code != profile.country_code:
+                self._log.info("[SQS] fallback skips to=%s id=%s (routes outside country=%s)",
+                               number, msg.id, profile.country_code)
+                continue
+            fallback.append(number)
+        return fallback
+
+    async def _report_not_answered(self, emitter: CallHistoryEmitter, trigger_id: str, room_name: str,
+                                   error: CallNotAnsweredError, ack: Optional[Callable[[], Awaitable[None]]],
+                                   extra: Optional[Dict[str, Any]] = None) -> None:
+        """Final unreachable outcome: CALL_NOT_ANSWERED, then ack (no retry)."""
+        # Digicob's return file reads sipStatus from here; the key is
+        # omitted when there is no SIP code (dial-timeout) — never invented.
+        unreachable: Dict[str, Any] = {"reason": error.reason}
+        if error.sip_status is not None:
+            unreachable["sipStatus"] = error.sip_status
+        unreachable.update(extra or {})
+        await emitter.emit(
+            "CALL_NOT_ANSWERED", f"Callee unreachable: {error.reason}", unreachable,
+        )
+        await self._complete_trigger(room_name)
+        if ack is not None:
+            try:
+                await ack()
+            except Exception:
+                self._log.exception(
+                    "[SQS] ack failed for unanswered call id=%s room=%s "
+                    "(message may be redelivered)", trigger_id, room_name,
+                )
+
+    async def _cached_outcomes(self, numbers: List[str]) -> Dict[str, CallNotAnsweredError]:
+        if self._negative_cache is None:
+            return {}
+        try:
+            return await self._negative_cache.lookup(numbers)
+        except Exception:
+            # Fail open: a cache outage must not stop every call.
+            self._log.warning("[SQS] negative dial cache lookup failed; dialing anyway", exc_info=True)
+            return {}
+
+    async def _record_outcome(self, number: str, error: CallNotAnsweredError) -> None:
+        if self._negative_cache is None:
+            return
+        try:
+            await self._negative_cache.record(number, error)
+        except Exception:
+            self._log.warning("[SQS] could not record dial outcome to=%s reason=%s", number, error.reason,
+                              exc_info=True)
+
+    async def end_active_calls(self, reason: str) -> int:
+        """Hang up every answered call (worker shutdown); returns how many.
+
+        Calls still dialing are not touched: the worker cancels them once
+        SHUTDOWN_END_GRACE_S is over, and their unacked messages are
+        redelivered.
+        """
+        for agent in list(self._answered.values()):
+            agent.stop(reason)
+        return len(self._answered)
+
+    async def _process_call(self, body: str, room_name: str, ack: Optional[Callable[[], Awaitable[None]]],
+                            receive_count: Optional[int]) -> None:
+        try:
+            payload, msg, to_number = self._decode(body)
+        except Exception as e:
+            # Permanent: settled before any claim, RTC or REST work.
+            await self._settle_poison(body, e, room_name, ack, receive_count)
+            return
+        numbers = self._dial_order(msg)
+        to_number = numbers[0]
         system_prompt = msg.metadata.prompt_text
 
         profile = self._cfg.resolve_profile(to_number)
 
-        room_name = f"call-{uuid.uuid4().hex[:6]}"
         self._log.info(
             "[SQS] TRIGGER_CALL received id=%s tenantId=%s orgId=%s to=%s room=%s provider=%s phoneCount=%d",
             msg.id,
@@ -95,13 +413,13 @@ class TriggerCallProcessor:
             len(msg.metadata.phone_numbers),
         )
 
+        if not await self._claim_trigger(msg.id, room_name, ack):
+            return
+
         # Per-call logger: with concurrent calls, every line from this call's
         # RTC/SIP/audio stack must stay attributable in the interleaved log.
         call_log = CallLogAdapter(self._log, {"call_id": msg.id, "room": room_name})
 
-        agent = BridgeAgent(self._cfg, call_log, room_name, profile)
-        await agent.connect_livekit()
-
         # Full payload contains the prompt and customer data — debug only.
         call_log.debug("payload=%s", payload)
 
@@ -114,93 +432,188 @@ class TriggerCallProcessor:
         # the Loki correlation key, toNumber is which of the contact's
         # numbers was actually dialed, country/provider is which SIP leg
         # carried the call.
-        emitter = CallHistoryEmitter(self._events, call_log, metadata, base_metadata={
-            "room": room_name,
-            "toNumber": to_number,
-            "country": profile.country_code,
-            "provider": profile.provider,
-        })
-
-        voice = msg.metadata.voice_id or profile.ultravox_voice
-        voice_source = "trigger" if msg.metadata.voice_id else "profile"
-        self._log.info(
-            "[SQS] creating Ultravox call for id=%s room=%s voice=%s voiceSource=%s",
-            msg.id, room_name, voice, voice_source,
-        )
+        def _emitter_for(number: str) -> CallHistoryEmitter:
+            return CallHistoryEmitter(self._events, call_log, metadata, base_metadata={
+                "room": room_name,
+                "toNumber": number,
+                "country": profile.country_code,
+                "provider": profile.provider,
+            })
 
+        # The contact's other numbers, tried in order on the reasons listed
+        # in PHONE_FALLBACK_REASONS (empty when the mode is off).
+        fallback_numbers = self._fallback_numbers(msg, numbers, to_number, profile)
+        fallback_from: Optional[Tuple[str, CallNotAnsweredError]] = None
+
+        # Known-unreachable numbers (negative dial cache) are skipped or
+        # settled here, before any RTC/REST work.
+        cached = await self._cached_outcomes([to_number, *fallback_numbers])
+        while to_number in cached:
+            e = cached[to_number]
+            if e.reason in self._fallback_reasons and fallback_numbers:
+                next_number = fallback_numbers.pop(0)
+                self._log.info("[SQS] known-unreachable number id=%s room=%s to=%s reason=%s — falling back to=%s",
+                               msg.id, room_name, to_number, e.reason, next_number)
+                fallback_from = (to_number, e)
+                to_number = next_number
+                continue
+            self._log.warning("[SQS] known-unreachable number id=%s room=%s to=%s reason=%s — acking, not dialed",
+                              msg.id, room_name, to_number, e.reason)
+            await self._report_not_answered(_emitter_for(to_number), msg.id, room_name, e, ack, {"cached": True})
+            return
+        fallback_numbers = [n for n in fallback_numbers if n not in cached]
+
+        agent = BridgeAgent(self._cfg, call_log, room_name, profile,
+                            api_pool=self._livekit_api, reaper=self._reaper)
         try:
-            uv_call = await self._uv.create_ws_call_join_url(
-                system_prompt=system_prompt,
-                voice=voice,
-                metadata=metadata,
-                greeting_message=msg.metadata.greeting_message,
-                country_code=profile.country_code,
-                language_hint=profile.language_hint,
-            )
-            uv_join_url = uv_call.join_url
+            await agent.connect_livekit()
+        except Exception:
+            self._record_upstream(LIVEKIT_RTC, False, profile)
+            raise
+        self._record_upstream(LIVEKIT_RTC, True, profile)
 
-            self._log.info(
-                "[SQS] dialing SIP id=%s room=%s to=%s (waiting for answer, timeout=%.0fs)",
-                msg.id, room_name, to_number, DIAL_ANSWER_TIMEOUT_S,
-            )
-            await emitter.emit("CALL_ATTEMPT_STARTED", "Dial attempt started")
-            dial_started_at = time.monotonic()
+        dialed = 0
+        uv_call = None
+        uv_created_at = 0.0
+
+        while True:
+            dialed += 1
+            emitter = _emitter_for(to_number)
+
+            # Wait for the trunk's next dial slot (SIP_DIAL_CPS_{CC}) before the
+            # Ultravox call exists: its joinUrl expires ULTRAVOX_JOIN_TIMEOUT
+            # after creation, so queueing must not eat into the ringing time.
+            # The dial starts on the pool member picked for it (first healthy
+            # trunk); the dialer paces any failover trunk itself.
+            # A pacing backend error (sqlite locked, plugin network) takes the
+            # system-error path below like any other failure before answer.
+            trunks = self._trunk_pool.order(profile)
+            dialing = False
             try:
-                await asyncio.wait_for(
-                    self._dialer.dial_out(room_name, to_number, profile),
-                    timeout=DIAL_ANSWER_TIMEOUT_S,
+                cps_wait_ms = int(await self._dial_limiter.acquire(profile, trunks[0].trunk_id) * 1000)
+                if cps_wait_ms:
+                    self._log.info("[SQS] dial paced id=%s room=%s trunk=%s cpsWaitMs=%d",
+                                   msg.id, room_name, trunks[0].trunk_id, cps_wait_ms)
+
+                # A fallback dial reuses the room (still connected) and the
+                # Ultravox call when the previous number failed fast; after a
+                # number that rang, a fresh call gets its full joinUrl lifetime.
+                if uv_call is None or time.monotonic() - uv_created_at > ULTRAVOX_CALL_REUSE_MAX_AGE_S:
+                    if uv_call is not None:
+                        # Too old to reuse: free it rather than let it wait
+                        # out its joinTimeout.
+                        await self._uv.discard(uv_call)
+                    voice = msg.metadata.voice_id or profile.ultravox_voice
+                    voice_source = "trigger" if msg.metadata.voice_id else "profile"
+                    self._log.info(
+                        "[SQS] creating Ultravox call for id=%s room=%s voice=%s voiceSource=%s",
+                        msg.id, room_name, voice, voice_source,
+                    )
+                    try:
+                        uv_call = await self._uv.create_ws_call_join_url(
+                            system_prompt=system_prompt,
+                            voice=voice,
+                            metadata=metadata,
+                            greeting_message=msg.metadata.greeting_message,
+                            country_code=profile.country_code,
+                            language_hint=profile.language_hint,
+                        )
+                    except Exception:
+                        self._record_upstream(ULTRAVOX, False)
+                        raise
+                    self._record_upstream(ULTRAVOX, True)
+                    uv_created_at = time.monotonic()
+                uv_join_url = uv_call.join_url
+
+                self._log.info(
+                    "[SQS] dialing SIP id=%s room=%s to=%s cpsWaitMs=%d (waiting for answer, timeout=%.0fs)",
+                    msg.id, room_name, to_number, cps_wait_ms, DIAL_ANSWER_TIMEOUT_S,
                 )
-            except asyncio.TimeoutError as e:
-                # LiveKit fails an unanswered dial on its own (SIP 408) well
-                # before this guard; hitting it means the API hung.  Own
-                # category so it never contaminates the no-answer metric.
-                raise CallNotAnsweredError("dial-timeout") from e
-        except CallNotAnsweredError as e:
-            # Unreachable callee (no-answer/busy/declined/...): a business
-            # outcome, not an error.  Ack so SQS never redials on a loop —
-            # redial policy belongs to the campaign system.
-            await agent.teardown()
-            self._log.warning(
-                "[SQS] call not answered id=%s room=%s to=%s reason=%s — acking, no retry",
-                msg.id, room_name, to_number, e.reason,
-            )
-            # Digicob's return file reads sipStatus from here; the key is
-            # omitted when there is no SIP code (dial-timeout) — never invented.
-            unreachable: Dict[str, Any] = {"reason": e.reason}
-            if e.sip_status is not None:
-                unreachable["sipStatus"] = e.sip_status
-            await emitter.emit(
-                "CALL_NOT_ANSWERED", f"Callee unreachable: {e.reason}", unreachable,
-            )
-            if ack is not None:
+                # cpsWaitMs only when the dial was actually held by trunk
+                # pacing; fallback* only on a contact's second and later numbers.
+                attempt_metadata: Dict[str, Any] = {"cpsWaitMs": cps_wait_ms} if cps_wait_ms else {}
+                if fallback_from is not None:
+                    attempt_metadata.update({"fallbackFrom": fallback_from[0],
+                                             "fallbackReason": fallback_from[1].reason})
+                await emitter.emit("CALL_ATTEMPT_STARTED", "Dial attempt started", attempt_metadata or None)
+                dial_started_at = time.monotonic()
+                self._trunk_pool.start(room_name, trunks[0])
+                dialing = True
                 try:
-                    await ack()
-                except Exception:
-                    self._log.exception(
-                        "[SQS] ack failed for unanswered call id=%s room=%s "
-                        "(message may be redelivered)", msg.id, room_name,
+                    carrier = await asyncio.wait_for(
+                        self._dialer.dial_out(room_name, to_number, profile, trunks),
+                        timeout=DIAL_ANSWER_TIMEOUT_S,
                     )
-            return
-        except Exception as e:
-            # Genuine system error before anyone was reached (Ultravox REST,
-            # trunk auth, network): drop whatever SIP leg LiveKit may have
-            # started and let the message be retried (the queue's redrive
-            # policy DLQs it after maxReceiveCount attempts).
-            await agent.teardown()
-            failure: Dict[str, Any] = {"reason": "system-error", "errorType": type(e).__name__}
-            # Unmapped SIP failures (e.g. 5xx from the trunk) still carry a
-            # code worth surfacing in the Digicob file; omitted when absent.
-            failure_sip_status = extract_sip_status(e)
-            if failure_sip_status is not None:
-                failure["sipStatus"] = failure_sip_status
-            if receive_count is not None:
-                failure["attempt"] = receive_count
-            await emitter.emit(
-                "SIP_CALL_FAILED", "System error before answer; message will be retried", failure,
-            )
-            raise
+                except asyncio.TimeoutError as e:
+                    # LiveKit fails an unanswered dial on its own (SIP 408) well
+                    # before this guard; hitting it means the API hung.  Own
+                    # category so it never contaminates the no-answer metric.
+                    raise CallNotAnsweredError("dial-timeout") from e
+            except asyncio.CancelledError:
+                # Worker shutdown past its drain deadline, before anyone answered:
+                # drop the SIP leg; the unacked message is redelivered.
+                await agent.teardown()
+                cancelled: Dict[str, Any] = {"reason": WORKER_SHUTDOWN_REASON}
+                if receive_count is not None:
+                    cancelled["attempt"] = receive_count
+                await emitter.emit(
+                    "SIP_CALL_FAILED", "Dial cancelled by worker shutdown; message will be retried", cancelled,
+                )
+                raise
+            except CallNotAnsweredError as e:
+                # The SIP API worked (the callee did not answer) unless it hung.
+                self._record_upstream(LIVEKIT_SIP, e.reason != "dial-timeout", profile)
+                self._record_answer(to_number, e.trunk or trunks[0], False)
+                await self._record_outcome(to_number, e)
+                if e.reason in self._fallback_reasons and fallback_numbers:
+                    next_number = fallback_numbers.pop(0)
+                    self._log.warning(
+                        "[SQS] number not reachable id=%s room=%s to=%s reason=%s — falling back to=%s "
+                        "(%d more)", msg.id, room_name, to_number, e.reason, next_number, len(fallback_numbers),
+                    )
+                    fallback_from = (to_number, e)
+                    to_number = next_number
+                    continue
+                # Unreachable callee (no-answer/busy/declined/...): a business
+                # outcome, not an error.  Ack so SQS never redials on a loop —
+                # redial policy belongs to the campaign system.
+                await agent.teardown()
+                self._log.warning(
+                    "[SQS] call not answered id=%s room=%s to=%s reason=%s — acking, no retry",
+                    msg.id, room_name, to_number, e.reason,
+                )
+                await self._report_not_answered(emitter, msg.id, room_name, e, ack,
+                                                {"numbersDialed": dialed} if dialed > 1 else None)
+                return
+            except Exception as e:
+                # Genuine system error before anyone was reached (Ultravox REST,
+                # trunk auth, network): drop whatever SIP leg LiveKit may have
+                # started and let the message be retried (the queue's redrive
+                # policy DLQs it after maxReceiveCount attempts).
+                await agent.teardown()
+                if dialing:
+                    self._record_upstream(LIVEKIT_SIP, False, profile)
+                failure: Dict[str, Any] = {"reason": "system-error", "errorType": type(e).__name__}
+                # Unmapped SIP failures (e.g. 5xx from the trunk) still carry a
+                # code worth surfacing in the Digicob file; omitted when absent.
+                failure_sip_status = extract_sip_status(e)
+                if failure_sip_status is not None:
+                    failure["sipStatus"] = failure_sip_status
+                if receive_count is not None:
+                    failure["attempt"] = receive_count
+                await emitter.emit(
+                    "SIP_CALL_FAILED", "System error before answer; message will be retried", failure,
+                )
+                raise
+            break
 
         self._log.info("[SQS] SIP dial answered id=%s room=%s to=%s", msg.id, room_name, to_number)
+        self._record_upstream(LIVEKIT_SIP, True, profile)
+        carrier = carrier or trunks[0]
+        if carrier != trunks[0]:
+            # Answered on a failover trunk: count the call on the member carrying it.
+            self._trunk_pool.start(room_name, carrier)
+        self._record_answer(to_number, carrier, True)
         answered_at = time.monotonic()
         await emitter.emit(
             "SIP_DIAL_ANSWERED", "SIP dial answered",
@@ -210,6 +623,7 @@ class TriggerCallProcessor:
         # Point of no return: the callee answered.  From here an SQS redelivery
         # would dial the same person again, so ack (delete) the message now;
         # failures beyond this point are logged but never re-queued.
+        await self._complete_trigger(room_name)
         if ack is not None:
             try:
                 await ack()
@@ -223,6 +637,7 @@ class TriggerCallProcessor:
             await emitter.emit("SIP_BRIDGE_ACTIVE", "Audio bridge streaming")
 
         agent.on_bridge_active = _on_bridge_active
+        self._answered[room_name] = agent
 
         def _call_ended_metadata(end_reason: str) -> Dict[str, Any]:
             # durationSeconds feeds the backend's talk-time (Digicob return
@@ -237,6 +652,13 @@ class TriggerCallProcessor:
 
         try:
             await agent.run_bridge(uv_join_url, remote_track_timeout=REMOTE_TRACK_TIMEOUT_S)
+        except asyncio.CancelledError:
+            # Cut short by a worker shutdown (run_bridge has torn the room
+            # down): the call still happened and must be reported as ended.
+            await emitter.emit(
+                "SIP_CALL_ENDED", "Call ended by worker shutdown", _call_ended_metadata(WORKER_SHUTDOWN_REASON),
+            )
+            raise
         except Exception:
             # Post-answer failure: the call happened (talk time is real) and
             # will NOT be retried (already acked), so this is a SIP_CALL_ENDED
@@ -255,18 +677,166 @@ class TriggerCallProcessor:
         await emitter.emit("SIP_CALL_ENDED", "Call ended", _call_ended_metadata(end_reason))
 
 
-async def run_worker_loop(cfg: BridgeConfig, log: logging.Logger, consumer, processor) -> None:
+class CallStack(NamedTuple):
+    processor: TriggerCallProcessor
+    reaper: RoomTeardownReaper
+    livekit_api: LiveKitApiPool
+    aclose: Callable[[], Awaitable[None]]
+
+
+async def build_call_stack(cfg: BridgeConfig, log: logging.Logger, event_publisher,
+                           dial_limiter: Optional[TrunkDialRateLimiter] = None,
+                           trunk_pool: Optional[TrunkPool] = None,
+                           idempotency: Optional[TriggerIdempotency] = None,
+                           poison_queue: Optional[SqsPoisonQueue] = None,
+                           negative_cache: Optional[NegativeDialCache] = None,
+                           answer_rates: Optional[AnswerRates] = None,
+                           breakers: Optional[CircuitBreakers] = None) -> CallStack:
+    """The processor and the loop-bound clients it shares across calls.
+
+    Built on the loop that will run the calls (the worker's own, or a loop
+    shard's): pooled clients cannot be used from another loop.
+    """
+    # One pooled Ultravox REST client for the worker's lifetime: call
+    # creation reuses warm connections instead of a fresh TLS handshake.
+    ultravox_http = build_ultravox_http_client(cfg, log)
+    # Same for the LiveKit server API: one lazily-created client per country
+    # profile, shared by dial-out and room deletion across concurrent calls.
+    livekit_api = LiveKitApiPool(cfg, log)
+    reaper = RoomTeardownReaper(cfg, log, livekit_api)
+    processor = TriggerCallProcessor(
+        cfg, log, event_publisher, ultravox_http=ultravox_http, livekit_api=livekit_api, reaper=reaper,
+        dial_limiter=dial_limiter, trunk_pool=trunk_pool, idempotency=idempotency, poison_queue=poison_queue,
+        negative_cache=negative_cache, answer_rates=answer_rates, breakers=breakers,
+    )
+
+    async def aclose() -> None:
+        # Deletions need the pooled LiveKit client: drain before closing it.
+        await reaper.drain(TEARDOWN_DRAIN_TIMEOUT_S)
+        await ultravox_http.aclose()
+        await livekit_api.aclose()
+
+    return CallStack(processor, reaper, livekit_api, aclose)
+
+
+def format_heartbeat_fields(gauges: Dict[str, Any]) -> str:
+    """Optional heartbeat gauges, in a fixed order, for after `max=`.
+
+    Extra gauges always go after max= so the dashboard's inFlight=/max=
+    regexps keep matching the same fields.
+    """
+    extra = ""
+    if "teardownPending" in gauges:
+        extra += f" teardownPending={gauges['teardownPending']} teardownFailed={gauges['teardownFailed']}"
+    if "loopLagHist" in gauges:
+        extra += format_lag_fields(gauges)
+    if "loopStalls" in gauges:
+        extra += f" loopStalls={gauges['loopStalls']}"
+    if "ackQueue" in gauges:
+        extra += format_io_fields(gauges)
+    if "countryReleased" in gauges:
+        extra += format_country_fields(gauges)
+    if "clusterLeases" in gauges:
+        extra += f" clusterLeases={gauges['clusterLeases']} clusterDenied={gauges['clusterDenied']}"
+    extra += format_queue_fields(gauges)
+    if "fairReleased" in gauges:
+        extra += f" fairReleased={gauges['fairReleased']}"
+    if "breakersOpen" in gauges:
+        extra += f" breakersOpen={gauges['breakersOpen']} breakerReleased={gauges['breakerReleased']}"
+    return extra
+
+
+async def run_worker_loop(cfg: BridgeConfig, log: logging.Logger, consumer, processor, *,
+                          reaper: Optional[RoomTeardownReaper] = None,
+                          controller: Optional[AdaptiveConcurrencyController] = None,
+                          loop_lag: Optional[LoopLagSampler] = None,
+                          block_detector: Optional[BlockingCallDetector] = None,
+                          executors: Optional[IoExecutors] = None,
+                          budgets: Optional[CountryBudgets] = None,
+                          leases: Optional[CallSlotLeases] = None,
+                          queues: Optional[WeightedQueueScheduler] = None,
+                          fair_share: Optional[FairShare] = None,
+                          breakers: Optional[CircuitBreakers] = None,
+                          stop: Optional[asyncio.Event] = None,
+                          heartbeat_sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
     """Poll SQS and run each call as its own task, capped by MAX_CONCURRENT_CALLS.
 
     A message is only pulled from the queue when there is a free call slot:
     a message sitting in memory waiting for a slot would have its visibility
-    clock running, ending in a phantom redelivery.
+    clock running, ending in a phantom redelivery.  With a `controller`
+    (ADAPTIVE_CONCURRENCY) the cap is its current limit instead.
+
+    Polls and deletes run on `executors`' dedicated pools when given, on
+    the loop's default executor otherwise.
+
+    Per-country caps (MAX_CONCURRENT_CALLS_{CC}) apply on top: polling
+    pauses while every country is full, and a message whose country is
+    full goes back to the queue (see country_budgets).  With `leases`
+    (COORDINATION_BACKEND) a call also needs a cluster-wide slot on its
+    trunk, and is handed back the same way without one.
+
+    `queues` (SQS_QUEUES) replaces the single `consumer` with several
+    weighted queues sharing the free slots (see trigger_queues).  With
+    `fair_share` (FAIR_SHARE_KEY) each poll takes a look-ahead batch, starts
+    the free slots' worth deficit-round-robin across tenants/campaigns and
+    releases the rest (see fair_share).
+
+    With `breakers` (CIRCUIT_BREAKER_ERROR_RATE) a message whose country
+    depends on an open breaker goes back to the queue for
+    CIRCUIT_BREAKER_OPEN_S, and polling pauses while no country can take a
+    call (see circuit_breakers).
+
+    Setting `stop` (SIGTERM/SIGINT in main) drains the worker: polling
+    stops at once (a poll in progress is waited out and whatever it
+    receives handed straight back), in-flight calls get
+    SHUTDOWN_DRAIN_TIMEOUT_S to finish, then the rest are hung up
+    (endReason=worker-shutdown) and the loop returns.
     """
     in_flight: set = set()
+    stop = stop if stop is not None else asyncio.Event()
+    queues = queues if queues is not None else WeightedQueueScheduler.single(consumer)
+    budgets = budgets if budgets is not None else CountryBudgets(cfg)
+    poll_in_thread = executors.poll.run if executors is not None else asyncio.to_thread
+    ack_in_thread = executors.ack.run if executors is not None else asyncio.to_thread
+
+    def _limit() -> int:
+        return controller.limit if controller is not None else cfg.max_concurrent_calls
+
+    def _heartbeat_gauges() -> Dict[str, Any]:
+        gauges: Dict[str, Any] = {"inFlight": len(in_flight), "max": _limit()}
+        if reaper is not None:
+            gauges.update(teardownPending=reaper.pending, teardownFailed=reaper.failed)
+        if loop_lag is not None:
+            # Scheduling delay since the previous heartbeat: p99 above a
+            # frame (20 ms) means every call's audio is being delayed.
+            gauges.update(loop_lag.heartbeat_gauges(HEARTBEAT_INTERVAL_S))
+        if block_detector is not None:
+            gauges["loopStalls"] = block_detector.stalls
+        if executors is not None:
+            gauges.update(executors.heartbeat_gauges(HEARTBEAT_INTERVAL_S))
+        gauges.update(budgets.heartbeat_gauges())
+        if leases is not None:
+            gauges.update(leases.heartbeat_gauges())
+        if len(queues) > 1:
+            gauges.update(queues.heartbeat_gauges())
+        if fair_share is not None:
+            gauges.update(fair_share.heartbeat_gauges())
+        if breakers is not None:
+            gauges.update(breakers.heartbeat_gauges())
+        return gauges
 
     async def _heartbeat() -> None:
         while True:
-            log.info("[HB] alive inFlight=%d max=%d", len(in_flight), cfg.max_concurrent_calls)
+            gauges = _heartbeat_gauges()
+            if heartbeat_sink is not None:
+                # Supervised child: the supervisor logs the node-level
+                # "[HB] alive" line; this one is per-process detail only.
+                heartbeat_sink(gauges)
+                log.info("[HB] worker inFlightNow=%d limit=%d%s",
+                         gauges["inFlight"], gauges["max"], format_heartbeat_fields(gauges))
+            else:
+                log.info("[HB] alive inFlight=%d max=%d%s",
+                         gauges["inFlight"], gauges["max"], format_heartbeat_fields(gauges))
             await asyncio.sleep(HEARTBEAT_INTERVAL_S)
 
     def _task_done(task: asyncio.Task) -> None:
@@ -274,24 +844,21 @@ async def run_worker_loop(cfg: BridgeConfig, log: logging.Logger, consumer, proc
         if not task.cancelled() and task.exception() is not None:
             # _handle catches everything, so this is a genuine bug surfacing.
             log.error("[SQS] call task crashed unexpectedly: %r", task.exception())
-        log.info("[SQS] call task finished inFlight=%d/%d", len(in_flight), cfg.max_concurrent_calls)
+        log.info("[SQS] call task finished inFlight=%d/%d", len(in_flight), _limit())
 
-    async def _handle(m) -> None:
+    async def _handle(m, queue: TriggerQueue) -> None:
         async def ack(receipt_handle: str = m.receipt_handle) -> None:
-            await asyncio.to_thread(consumer.delete, receipt_handle)
+            await ack_in_thread(queue.consumer.delete, receipt_handle)
             log.info("[SQS] deleted message receiptHandlePrefix=%s", receipt_handle[:10])
 
-        try:
-            receive_count = int(m.attributes.get("ApproximateReceiveCount", 0))
-        except (TypeError, ValueError):
-            receive_count = 0
+        receive_count = receive_count_of(m)
 
         try:
             await processor.process_body(m.body, ack, receive_count=receive_count or None)
         except Exception as e:
-            # errorType/receiveCount feed the Grafana failure-by-type panel:
-            # ValueError/JSONDecodeError = bad payload (permanent — will DLQ
-            # after maxReceiveCount), ConnectionError etc. = transient.
+            # errorType/receiveCount feed the Grafana failure-by-type panel.
+            # Bad payloads never get here (the processor settles them as
+            # poison messages): these are transient (ConnectionError etc.).
             log.exception(
                 "[SQS] message processing failed errorType=%s receiveCount=%d "
                 "(unless already acked at answer, it will be retried after "
@@ -299,14 +866,153 @@ async def run_worker_loop(cfg: BridgeConfig, log: logging.Logger, consumer, proc
                 type(e).__name__, receive_count,
             )
 
+    async def _hand_back(m, queue: TriggerQueue, retry_in_s: int = COUNTRY_FULL_RETRY_S) -> None:
+        try:
+            await ack_in_thread(queue.consumer.change_visibility, m.receipt_handle, retry_in_s)
+        except Exception:
+            # Not fatal: it just reappears when the receive's own visibility expires.
+            log.warning("[SQS] could not return message to the queue receiptHandlePrefix=%s",
+                        m.receipt_handle[:10], exc_info=True)
+
+    async def _release_country_full(m, queue: TriggerQueue, profile) -> None:
+        budgets.released += 1
+        retry_in_s = hand_back_delay_s(COUNTRY_FULL_RETRY_S, receive_count_of(m))
+        log.info("[SQS] country at its cap; message returned to the queue country=%s callsInFlight=%d "
+                 "cap=%s retryInS=%d receiptHandlePrefix=%s", profile.country_code,
+                 budgets.calls(profile), budgets.cap(profile),
+                 retry_in_s, m.receipt_handle[:10])
+        await _hand_back(m, queue, retry_in_s)
+
+    async def _release_breaker_open(m, queue: TriggerQueue, profile) -> None:
+        breakers.released += 1
+        retry_in_s = hand_back_delay_s(cfg.circuit_breaker_open_s, receive_count_of(m))
+        log.info("[SQS] circuit breaker open; message returned to the queue country=%s breakers=%s "
+                 "retryInS=%d receiptHandlePrefix=%s", profile.country_code, ",".join(breakers.open_names()),
+                 retry_in_s, m.receipt_handle[:10])
+        await _hand_back(m, queue, retry_in_s)
+
+    async def _lease_slot(m, queue: TriggerQueue, profile) -> Optional[Lease]:
+        """A cluster-wide slot for the profile's country; hands the message back without one."""
+        retry_in_s = hand_back_delay_s(COUNTRY_FULL_RETRY_S, receive_count_of(m))
+        try:
+            lease = await leases.acquire(profile)
+        except Exception:
+            # Fail closed: without the shared store the country's cluster cap
+            # cannot be checked; handing the message back is always safe.
+            log.warning("[Coord] slot lease failed; message returned to the queue country=%s",
+                        profile.country_code, exc_info=True)
+            lease = None
+        else:
+            if lease is None:
+                log.info("[SQS] country at its cluster cap; message returned to the queue country=%s "
+                         "cap=%d retryInS=%d receiptHandlePrefix=%s", profile.country_code,
+                         profile.cluster_max_concurrent_calls, retry_in_s, m.receipt_handle[:10])
+        if lease is None:
+            await _hand_back(m, queue, retry_in_s)
+        return lease
+
+    def _release_lease_when_done(task: asyncio.Task, lease: Lease) -> None:
+        def _done(_t: asyncio.Task) -> None:
+            release = asyncio.create_task(leases.release(lease))
+            background.add(release)
+            release.add_done_callback(background.discard)
+        task.add_done_callback(_done)
+
+    # Lease releases and hand-backs scheduled from done callbacks.
+    background: set = set()
+
+    async def _poll():
+        """(queue, messages) for one free slot."""
+        # One message per free slot, or a look-ahead batch to pick from.
+        batch = fair_share.batch_size(_limit() - len(in_flight)) if fair_share is not None else 1
+        if len(queues) == 1:
+            queue = queues.queues[0]
+            return queue, await poll_in_thread(queue.consumer.receive, batch, SQS_LONG_POLL_WAIT_S, 300)
+        # Short-poll in fairness order; only when all are empty, wait on
+        # the head queue (briefly: the others are not being watched).
+        candidates = queues.order()
+        for queue in candidates:
+            msgs = await poll_in_thread(queue.consumer.receive, batch, 0, 300)
+            if msgs or stop.is_set():
+                return queue, msgs
+        return candidates[0], await poll_in_thread(candidates[0].consumer.receive, batch,
+                                                   MULTI_QUEUE_IDLE_WAIT_S, 300)
+
+    async def _pick_fair_share(msgs, queue: TriggerQueue):
+        """The batch's messages to start now; the others go straight back to the queue."""
+        start, release, flows = fair_share.split(msgs, _limit() - len(in_flight))
+        if release:
+            log.info("[SQS] fair share started=%d released=%d flows=%s", len(start), len(release),
+                     "|".join(f"{k}:{n}" for k, n in flows.items()))
+            await asyncio.gather(*(_hand_back(m, queue, fair_share.release_delay_s(m)) for m in release))
+        return start
+
+    async def _hand_back_abandoned_poll(poll: asyncio.Task) -> None:
+        """A poll outlived by a shutdown: wait it out (one long poll at most)
+        and give whatever it received straight back, rather than leave it
+        invisible for the whole visibility timeout."""
+        await asyncio.wait({poll}, timeout=SQS_LONG_POLL_WAIT_S + SHUTDOWN_END_GRACE_S)
+        if not poll.done() or poll.cancelled() or poll.exception() is not None:
+            return
+        queue, msgs = poll.result()
+        if msgs:
+            log.info("[SQS] draining: returning messages received during shutdown count=%d", len(msgs))
+            await asyncio.gather(*(_hand_back(m, queue, 0) for m in msgs))
+
+    async def _drain(abandoned_poll: Optional[asyncio.Task]) -> None:
+        log.info("[SQS] draining: intake stopped inFlight=%d deadlineS=%.0f",
+                 len(in_flight), cfg.shutdown_drain_timeout_s)
+        # Runs alongside the calls' drain; awaited before returning.
+        hand_back = asyncio.create_task(_hand_back_abandoned_poll(abandoned_poll)) if abandoned_poll else None
+        pending = set(in_flight)
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=cfg.shutdown_drain_timeout_s)
+        if pending:
+            end_calls = getattr(processor, "end_active_calls", None)
+            ended = await end_calls(WORKER_SHUTDOWN_REASON) if end_calls is not None else 0
+            log.warning("[SQS] drain deadline reached; ending calls inFlight=%d answered=%d endReason=%s",
+                        len(pending), ended, WORKER_SHUTDOWN_REASON)
+            _, pending = await asyncio.wait(pending, timeout=SHUTDOWN_END_GRACE_S)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if hand_back is not None:
+            await hand_back
+        if background:
+            await asyncio.wait(set(background), timeout=SHUTDOWN_END_GRACE_S)
+        log.info("[SQS] drain complete cancelled=%d", len(pending))
+
     hb_task = asyncio.create_task(_heartbeat())
+    stop_task = asyncio.create_task(stop.wait())
+    controller_task = None
+    # A poll still out when `stop` was set; the drain hands back what it gets.
+    abandoned_poll: Optional[asyncio.Task] = None
+    # An adaptive limit can rise while every slot is busy: re-check it each
+    # interval instead of waiting for a call to finish.
+    slot_wait_timeout = None
+    if controller is not None:
+        controller_task = asyncio.create_task(controller.run(lambda: len(in_flight)))
+        slot_wait_timeout = cfg.adaptive_concurrency_interval_s
     try:
-        while True:
-            while len(in_flight) >= cfg.max_concurrent_calls:
-                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        while not stop.is_set():
+            while not stop.is_set() and (len(in_flight) >= _limit() or (in_flight and budgets.all_full())):
+                await asyncio.wait(in_flight | {stop_task}, timeout=slot_wait_timeout,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            if stop.is_set():
+                break
+            if breakers is not None and breakers.all_blocked(cfg.profiles.values()):
+                # Nothing pulled now could start: wait for a breaker to half-open.
+                await asyncio.wait({stop_task}, timeout=BREAKER_PAUSE_S)
+                continue
 
+            poll = asyncio.create_task(_poll())
+            await asyncio.wait({poll, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            if stop.is_set():
+                # Stop intake now rather than after up to 20s of long poll.
+                abandoned_poll = poll
+                break
             try:
-                msgs = await asyncio.to_thread(consumer.receive, 1, 20, 300)
+                queue, msgs = poll.result()
             except Exception:
                 # A transient network error must never kill the worker: live calls
                 # run in their own tasks and keep going; we just retry the poll.
@@ -321,17 +1027,82 @@ async def run_worker_loop(cfg: BridgeConfig, log: logging.Logger, consumer, proc
                 continue
 
             for m in msgs:
-                log.info("[SQS] received message receiptHandlePrefix=%s bodyLength=%d", m.receipt_handle[:10], len(m.body))
-                task = asyncio.create_task(_handle(m))
+                queue.received += 1
+                log.info("[SQS] received message queue=%s receiptHandlePrefix=%s bodyLength=%d",
+                         queue.name, m.receipt_handle[:10], len(m.body))
+            if fair_share is not None:
+                msgs = await _pick_fair_share(msgs, queue)
+
+            for m in msgs:
+                profile = budgets.route(m.body)
+                if profile is not None and not budgets.has_room(profile):
+                    await _release_country_full(m, queue, profile)
+                    continue
+                if breakers is not None and profile is not None and not breakers.admit(profile):
+                    await _release_breaker_open(m, queue, profile)
+                    continue
+                lease = None
+                if leases is not None and profile is not None and leases.applies(profile):
+                    lease = await _lease_slot(m, queue, profile)
+                    if lease is None:
+                        continue
+                task = asyncio.create_task(_handle(m, queue))
                 in_flight.add(task)
                 task.add_done_callback(_task_done)
-                log.info("[SQS] call task started inFlight=%d/%d", len(in_flight), cfg.max_concurrent_calls)
+                queues.admit(queue)
+                task.add_done_callback(lambda _t, q=queue: queues.finished(q))
+                if profile is not None:
+                    budgets.acquire(profile)
+                    task.add_done_callback(lambda _t, p=profile: budgets.release(p))
+                if lease is not None:
+                    _release_lease_when_done(task, lease)
+                log.info("[SQS] call task started inFlight=%d/%d", len(in_flight), _limit())
+        await _drain(abandoned_poll)
     finally:
+        stop_task.cancel()
         hb_task.cancel()
+        if controller_task is not None:
+            controller_task.cancel()
+
 
+def install_shutdown_handlers(log: logging.Logger) -> asyncio.Event:
+    """An event set on SIGTERM/SIGINT (deploys, Ctrl-C, the supervisor).
 
-async def main() -> None:
-    cfg = BridgeConfig()
+    Replaces the default handlers, which would kill live calls mid-sentence:
+    the worker loop drains instead.  Further signals while draining are
+    ignored — the drain deadline bounds the shutdown.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def _on_signal(sig: signal.Signals) -> None:
+        if stop.is_set():
+            log.info("[SQS] %s received while draining; ignored", sig.name)
+            return
+        log.warning("[SQS] %s received; stopping intake and draining calls", sig.name)
+        stop.set()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, _on_signal, sig)
+        except (NotImplementedError, RuntimeError):
+            # Windows, or not on the main thread: default handling applies.
+            pass
+    return stop
+
+
+async def main(cfg: Optional[BridgeConfig] = None, *,
+               heartbeat_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+               logger: Optional[logging.Logger] = None) -> None:
+    """Run the worker until cancelled.
+
+    The keyword arguments are set by the multi-process supervisor: this
+    child's share of the node's call budget, where to report heartbeats and
+    a per-child logger name.  A standalone worker reads BridgeConfig from
+    the environment.
+    """
+    cfg = cfg or BridgeConfig()
+    log = logger or logging.getLogger("sqs-worker")
 
     cfg.require("ULTRAVOX_API_KEY", cfg.ultravox_api_key)
 
@@ -355,24 +1126,106 @@ async def main() -> None:
     ConfigDumper(cfg, log).dump_effective_config()
 
     sqs = SqsClientFactory(cfg).build()
-    queue_url = SqsQueueResolver(cfg, log).resolve_queue_url()
-    consumer = SqsLongPollConsumer(sqs, queue_url, log)
-    event_publisher = build_call_history_publisher(cfg, sqs, log)
+    trigger_queues = SqsQueueResolver(cfg, log).resolve_trigger_queues()
+    queues = WeightedQueueScheduler([
+        TriggerQueue(name, SqsLongPollConsumer(sqs, url, log), weight) for name, url, weight in trigger_queues
+    ])
+    fair_share = build_fair_share(cfg)
+    executors = IoExecutors(cfg)
+    event_publisher = build_call_history_publisher(cfg, sqs, log, executors.publish)
     if isinstance(event_publisher, NullCallHistoryPublisher):
         log.info("[Events] CALL_HISTORY publishing disabled (CALL_HISTORY_QUEUE_NAME not set)")
-    processor = TriggerCallProcessor(cfg, log, event_publisher)
+    # Cluster-wide slot and CPS budgets, when workers share a lease store.
+    lease_backend = build_lease_backend(cfg, log)
+    dial_limiter = TrunkDialRateLimiter(cfg, log, backend=lease_backend)
+    trunk_pool = TrunkPool(cfg, log)
+    leases = CallSlotLeases(cfg, log, lease_backend) if lease_backend is not None else None
+    # Trigger ids already dialed: a redelivery after a failed ack is skipped.
+    idempotency = build_trigger_idempotency(cfg, log)
+    # Payloads that fail validation: parked (POISON_QUEUE_NAME) or acked.
+    poison_queue = build_poison_queue(cfg, sqs, log, executors.publish)
+    # Numbers known to be unreachable are not dialed again (opt-in).
+    negative_cache = build_negative_dial_cache(cfg, log)
+    # Per-number/prefix answer rates, shared by the loop shards.
+    answer_rates = build_answer_rates(cfg)
+    # Upstream circuit breakers: fed by the processor, read by the loop.
+    breakers = build_circuit_breakers(cfg, log)
+    shards = None
+    sweeper_api = None
+    if cfg.event_loop_shards > 1:
+        # Each call runs on one of K loops in their own threads; every shard
+        # owns its loop-bound clients.  The orphan sweeper stays on this loop
+        # with a LiveKit API pool of its own.
+        shards = await ShardedProcessor.start(
+            log, cfg.event_loop_shards,
+            lambda: build_call_stack(cfg, log, event_publisher, dial_limiter, trunk_pool, idempotency,
+                                     poison_queue, negative_cache, answer_rates, breakers),
+            loop_kind=cfg.event_loop,
+        )
+        processor, reaper, livekit_api = shards, shards.reapers, None
+    else:
+        stack = await build_call_stack(cfg, log, event_publisher, dial_limiter, trunk_pool, idempotency,
+                                       poison_queue, negative_cache, answer_rates, breakers)
+        processor, reaper, livekit_api = stack.processor, stack.reaper, stack.livekit_api
+    # Rooms a crashed predecessor left behind: swept at startup, then
+    # periodically (their SIP legs bill until the callee hangs up).
+    sweeper_task = None
+    if cfg.orphan_sweep_interval_s > 0:
+        if livekit_api is None:
+            livekit_api = sweeper_api = LiveKitApiPool(cfg, log)
+        sweeper = OrphanRoomSweeper(cfg, log, livekit_api, lambda: processor.active_rooms)
+        sweeper_task = asyncio.create_task(sweeper.run())
+
+    # Loop lag is always sampled (heartbeat fields, adaptive concurrency);
+    # the blocking-call detector is opt-in (LOOP_BLOCK_THRESHOLD_MS).
+    lag_sampler = LoopLagSampler()
+    monitor_tasks = [asyncio.create_task(lag_sampler.run())]
+    block_detector = None
+    if cfg.loop_block_threshold_ms > 0:
+        block_detector = BlockingCallDetector(log, cfg.loop_block_threshold_ms)
+        monitor_tasks.append(asyncio.create_task(block_detector.run()))
+    if leases is not None:
+        monitor_tasks.append(asyncio.create_task(leases.run()))
+    controller = None
+    if cfg.adaptive_concurrency:
+        # With loop shards the calls' audio runs on the shard loops: back off
+        # on the worst of them, not on the main loop that only polls SQS.
+        controller = AdaptiveConcurrencyController(
+            cfg, log, shards.loop_lag if shards is not None else lag_sampler.window)
 
     log.info(
-        "[SQS] starting long polling worker queueUrl=%s maxConcurrentCalls=%d",
-        queue_url, cfg.max_concurrent_calls,
+        "[SQS] starting long polling worker queueUrl=%s maxConcurrentCalls=%d adaptive=%s loop=%s",
+        ",".join(url for _, url, _ in trigger_queues), cfg.max_concurrent_calls, cfg.adaptive_concurrency,
+        loop_name(),
     )
+    if len(queues) > 1:
+        log.info("[SQS] weighted queues %s", " ".join(f"{q.name}:{q.weight}" for q in queues.queues))
+    if fair_share is not None:
+        log.info("[SQS] fair share by %s lookahead=%d", cfg.fair_share_key, fair_share.lookahead)
 
+    stop = install_shutdown_handlers(log)
     try:
-        await run_worker_loop(cfg, log, consumer, processor)
+        await run_worker_loop(cfg, log, None, processor, reaper=reaper, controller=controller,
+                              loop_lag=shards.loop_lag if shards is not None else lag_sampler,
+                              block_detector=block_detector, executors=executors, leases=leases,
+                              queues=queues, fair_share=fair_share, breakers=breakers, stop=stop,
+                              heartbeat_sink=heartbeat_sink)
     finally:
+        if sweeper_task is not None:
+            sweeper_task.cancel()
+        for task in monitor_tasks:
+            task.cancel()
+        if shards is not None:
+            await shards.aclose()
+            if sweeper_api is not None:
+                await sweeper_api.aclose()
+        else:
+            await stack.aclose()
+        # After the calls' stacks: their last CALL_HISTORY events still go out.
+        await asyncio.to_thread(executors.shutdown)
         if loki is not None:
             loki.close()  # flush pending log batches before the process exits
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main(), BridgeConfig().event_loop)
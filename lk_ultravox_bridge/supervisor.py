@@ -0,0 +1,241 @@
+"""Multi-process SQS worker supervisor.
+
+One worker process runs one asyncio loop, so a node's call throughput is
+capped by a single core.  The supervisor spawns WORKER_PROCESSES children,
+each a full SQS worker (its own run_worker_loop, pooled clients, LiveKit
+FFI runtime) with a share of the node's call budget, and:
+
+- restarts a child that exits unexpectedly — the other children and their
+  live calls are untouched (separate processes);
+- aggregates the children's heartbeats into the node-level `[HB] alive`
+  line the dashboard and the worker-down alert watch (children log
+  `[HB] worker` lines instead);
+- forwards SIGTERM/SIGINT to the children on shutdown, and gives them
+  their drain deadline to finish live calls.
+
+Run with `python -m lk_ultravox_bridge.supervisor`.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+from typing import Any, Callable, Dict, List
+
+from .budgets import split_budget
+from .config import BridgeConfig
+
+# Seconds before a crashed child is respawned: a child that dies at startup
+# (bad credentials, unreachable queue) must not turn into a fork loop.
+RESTART_BACKOFF_S = 5.0
+# How long children get to exit after their drain deadline
+# (SHUTDOWN_DRAIN_TIMEOUT_S) before they are killed: hung-up calls winding
+# down, room teardown, CALL_HISTORY and Loki flushes.
+CHILD_STOP_TIMEOUT_S = 30.0
+# Node-level heartbeat cadence (same as a standalone worker's).
+HEARTBEAT_INTERVAL_S = 60.0
+
+
+def child_overrides(cfg: BridgeConfig, processes: int) -> List[Dict[str, Any]]:
+    """Per-child BridgeConfig overrides: each child's share of the budget.
+
+    Only child 0 runs the orphan-room sweeper — N sweepers would list the
+    same LiveKit projects N times for nothing.  Each child paces dials at
+    1/N of every trunk's CPS limit and knows its slot (index/count) to take
+    its share of the per-country budgets.
+    """
+    calls = split_budget(cfg.max_concurrent_calls, processes)
+    floors = split_budget(cfg.adaptive_concurrency_min, processes)
+    ceilings = split_budget(cfg.adaptive_concurrency_max, processes)
+    return [
+        {
+            "max_concurrent_calls": calls[i],
+            "adaptive_concurrency_min": max(1, floors[i]),
+            "adaptive_concurrency_max": max(1, ceilings[i]),
+            "orphan_sweep_interval_s": cfg.orphan_sweep_interval_s if i == 0 else 0.0,
+            "sip_dial_rate_share": cfg.sip_dial_rate_share / processes,
+            "worker_index": i,
+            "worker_count": processes,
+        }
+        for i in range(processes)
+    ]
+
+
+def aggregate_heartbeats(beats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Node-level gauges from the children's latest heartbeats.
+
+    Counts (in-flight, limits, teardowns, stalls, I/O queues, histogram
+    buckets) add up; loop-lag and I/O wait percentiles report the worst
+    child — each child has its own loop and pools, and the slowest one is
+    what degrades its calls.
+    """
+    node: Dict[str, Any] = {"inFlight": 0, "max": 0}
+    for beat in beats:
+        for key, value in beat.items():
+            if key == "loopLagHist":
+                node[key] = [a + b for a, b in zip(node.get(key, [0] * len(value)), value)]
+            elif key.startswith("loopLagP") or key.endswith("WaitP99Ms"):
+                node[key] = max(node.get(key, 0.0), value)
+            else:
+                node[key] = node.get(key, 0) + value
+    return node
+
+
+def _child_main(index: int, overrides: Dict[str, Any], heartbeats) -> None:
+    """Entry point of a worker process (spawned: fresh interpreter)."""
+    from . import sqs_worker
+    from .event_loop import run
+
+    cfg = dataclasses.replace(BridgeConfig(), **overrides)
+
+    def sink(gauges: Dict[str, Any]) -> None:
+        heartbeats.put_nowait((index, gauges))
+
+    try:
+        run(sqs_worker.main(cfg, heartbeat_sink=sink, logger=logging.getLogger(f"sqs-worker.w{index}")),
+            cfg.event_loop)
+    except KeyboardInterrupt:
+        pass
+
+
+def _spawn_process(index: int, overrides: Dict[str, Any], heartbeats):
+    # spawn, not fork: the LiveKit FFI runtime and boto3 are not fork-safe.
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=_child_main, args=(index, overrides, heartbeats),
+                       name=f"sqs-worker-{index}", daemon=False)
+    proc.start()
+    return proc
+
+
+class WorkerSupervisor:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, *,
+                 spawn: Callable[[int, Dict[str, Any], Any], Any] = _spawn_process,
+                 heartbeats=None, clock: Callable[[], float] = time.monotonic):
+        self._cfg = cfg
+        self._log = log
+        self._spawn = spawn
+        self._clock = clock
+        self.processes = max(1, cfg.worker_processes)
+        if cfg.max_concurrent_calls < self.processes:
+            # A child with a 0 budget would never pull a message.
+            log.warning("[Supervisor] WORKER_PROCESSES=%d > MAX_CONCURRENT_CALLS=%d; using %d processes",
+                        self.processes, cfg.max_concurrent_calls, cfg.max_concurrent_calls)
+            self.processes = max(1, cfg.max_concurrent_calls)
+        self._overrides = child_overrides(cfg, self.processes)
+        self._heartbeats = heartbeats if heartbeats is not None else multiprocessing.get_context("spawn").Queue()
+        self._children: Dict[int, Any] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._latest: Dict[int, Dict[str, Any]] = {}
+        self._stopping = False
+        self.restarts = 0
+
+    def start(self) -> None:
+        for index in range(self.processes):
+            self._start_child(index)
+        self._log.info("[Supervisor] started workers=%d budgets=%s", self.processes,
+                       ",".join(str(o["max_concurrent_calls"]) for o in self._overrides))
+
+    def _start_child(self, index: int) -> None:
+        proc = self._spawn(index, self._overrides[index], self._heartbeats)
+        self._children[index] = proc
+        self._log.info("[Supervisor] worker %d started pid=%s maxConcurrentCalls=%d",
+                       index, proc.pid, self._overrides[index]["max_concurrent_calls"])
+
+    def drain_heartbeats(self, timeout: float = 0.0) -> None:
+        try:
+            while True:
+                index, gauges = self._heartbeats.get(timeout=timeout)
+                self._latest[index] = gauges
+                timeout = 0.0
+        except queue.Empty:
+            pass
+
+    def check_children(self) -> None:
+        """Schedule a restart for every dead child; respawn those due."""
+        now = self._clock()
+        for index, proc in self._children.items():
+            if proc.is_alive() or index in self._restart_at:
+                continue
+            self._latest.pop(index, None)  # its calls died with it
+            self._restart_at[index] = now + RESTART_BACKOFF_S
+            self._log.error("[Supervisor] worker %d exited pid=%s exitcode=%s; restarting in %.0fs "
+                            "(other workers and their calls are unaffected)",
+                            index, proc.pid, proc.exitcode, RESTART_BACKOFF_S)
+        for index, due in list(self._restart_at.items()):
+            if now >= due and not self._stopping:
+                del self._restart_at[index]
+                self.restarts += 1
+                self._start_child(index)
+
+    def log_node_heartbeat(self) -> None:
+        from .sqs_worker import format_heartbeat_fields
+
+        node = aggregate_heartbeats(list(self._latest.values()))
+        alive = sum(1 for p in self._children.values() if p.is_alive())
+        self._log.info("[HB] alive inFlight=%d max=%d%s workers=%d/%d workerRestarts=%d",
+                       node["inFlight"], node["max"], format_heartbeat_fields(node),
+                       alive, self.processes, self.restarts)
+
+    def stop(self) -> None:
+        """SIGTERM every child (each drains its calls), wait (bounded) for them to exit, then kill."""
+        self._stopping = True
+        self._log.info("[Supervisor] stopping workers=%d", len(self._children))
+        for proc in self._children.values():
+            if proc.is_alive():
+                proc.terminate()
+        timeout_s = self._cfg.shutdown_drain_timeout_s + CHILD_STOP_TIMEOUT_S
+        deadline = self._clock() + timeout_s
+        for index, proc in self._children.items():
+            proc.join(max(0.0, deadline - self._clock()))
+            if proc.is_alive():
+                self._log.warning("[Supervisor] worker %d did not exit in %.0fs; killing",
+                                  index, timeout_s)
+                proc.kill()
+                proc.join()
+
+    def run(self) -> None:
+        self.start()
+        next_hb = self._clock()
+        while not self._stopping:
+            self.drain_heartbeats(timeout=1.0)
+            self.check_children()
+            if self._clock() >= next_hb:
+                self.log_node_heartbeat()
+                next_hb = self._clock() + HEARTBEAT_INTERVAL_S
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    log = logging.getLogger("supervisor")
+    cfg = BridgeConfig()
+    cfg.require("ULTRAVOX_API_KEY", cfg.ultravox_api_key)
+
+    # The node-level [HB] alive line comes from here, so this process ships
+    # to Loki too (each child ships its own lines).
+    from .observability import build_loki_handler
+    loki = build_loki_handler(cfg)
+    if loki is not None:
+        logging.getLogger().addHandler(loki)
+
+    supervisor = WorkerSupervisor(cfg, log)
+
+    def _on_signal(signum, _frame) -> None:
+        supervisor.stop()
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+    try:
+        supervisor.run()
+    finally:
+        if loki is not None:
+            loki.close()
+
+
+if __name__ == "__main__":
+    main()
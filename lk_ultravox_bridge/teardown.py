@@ -0,0 +1,88 @@
+"""Background room teardown for the SQS worker.
+
+Tearing a call down is two network round trips — RTC disconnect, then a
+LiveKit API DeleteRoom — and awaiting them inline kept the call's
+MAX_CONCURRENT_CALLS slot busy for the whole exchange.  The reaper takes
+the teardown off the call path: the call emits SIP_CALL_ENDED and frees its
+slot immediately, while deletions run in the background with bounded
+concurrency and retries.
+
+Deleting the room is what sends BYE to the trunk when our side ends the
+call, so a deletion that keeps failing is a billable leak: it is retried
+with backoff, counted (teardownFailed= in the heartbeat) and logged at
+ERROR once the attempts run out.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Optional, Set
+
+from .config import BridgeConfig, CountryProfile
+from .livekit_client import LiveKitApiPool, LiveKitRoomTerminator, LiveKitSession
+
+
+class RoomTeardownReaper:
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger, api_pool: Optional[LiveKitApiPool] = None, *,
+                 retry_backoff_s: float = 1.0):
+        self._log = log
+        self._terminator = LiveKitRoomTerminator(log, api_pool)
+        self._max_attempts = max(1, cfg.teardown_max_attempts)
+        self._retry_backoff_s = retry_backoff_s
+        self._sem = asyncio.Semaphore(max(1, cfg.teardown_max_concurrency))
+        self._tasks: Set[asyncio.Task] = set()
+        # Gauges for the heartbeat: deletions not finished yet, and deletions
+        # given up on since start (each one a possibly still-billing SIP leg).
+        self.pending = 0
+        self.failed = 0
+
+    def submit(self, room_name: str, profile: CountryProfile, session: Optional[LiveKitSession],
+               log: Optional[logging.Logger] = None) -> None:
+        """Queue the call's teardown and return immediately."""
+        self.pending += 1
+        task = asyncio.create_task(self._reap(room_name, profile, session, log or self._log))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reap(self, room_name: str, profile: CountryProfile, session: Optional[LiveKitSession],
+                    log: logging.Logger) -> None:
+        try:
+            async with self._sem:
+                if session is not None:
+                    try:
+                        await session.room.disconnect()
+                        log.info("[Bridge] LiveKit room disconnected room=%s", room_name)
+                    except Exception:
+                        log.warning("[Bridge] error disconnecting LiveKit room=%s", room_name, exc_info=True)
+
+                for attempt in range(1, self._max_attempts + 1):
+                    try:
+                        await self._terminator.delete(room_name, profile)
+                        return
+                    except Exception:
+                        if attempt == self._max_attempts:
+                            self.failed += 1
+                            log.error(
+                                "[Reaper] room deletion failed room=%s attempts=%d; SIP leg may stay up "
+                                "until the callee hangs up", room_name, attempt, exc_info=True,
+                            )
+                            return
+                        delay = self._retry_backoff_s * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                        log.warning(
+                            "[Reaper] room deletion attempt %d/%d failed room=%s; retrying in %.1fs",
+                            attempt, self._max_attempts, room_name, delay, exc_info=True,
+                        )
+                        await asyncio.sleep(delay)
+        finally:
+            self.pending -= 1
+
+    async def drain(self, timeout: float) -> None:
+        """Wait (bounded) for queued teardowns — called on worker shutdown so
+        rooms are not leaked just because the process is exiting."""
+        if not self._tasks:
+            return
+        self._log.info("[Reaper] draining pending=%d timeout=%.0fs", self.pending, timeout)
+        _, still_pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if still_pending:
+            self._log.warning("[Reaper] shutdown with %d teardowns still pending", len(still_pending))
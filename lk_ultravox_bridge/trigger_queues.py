@@ -0,0 +1,104 @@
+"""Several TRIGGER_CALL queues with weighted fair polling (SQS_QUEUES).
+
+With one queue, a large campaign blocks urgent callbacks queued behind it.
+SQS_QUEUES lists several queues with weights (e.g. `Callbacks:4,
+Campaigns:1`), and free call slots are shared between them in proportion
+to their weights while more than one has messages — a queue that is empty
+gets nothing and banks no credit for later (self-clocked fair queueing
+over admitted calls).
+
+Each poll still pulls a single message for a single free slot.  With
+several queues the worker short-polls them in fairness order and, when
+all are empty, long-polls the first one for MULTI_QUEUE_IDLE_WAIT_S — a
+message in another queue then waits at most that long.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+# Long-poll wait when every queue came back empty (multi-queue mode).
+MULTI_QUEUE_IDLE_WAIT_S = 2
+
+
+def parse_queue_weights(spec: str) -> List[Tuple[str, int]]:
+    """`Name:weight,Name2` -> [("Name", weight), ("Name2", 1)]."""
+    queues: List[Tuple[str, int]] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition(":")
+        try:
+            parsed = int(weight) if weight else 1
+        except ValueError:
+            raise SystemExit(f"SQS_QUEUES: weight of {name!r} must be an integer, got {weight!r}")
+        if parsed < 1:
+            raise SystemExit(f"SQS_QUEUES: weight of {name!r} must be >= 1")
+        queues.append((name.strip(), parsed))
+    return queues
+
+
+@dataclass
+class TriggerQueue:
+    name: str
+    consumer: Any  # SqsLongPollConsumer
+    weight: int = 1
+    # Metrics: messages received (incl. handed back) and calls running.
+    received: int = 0
+    calls: int = 0
+    # Virtual finish time of the last call admitted from this queue.
+    finish: float = 0.0
+
+
+class WeightedQueueScheduler:
+    def __init__(self, queues: List[TriggerQueue]):
+        if not queues:
+            raise SystemExit("no TRIGGER_CALL queue configured (SQS_QUEUE_NAME / SQS_QUEUES)")
+        self.queues = queues
+        # Start tag of the last admitted call: the "now" of the virtual clock.
+        self._vtime = 0.0
+
+    @classmethod
+    def single(cls, consumer, name: str = "default") -> "WeightedQueueScheduler":
+        return cls([TriggerQueue(name, consumer)])
+
+    def __len__(self) -> int:
+        return len(self.queues)
+
+    def order(self) -> List[TriggerQueue]:
+        """Queues in the order the next free slot should try them."""
+        return sorted(self.queues, key=lambda q: (max(q.finish, self._vtime), -q.weight))
+
+    def admit(self, queue: TriggerQueue) -> None:
+        """Charge a call started from `queue` (1/weight of virtual time)."""
+        start = max(queue.finish, self._vtime)
+        queue.finish = start + 1.0 / queue.weight
+        self._vtime = start
+        queue.calls += 1
+
+    def finished(self, queue: TriggerQueue) -> None:
+        queue.calls -= 1
+
+    def heartbeat_gauges(self) -> Dict[str, Any]:
+        # Flat numeric keys: the supervisor sums heartbeat gauges across children.
+        gauges: Dict[str, Any] = {}
+        for q in self.queues:
+            gauges[f"queue.{q.name}.received"] = q.received
+            gauges[f"queue.{q.name}.calls"] = q.calls
+        return gauges
+
+
+def format_queue_fields(gauges: Dict[str, Any]) -> str:
+    """` queueReceived=A:12|B:40 queueCalls=A:1|B:3` heartbeat fields."""
+    received: List[str] = []
+    calls: List[str] = []
+    for key, value in gauges.items():
+        if not key.startswith("queue."):
+            continue
+        name, _, metric = key[len("queue."):].rpartition(".")
+        (received if metric == "received" else calls).append(f"{name}:{value}")
+    if not received:
+        return ""
+    return f" queueReceived={'|'.join(received)} queueCalls={'|'.join(calls)}"
+
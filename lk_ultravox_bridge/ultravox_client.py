@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import random
 import time
 import logging
-from typing import NamedTuple, Optional, Dict, Any
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Dict, Any, Set
 
 import httpx
 
@@ -58,6 +61,31 @@ _VOICEMAIL_GUARD_PROMPTS_BY_COUNTRY = {
 }
 
 
+# Statuses that mean the call was not created and the same POST may simply
+# be sent again (rate limited, gateway failures).  Other 4xx/5xx are final.
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+# Retry backoff: full jitter over base * 2^n, capped at this many bases.
+RETRY_BACKOFF_CAP_FACTOR = 8
+# Creation latencies kept for the hedge delay's p95, and how many are
+# needed before it is trusted over ULTRAVOX_HEDGE_MIN_DELAY_S.
+HEDGE_LATENCY_SAMPLES = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+def ultravox_timeout(cfg: BridgeConfig) -> httpx.Timeout:
+    return httpx.Timeout(cfg.ultravox_read_timeout_s, connect=cfg.ultravox_connect_timeout_s)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """A failed creation worth another attempt: RETRYABLE_STATUSES, and
+    failures before the request reached Ultravox (connect, pool).  A read
+    timeout or dropped response is not retried: the POST is not idempotent
+    and the call it may have created has no known id to delete."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUSES
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
 class UltravoxCall(NamedTuple):
     """Result of creating an Ultravox call: the WS to join and the call's id
     (used for post-call correlation with recordings/transcripts)."""
@@ -66,10 +94,45 @@ class UltravoxCall(NamedTuple):
     call_id: Optional[str]
 
 
+def build_ultravox_http_client(cfg: BridgeConfig, log: logging.Logger) -> httpx.AsyncClient:
+    """The worker's long-lived Ultravox REST client (caller owns aclose()).
+
+    Creating an AsyncClient per call pays DNS + TCP + TLS on every call
+    creation; a shared client keeps warm connections in its pool.  HTTP/2 is
+    opt-in (ULTRAVOX_HTTP2) and silently downgraded when `h2` is missing —
+    a missing optional dependency must never stop the worker from dialing.
+    """
+    http2 = cfg.ultravox_http2
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx needs it for HTTP/2)
+        except ImportError:
+            log.warning("[Ultravox][REST] ULTRAVOX_HTTP2 set but h2 is not installed; using HTTP/1.1")
+            http2 = False
+    limits = httpx.Limits(
+        max_connections=cfg.ultravox_http_max_connections,
+        max_keepalive_connections=cfg.ultravox_http_max_connections,
+        keepalive_expiry=cfg.ultravox_http_keepalive_s,
+    )
+    log.info(
+        "[Ultravox][REST] shared client maxConnections=%d keepaliveS=%.0f http2=%s",
+        cfg.ultravox_http_max_connections, cfg.ultravox_http_keepalive_s, http2,
+    )
+    return httpx.AsyncClient(timeout=ultravox_timeout(cfg), limits=limits, http2=http2)
+
+
 class UltravoxCallClient:
-    def __init__(self, cfg: BridgeConfig, log: logging.Logger):
+    def __init__(self, cfg: BridgeConfig, log: logging.Logger,
+                 http_client: Optional[httpx.AsyncClient] = None):
         self._cfg = cfg
         self._log = log
+        # Shared pooled client (SQS worker) or None for a one-shot client per
+        # call (single-call CLI, where there is nothing to reuse).
+        self._http = http_client
+        # Recent creation latencies (seconds), for the hedge delay.
+        self._latencies: Deque[float] = deque(maxlen=HEDGE_LATENCY_SAMPLES)
+        # Hedge losers still running or being deleted.
+        self._background: Set[asyncio.Task] = set()
 
     async def create_ws_call_join_url(
             self,
@@ -140,16 +203,138 @@ class UltravoxCallClient:
         self._log.info("[Ultravox][REST] POST %s voice=%s inputSR=%d outputSR=%d",
                        self._cfg.ultravox_calls_url, resolved_voice, self._cfg.sample_rate, self._cfg.sample_rate)
 
-        t0 = time.time()
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(self._cfg.ultravox_calls_url, headers=headers, json=body)
+        if self._http is not None:
+            return await self._create(self._http, headers, body, hedge=self._cfg.ultravox_hedge)
+        # One-shot client: no hedging, its losers would outlive the client.
+        async with httpx.AsyncClient(timeout=ultravox_timeout(self._cfg)) as client:
+            return await self._create(client, headers, body, hedge=False)
 
+    async def _create(self, client: httpx.AsyncClient, headers: Dict[str, str], body: Dict[str, Any],
+                      hedge: bool) -> UltravoxCall:
+        """POST with up to ULTRAVOX_RETRIES retries on retryable failures,
+        everything within ULTRAVOX_CREATE_BUDGET_S."""
+        budget_s = self._cfg.ultravox_create_budget_s
+        try:
+            return await asyncio.wait_for(self._attempts(client, headers, body, hedge), timeout=budget_s)
+        except asyncio.TimeoutError:
+            self._log.warning("[Ultravox][REST] call creation out of budget budgetS=%.0f", budget_s)
+            raise
+
+    async def _attempts(self, client: httpx.AsyncClient, headers: Dict[str, str], body: Dict[str, Any],
+                        hedge: bool) -> UltravoxCall:
+        attempts = 1 + max(0, self._cfg.ultravox_retries)
+        attempt = 1
+        while True:
+            try:
+                if hedge:
+                    return await self._post_hedged(client, headers, body)
+                return await self._post_guarded(client, headers, body)
+            except Exception as e:
+                if attempt == attempts or not is_retryable(e):
+                    raise
+                base = self._cfg.ultravox_retry_backoff_s
+                backoff_s = random.uniform(0, min(base * RETRY_BACKOFF_CAP_FACTOR, base * 2 ** (attempt - 1)))
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                self._log.warning("[Ultravox][REST] retrying call creation attempt=%d/%d errorType=%s status=%s "
+                                  "backoffMs=%d", attempt + 1, attempts, type(e).__name__, status,
+                                  int(backoff_s * 1000))
+                await asyncio.sleep(backoff_s)
+                attempt += 1
+
+    def hedge_delay_s(self) -> float:
+        """p95 of recent creation latencies, never below ULTRAVOX_HEDGE_MIN_DELAY_S."""
+        floor = self._cfg.ultravox_hedge_min_delay_s
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return floor
+        samples = sorted(self._latencies)
+        return max(floor, samples[int(0.95 * (len(samples) - 1))])
+
+    async def _post_hedged(self, client: httpx.AsyncClient, headers: Dict[str, str],
+                           body: Dict[str, Any]) -> UltravoxCall:
+        """A second POST if the first is still out after the hedge delay; the
+        first success wins, the other call is deleted once it exists."""
+        delay_s = self.hedge_delay_s()
+        first = asyncio.create_task(self._post(client, headers, body))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay_s)
+            if first in done:
+                return first.result()
+            self._log.info("[Ultravox][REST] hedging call creation delayMs=%d", int(delay_s * 1000))
+            tasks.append(asyncio.create_task(self._post(client, headers, body)))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in tasks if t in done and t.exception() is None), None)
+                if winner is not None:
+                    for other in tasks:
+                        # Still out, or also succeeded: its call must go.
+                        if other is not winner and (other in pending or other.exception() is None):
+                            self._discard_when_done(other)
+                    return winner.result()
+                if not pending:
+                    raise next(iter(done)).exception()
+        except asyncio.CancelledError:
+            # Out of budget or shutting down: whatever still gets created goes.
+            for task in tasks:
+                self._discard_when_done(task)
+            raise
+
+    async def _post_guarded(self, client: httpx.AsyncClient, headers: Dict[str, str],
+                            body: Dict[str, Any]) -> UltravoxCall:
+        """_post; if the caller gives up while it is out (budget, shutdown),
+        the call it still creates is deleted."""
+        if client is not self._http:
+            return await self._post(client, headers, body)  # one-shot client: closes with the caller
+        task = asyncio.create_task(self._post(client, headers, body))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            self._discard_when_done(task)
+            raise
+
+    def _discard_when_done(self, task: asyncio.Task) -> None:
+        def _done(_t: asyncio.Task) -> None:
+            if task.cancelled() or task.exception() is not None:
+                return
+            discard = asyncio.create_task(self.discard(task.result()))
+            self._background.add(discard)
+            discard.add_done_callback(self._background.discard)
+
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(_done)
+
+    async def discard(self, call: UltravoxCall) -> None:
+        """Delete a call nobody will join (hedge loser, created after the
+        caller gave up, replaced by a fresh one) so it never waits out its
+        joinTimeout.  Never raises: the call expires on its own anyway."""
+        if not call.call_id:
+            self._log.warning("[Ultravox][REST] unused call has no callId; left to expire joinUrl=%s", call.join_url)
+            return
+        url = f"{self._cfg.ultravox_calls_url}/{call.call_id}"
+        headers = {"X-API-Key": self._cfg.ultravox_api_key}
+        try:
+            if self._http is not None:
+                resp = await self._http.delete(url, headers=headers)
+            else:
+                async with httpx.AsyncClient(timeout=ultravox_timeout(self._cfg)) as client:
+                    resp = await client.delete(url, headers=headers)
+            self._log.info("[Ultravox][REST] unused call discarded callId=%s status=%s", call.call_id,
+                           resp.status_code)
+        except Exception:
+            self._log.warning("[Ultravox][REST] unused call delete failed callId=%s", call.call_id, exc_info=True)
+
+    async def _post(self, client: httpx.AsyncClient, headers: Dict[str, str], body: Dict[str, Any]) -> UltravoxCall:
+        t0 = time.time()
+        resp = await client.post(self._cfg.ultravox_calls_url, headers=headers, json=body)
         elapsed_ms = int((time.time() - t0) * 1000)
         self._log.info("[Ultravox][REST] status=%s elapsedMs=%d", resp.status_code, elapsed_ms)
         if resp.status_code >= 300:
             self._log.error("[Ultravox][REST] errorBody=%s", resp.text)
             resp.raise_for_status()
 
+        self._latencies.append(elapsed_ms / 1000)
         data = resp.json()
         join_url = data.get("joinUrl")
         ultravox_call_id = data.get("callId") or data.get("id")
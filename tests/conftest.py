@@ -13,11 +13,13 @@ tests in `tests/unit/test_env_isolation.py` guard this rule.
 from __future__ import annotations
 
 import asyncio
+import json
 from types import SimpleNamespace
 
 import pytest
 
 from lk_ultravox_bridge.config import BridgeConfig, CountryProfile
+from lk_ultravox_bridge.sqs_consumer import SqsMessage
 
 
 def make_profile(**overrides) -> CountryProfile:
@@ -34,6 +36,13 @@ def make_profile(**overrides) -> CountryProfile:
         sip_from_number="+5511999990000",
         ultravox_voice="voice-br-test",
         language_hint="pt-BR",
+        sip_dial_cps=0.0,
+        sip_dial_burst=1,
+        max_concurrent_calls=0,
+        cluster_max_concurrent_calls=0,
+        sip_failover_trunks=(),
+        sip_trunk_pool=(),
+        sip_pool_strategy="round-robin",
     )
     defaults.update(overrides)
     return CountryProfile(**defaults)
@@ -51,12 +60,59 @@ def make_config(**overrides) -> BridgeConfig:
         ultravox_join_timeout="60s",
         ultravox_greeting_delay="4s",
         ultravox_voicemail_hangup=True,
+        ultravox_http_max_connections=20,
+        ultravox_http_keepalive_s=60.0,
+        ultravox_http2=False,
+        ultravox_connect_timeout_s=3.0,
+        ultravox_read_timeout_s=10.0,
+        ultravox_retries=2,
+        ultravox_retry_backoff_s=0.25,
+        ultravox_create_budget_s=15.0,
+        ultravox_hedge=False,
+        ultravox_hedge_min_delay_s=1.0,
         sample_rate=16000,
         channels=1,
         frame_ms=20,
         max_buffer_frames=5,
         keep_buffer_frames=2,
         max_concurrent_calls=1,
+        adaptive_concurrency=False,
+        adaptive_concurrency_min=1,
+        adaptive_concurrency_max=20,
+        adaptive_concurrency_interval_s=10.0,
+        adaptive_max_loop_lag_ms=20.0,
+        adaptive_max_frame_ms=5.0,
+        adaptive_max_cpu_pct=80.0,
+        loop_block_threshold_ms=0.0,
+        sqs_poll_threads=2,
+        sqs_ack_threads=4,
+        call_history_publish_threads=4,
+        coordination_backend="",
+        coordination_sqlite_path="",
+        coordination_lease_ttl_s=60.0,
+        shutdown_drain_timeout_s=120.0,
+        idempotency_backend="memory",
+        idempotency_sqlite_path="",
+        idempotency_ttl_s=86400.0,
+        idempotency_max_entries=100000,
+        sip_dial_rate_share=1.0,
+        sip_trunk_cooldown_s=30.0,
+        circuit_breaker_error_rate=0.0,
+        circuit_breaker_min_calls=10,
+        circuit_breaker_window_s=60.0,
+        circuit_breaker_open_s=30.0,
+        circuit_breaker_probes=1,
+        worker_index=0,
+        worker_count=1,
+        worker_processes=1,
+        event_loop="asyncio",
+        event_loop_shards=1,
+        livekit_api_max_connections=10,
+        teardown_max_concurrency=8,
+        teardown_max_attempts=3,
+        orphan_sweep_interval_s=300.0,
+        orphan_room_min_age_s=120.0,
+        orphan_sweep_concurrency=4,
         environment="test",
         grafana_loki_url="",
         grafana_loki_user="",
@@ -67,7 +123,21 @@ def make_config(**overrides) -> BridgeConfig:
         aws_secret_access_key="",
         aws_account_id="123456789012",
         sqs_queue_name="TestQueue",
+        sqs_queues="",
+        fair_share_key="",
+        fair_share_lookahead=10,
+        sqs_max_receive_count=5,
         call_history_queue_name="",
+        poison_queue_name="",
+        phone_fallback_reasons="",
+        negative_cache_ttls="",
+        negative_cache_backend="memory",
+        negative_cache_sqlite_path="",
+        negative_cache_max_entries=1000,
+        answer_rate_ranking=False,
+        answer_rate_half_life_s=604800.0,
+        answer_rate_prefix_digits=5,
+        answer_rate_max_entries=50000,
     )
     defaults.update(overrides)
     return BridgeConfig(**defaults)
@@ -150,3 +220,130 @@ class FakeAudioStream:
 
     async def aclose(self):
         self.closed = True
+
+
+def valid_payload(**overrides) -> dict:
+    """The canonical TRIGGER_CALL payload, as produced by the telephony backend."""
+    payload = {
+        "id": "msg-001",
+        "messageType": "TRIGGER_CALL",
+        "source": "campaign-engine",
+        "organizationId": "org-1",
+        "tenantId": "tenant-1",
+        "createdAt": "2026-07-13T12:00:00Z",
+        "metadata": {
+            "workflowId": "wf-1",
+            "campaignId": "cmp-1",
+            "customerId": "cust-1",
+            "userId": "user-1",
+            "telephonyProvider": "twilio",
+            "externalCustomerId": "ext-1",
+            "fullName": "Maria Silva",
+            "direction": "OUTBOUND",
+            "phoneNumbers": [{"number": "5511999998888", "order": 1}],
+            "subject": {
+                "prompt": {
+                    "text": "You are a collections agent.",
+                    "greetingMessage": "Olá!",
+                }
+            },
+        },
+    }
+    payload.update(overrides)
+    return payload
+
+
+def trigger(number: str, call_id: str) -> str:
+    """A valid TRIGGER_CALL body for a single number."""
+    payload = valid_payload(id=call_id)
+    payload["metadata"]["phoneNumbers"] = [{"number": number, "order": 1}]
+    return json.dumps(payload)
+
+
+class QueueOfBodies:
+    """Sync fake of SqsLongPollConsumer fed by a list of message bodies."""
+
+    def __init__(self, bodies):
+        self._pending = list(bodies)
+        self.deleted = []
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        if self._pending:
+            body = self._pending.pop(0)
+            return [SqsMessage(receipt_handle=f"rh-{body}", body=body, attributes={})]
+        import time
+        time.sleep(0.005)  # idle long-poll: avoid a busy spin in the test loop
+        return []
+
+    def delete(self, receipt_handle):
+        self.deleted.append(receipt_handle)
+
+
+class MixedQueue:
+    """Sync SQS fake that records messages handed back to the queue."""
+
+    def __init__(self, bodies, attributes=None):
+        self._pending = list(bodies)
+        self._attributes = attributes or {}
+        self.deleted = []
+        self.returned = []
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        if self._pending:
+            body = self._pending.pop(0)
+            return [SqsMessage(receipt_handle=f"rh-{len(self._pending)}", body=body,
+                               attributes=dict(self._attributes))]
+        import time
+        time.sleep(0.005)
+        return []
+
+    def delete(self, receipt_handle):
+        self.deleted.append(receipt_handle)
+
+    def change_visibility(self, receipt_handle, visibility_timeout):
+        self.returned.append(visibility_timeout)
+
+
+class BlockingProcessor:
+    """Records started calls and holds each one until the test releases it."""
+
+    def __init__(self):
+        self.started: list = []
+        self.release: dict = {}
+
+    async def process_body(self, body, ack=None, receive_count=None):
+        evt = asyncio.Event()
+        self.release[body] = evt
+        self.started.append(body)
+        await evt.wait()
+        if ack is not None:
+            await ack()
+
+
+async def wait_until(predicate, timeout=2.0):
+    """Yield to the loop until `predicate()` holds (fails after `timeout`)."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met within timeout")
+        await asyncio.sleep(0.01)
+
+
+class FakeClock:
+    """A monotonic clock the test moves by hand (`clock.now += 5`)."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingPublisher:
+    """CALL_HISTORY publisher that keeps every event body."""
+
+    def __init__(self):
+        self.published: list[dict] = []
+
+    async def publish(self, body: dict) -> None:
+        self.published.append(body)
@@ -43,7 +43,7 @@ class FakeTerminator:
 
     calls: list = []
 
-    def __init__(self, log):
+    def __init__(self, log, api_pool=None):
         pass
 
     async def terminate(self, room_name, profile):
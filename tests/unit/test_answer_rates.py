@@ -0,0 +1,54 @@
+"""Rolling per-number / per-prefix answer rates and number ranking."""
+from __future__ import annotations
+
+import pytest
+
+from lk_ultravox_bridge.answer_rates import AnswerRates, build_answer_rates
+
+from tests.conftest import FakeClock, make_config
+
+A, B, C = "+5511900000001", "+5521900000002", "+5511900000003"
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def rates(clock):
+    return AnswerRates(make_config(answer_rate_half_life_s=3600), clock=clock)
+
+
+class TestAnswerRates:
+    def test_unknown_number_starts_even(self, rates):
+        assert rates.rate(A) == pytest.approx(0.5)
+
+    def test_number_inherits_its_prefix_rate(self, rates):
+        for _ in range(8):
+            rates.record(A, answered=True)
+        # C was never dialed, but shares A's prefix (55119); B does not.
+        assert rates.rate(A) > rates.rate(C) > 0.5
+        assert rates.rate(B) == pytest.approx(0.5)
+
+    def test_old_outcomes_fade(self, rates, clock):
+        for _ in range(8):
+            rates.record(B, answered=False)
+        low = rates.rate(B)
+        clock.now += 10 * 3600
+        assert low < rates.rate(B) == pytest.approx(0.5, abs=0.01)
+
+    def test_rank_is_stable_for_ties(self, rates):
+        assert rates.rank([B, A, C]) == [B, A, C]
+        rates.record(B, answered=False)
+        rates.record(A, answered=True)
+        assert rates.rank([B, A, C]) == [A, C, B]
+
+    def test_bounded(self):
+        rates = AnswerRates(make_config(answer_rate_max_entries=3))
+        for n in (A, B, C):
+            rates.record(n, answered=True)
+        assert len(rates) == 3
+
+    def test_off_with_zero_entries(self):
+        assert build_answer_rates(make_config(answer_rate_max_entries=0)) is None
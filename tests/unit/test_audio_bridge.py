@@ -15,7 +15,9 @@ import time
 import pytest
 from livekit import rtc
 
+import lk_ultravox_bridge.audio_bridge as audio_bridge_module
 from lk_ultravox_bridge.audio_bridge import AudioBridge
+from lk_ultravox_bridge.loop_monitor import SampleWindow
 
 from tests.conftest import FakeAudioSource, FakeAudioStream, FakeWS, make_config
 
@@ -236,6 +238,22 @@ class TestLiveKitToUltravox:
         assert stop_evt.is_set()
 
 
+    async def test_frame_timing_excludes_the_awaited_send(self, patched_audio_stream, monkeypatch):
+        class SlowWS(FakeWS):
+            async def send(self, payload):
+                await asyncio.sleep(0.05)  # suspended: backpressure or a busy loop
+                await super().send(payload)
+
+        frame_timing = SampleWindow()
+        monkeypatch.setattr(audio_bridge_module, "FRAME_TIMING", frame_timing)
+        patched_audio_stream(FakeAudioStream([bytearray(frame_bytes(1)), bytearray(frame_bytes(2))]))
+
+        await make_bridge()._livekit_to_ultravox(SlowWS(), remote_audio_track="fake-track", stop_evt=asyncio.Event())
+
+        samples = frame_timing.values(60.0)
+        assert len(samples) == 2 and max(samples) < 0.05
+
+
 class TestRunStreams:
     """AudioBridge.run(..., ws=...) exercises _run_streams end to end."""
 
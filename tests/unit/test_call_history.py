@@ -25,8 +25,7 @@ from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
 from lk_ultravox_bridge.sqs_worker import TriggerCallProcessor
 from lk_ultravox_bridge.ultravox_client import UltravoxCall
 
-from tests.conftest import make_config, make_profile
-from tests.unit.test_message_models import valid_payload
+from tests.conftest import RecordingPublisher, make_config, make_profile, valid_payload
 
 log = logging.getLogger("test")
 
@@ -37,14 +36,6 @@ METADATA_KEYS = {"workflowId", "campaignId", "customerId", "userId", "callId",
                  "status", "statusDescription", "metadataJson"}
 
 
-class RecordingPublisher:
-    def __init__(self):
-        self.published: list[dict] = []
-
-    async def publish(self, body: dict) -> None:
-        self.published.append(body)
-
-
 def make_emitter(publisher=None, **tracking_overrides) -> CallHistoryEmitter:
     tracking = {
         "organizationId": "org-1", "tenantId": "tenant-1", "workflowId": "wf-1",
@@ -179,7 +170,7 @@ class SequenceFakeAgent:
     instances: list = []
     default_bridge_error = None  # set by tests to make run_bridge raise
 
-    def __init__(self, cfg, log, room_name, profile):
+    def __init__(self, cfg, log, room_name, profile, api_pool=None, reaper=None):
         self.room_name = room_name
         self.on_bridge_active = None
         self.end_reason = None
@@ -210,7 +201,7 @@ class FakeDialer:
     def __init__(self, error=None):
         self.error = error
 
-    async def dial_out(self, room_name, to_number, profile):
+    async def dial_out(self, room_name, to_number, profile, trunks=None):
         if self.error:
             raise self.error
 
@@ -358,6 +349,64 @@ class TestEmissionSequences:
         ]
         assert ended_metadata(pub)["endReason"] == "bridge-error"
 
+    async def test_worker_shutdown_hangs_up_answered_calls(self, sequenced, monkeypatch):
+        proc, pub = sequenced
+
+        class LiveAgent(SequenceFakeAgent):
+            async def run_bridge(self, join_url, *, remote_track_timeout=None):
+                self.stopped = asyncio.Event()
+                await self.stopped.wait()
+
+            def stop(self, reason):
+                self.end_reason = reason
+                self.stopped.set()
+
+        monkeypatch.setattr(worker_module, "BridgeAgent", LiveAgent)
+        call = asyncio.create_task(proc.process_body(json.dumps(valid_payload())))
+        while not statuses(pub)[-1:] == ["SIP_DIAL_ANSWERED"]:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert await proc.end_active_calls("worker-shutdown") == 1
+        await call
+        assert ended_metadata(pub)["endReason"] == "worker-shutdown"
+        assert await proc.end_active_calls("worker-shutdown") == 0
+
+    async def test_call_cancelled_after_answer_still_reports_its_end(self, sequenced, monkeypatch):
+        proc, pub = sequenced
+
+        class StuckAgent(SequenceFakeAgent):
+            async def run_bridge(self, join_url, *, remote_track_timeout=None):
+                await asyncio.sleep(3600)
+
+        monkeypatch.setattr(worker_module, "BridgeAgent", StuckAgent)
+        call = asyncio.create_task(proc.process_body(json.dumps(valid_payload())))
+        while not statuses(pub)[-1:] == ["SIP_DIAL_ANSWERED"]:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert ended_metadata(pub)["endReason"] == "worker-shutdown"
+
+    async def test_dial_cancelled_by_shutdown_is_a_retried_failure(self, sequenced):
+        proc, pub = sequenced
+
+        class RingingDialer:
+            async def dial_out(self, room_name, to_number, profile, trunks=None):
+                await asyncio.sleep(3600)
+
+        proc._dialer = RingingDialer()
+        call = asyncio.create_task(proc.process_body(json.dumps(valid_payload()), receive_count=2))
+        while not statuses(pub):
+            await asyncio.sleep(0)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert statuses(pub) == ["CALL_ATTEMPT_STARTED", "SIP_CALL_FAILED"]
+        md = json.loads(pub.published[-1]["metadata"]["metadataJson"])
+        assert md["reason"] == "worker-shutdown" and md["attempt"] == 2
+
 
 # ---------------------------------------------------------------------------
 # event_samples/ drift guard: the folder is the tracked model of what this
@@ -0,0 +1,153 @@
+"""Circuit breakers: open on error rate, pause intake, half-open with probes."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+import lk_ultravox_bridge.config as config_module
+from lk_ultravox_bridge.circuit_breakers import (
+    LIVEKIT_RTC,
+    LIVEKIT_SIP,
+    ULTRAVOX,
+    CircuitBreakers,
+    build_circuit_breakers,
+)
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import (
+    BlockingProcessor,
+    FakeClock,
+    MixedQueue,
+    make_config,
+    make_profile,
+    trigger,
+    wait_until,
+)
+
+log = logging.getLogger("test")
+
+BR = make_profile()
+CL = make_profile(country_code="CL", prefix="+56", provider="switch")
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": BR, "+56": CL})
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breakers(clock):
+    cfg = make_config(circuit_breaker_error_rate=0.5, circuit_breaker_min_calls=4, circuit_breaker_window_s=60,
+                      circuit_breaker_open_s=30, circuit_breaker_probes=1)
+    return CircuitBreakers(cfg, log, clock=clock)
+
+
+def fail(breakers, upstream, profile=None, n=4):
+    for _ in range(n):
+        breakers.record(upstream, False, profile)
+
+
+class TestCircuitBreakers:
+    def test_opens_on_error_rate_once_min_calls_are_in(self, breakers, caplog):
+        with caplog.at_level(logging.WARNING):
+            fail(breakers, LIVEKIT_SIP, BR, n=3)
+            assert not breakers.blocked(BR)
+            breakers.record(LIVEKIT_SIP, True, BR)
+        assert breakers.blocked(BR) and not breakers.blocked(CL)
+        assert breakers.open_names() == ["livekit-sip:BR"]
+        assert "[Breaker] open name=livekit-sip:BR errorRate=0.75 calls=4 openS=30" in caplog.text
+
+    def test_old_outcomes_leave_the_window(self, breakers, clock):
+        fail(breakers, LIVEKIT_RTC, BR, n=3)
+        clock.now += 61
+        breakers.record(LIVEKIT_RTC, False, BR)
+        assert not breakers.blocked(BR)
+
+    def test_ultravox_blocks_every_country(self, breakers):
+        fail(breakers, ULTRAVOX)
+        assert breakers.all_blocked([BR, CL])
+
+    def test_half_open_probe_closes_on_success(self, breakers, clock):
+        fail(breakers, LIVEKIT_SIP, BR)
+        clock.now += 30
+        assert breakers.admit(BR)
+        assert not breakers.admit(BR)  # one probe at a time
+        breakers.record(LIVEKIT_SIP, True, BR)
+        assert breakers.open_names() == []
+        assert breakers.admit(BR) and breakers.admit(BR)
+
+    def test_half_open_probe_failure_opens_again(self, breakers, clock):
+        fail(breakers, LIVEKIT_SIP, BR)
+        clock.now += 30
+        assert breakers.admit(BR)
+        breakers.record(LIVEKIT_SIP, False, BR)
+        assert breakers.blocked(BR)
+        clock.now += 29
+        assert breakers.blocked(BR)
+
+    def test_probe_that_never_reports_frees_its_slot(self, breakers, clock):
+        fail(breakers, LIVEKIT_SIP, BR)
+        clock.now += 30
+        assert breakers.admit(BR)
+        clock.now += 30
+        assert breakers.admit(BR)
+
+    def test_off_by_default(self):
+        assert build_circuit_breakers(make_config(), log) is None
+
+    def test_rate_above_one_fails_at_startup(self):
+        with pytest.raises(SystemExit):
+            build_circuit_breakers(make_config(circuit_breaker_error_rate=50), log)
+
+
+class TestWorkerLoopWithBreakers:
+    async def test_open_country_is_handed_back_while_the_other_keeps_dialing(self, profiles, caplog, breakers):
+        fail(breakers, LIVEKIT_RTC, CL)
+        consumer = MixedQueue([trigger("56912345678", "cl-1"), trigger("5511999998888", "br-1")])
+        proc = BlockingProcessor()
+        cfg = make_config(max_concurrent_calls=4, circuit_breaker_open_s=30)
+
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, breakers=breakers))
+            try:
+                await wait_until(lambda: len(proc.started) == 1)
+                await asyncio.sleep(0.05)
+            finally:
+                task.cancel()
+
+        assert [json.loads(b)["id"] for b in proc.started] == ["br-1"]
+        assert consumer.returned == [30]
+        assert "circuit breaker open; message returned to the queue country=CL breakers=livekit-rtc:CL" in caplog.text
+        assert "breakersOpen=1 breakerReleased=0" in caplog.text  # first heartbeat
+
+    async def test_repeat_hand_backs_wait_longer(self, profiles, breakers):
+        fail(breakers, LIVEKIT_RTC, CL)
+        consumer = MixedQueue([trigger("56912345678", "cl-1")], attributes={"ApproximateReceiveCount": "2"})
+        cfg = make_config(circuit_breaker_open_s=30)
+
+        task = asyncio.create_task(run_worker_loop(cfg, log, consumer, BlockingProcessor(), breakers=breakers))
+        try:
+            await wait_until(lambda: consumer.returned)
+        finally:
+            task.cancel()
+
+        assert consumer.returned == [120]
+
+    async def test_polling_pauses_while_ultravox_is_open(self, profiles, breakers):
+        fail(breakers, ULTRAVOX)
+        consumer = MixedQueue([trigger("5511999998888", "br-1")])
+        proc = BlockingProcessor()
+
+        task = asyncio.create_task(run_worker_loop(make_config(), log, consumer, proc, breakers=breakers))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert proc.started == [] and consumer.returned == []
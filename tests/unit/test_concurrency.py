@@ -0,0 +1,134 @@
+"""Adaptive concurrency: AIMD between floor and ceiling, driven by loop lag,
+per-frame handling time and CPU — and never ratcheting up on an idle node."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.concurrency import AdaptiveConcurrencyController
+from lk_ultravox_bridge.loop_monitor import LoopLagSampler, MultiLoopLag, SampleWindow
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, FakeClock, QueueOfBodies, make_config, wait_until
+
+log = logging.getLogger("test")
+
+
+class Signals:
+    """Controllable inputs: lag/frame windows plus CPU and wall clocks."""
+
+    def __init__(self):
+        self.clock = FakeClock()
+        self.cpu = FakeClock()
+        self.lag = SampleWindow(clock=self.clock)
+        self.frames = SampleWindow(clock=self.clock)
+
+    def tick(self, *, lag_ms=1.0, frame_ms=0.5, cpu_pct=20.0, seconds=10.0):
+        self.clock.now += seconds
+        self.cpu.now += seconds * cpu_pct / 100.0
+        for _ in range(20):
+            self.lag.add(lag_ms / 1000.0)
+            self.frames.add(frame_ms / 1000.0)
+
+
+def make_controller(signals, **overrides):
+    cfg = make_config(**{"max_concurrent_calls": 4, "adaptive_concurrency_min": 2,
+                         "adaptive_concurrency_max": 6, **overrides})
+    return AdaptiveConcurrencyController(cfg, log, signals.lag, signals.frames,
+                                         cpu_clock=signals.cpu, wall_clock=signals.clock)
+
+
+class TestAimd:
+    def test_starts_from_the_static_cap_clamped_to_the_bounds(self):
+        s = Signals()
+        assert make_controller(s).limit == 4
+        assert make_controller(s, max_concurrent_calls=50).limit == 6
+        assert make_controller(s, max_concurrent_calls=1).limit == 2
+
+    def test_healthy_and_saturated_probes_one_call_up_to_the_ceiling(self):
+        s = Signals()
+        ctl = make_controller(s)
+        for expected in (5, 6, 6):
+            s.tick()
+            assert ctl.evaluate(in_flight=ctl.limit) == expected
+
+    def test_idle_node_does_not_ratchet_up(self):
+        s = Signals()
+        ctl = make_controller(s)
+        s.tick()
+        assert ctl.evaluate(in_flight=1) == 4
+
+    @pytest.mark.parametrize("signal", [
+        {"lag_ms": 80.0},
+        {"frame_ms": 12.0},
+        {"cpu_pct": 95.0},
+    ])
+    def test_any_overload_signal_cuts_the_limit_multiplicatively(self, signal, caplog):
+        s = Signals()
+        ctl = make_controller(s, adaptive_concurrency_max=20, max_concurrent_calls=12)
+        s.tick(**signal)
+        with caplog.at_level(logging.INFO):
+            assert ctl.evaluate(in_flight=12) == 9
+        assert "[Concurrency] limit lowered from=12 to=9" in caplog.text
+
+    def test_decrease_never_goes_below_the_floor(self):
+        s = Signals()
+        ctl = make_controller(s)
+        for _ in range(5):
+            s.tick(lag_ms=200.0)
+            ctl.evaluate(in_flight=ctl.limit)
+        assert ctl.limit == 2
+
+    def test_sharded_run_backs_off_on_the_slowest_shard_loop(self):
+        s = Signals()
+        idle, slow = (LoopLagSampler(window=SampleWindow(clock=s.clock)) for _ in range(2))
+        ctl = AdaptiveConcurrencyController(
+            make_config(max_concurrent_calls=4, adaptive_concurrency_min=2, adaptive_concurrency_max=6),
+            log, MultiLoopLag([idle, slow]), s.frames, cpu_clock=s.cpu, wall_clock=s.clock)
+        s.tick()
+        for _ in range(20):
+            idle.record(0.001)
+            slow.record(0.200)
+        assert ctl.evaluate(in_flight=4) == 3
+
+    def test_frame_window_holds_a_whole_interval_at_the_ceiling(self):
+        s = Signals()
+        make_controller(s, adaptive_concurrency_max=400, adaptive_concurrency_interval_s=10.0, frame_ms=20)
+        assert s.frames.maxlen >= 400 * 500  # 400 calls x 50 frames/s x 10 s
+
+    def test_old_samples_outside_the_window_are_ignored(self):
+        s = Signals()
+        ctl = make_controller(s)
+        s.tick(lag_ms=200.0)
+        s.clock.now += 60.0  # the stall is long gone
+        s.cpu.now += 6.0
+        assert ctl.evaluate(in_flight=4) == 5
+
+
+class TestWorkerLoopWithController:
+    async def test_effective_limit_replaces_the_static_cap(self, caplog):
+        class FixedController:
+            limit = 2
+
+            async def run(self, in_flight):
+                await asyncio.Event().wait()
+
+        consumer = QueueOfBodies(["m1", "m2", "m3"])
+        proc = BlockingProcessor()
+        cfg = make_config(max_concurrent_calls=1, adaptive_concurrency_interval_s=0.05)
+        controller = FixedController()
+
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, controller=controller))
+            try:
+                await wait_until(lambda: len(proc.started) == 2)
+                assert "[HB] alive inFlight=0 max=2" in caplog.text
+
+                # Raising the limit while every slot is busy admits a call
+                # without waiting for one to finish.
+                controller.limit = 3
+                await wait_until(lambda: len(proc.started) == 3)
+            finally:
+                loop_task.cancel()
@@ -137,6 +137,30 @@ class TestBuildProfileVoiceResolution:
         assert profile.provider == "switch"
 
 
+class TestBuildProfileTrunks:
+    def test_failover_trunks_follow_the_primary(self, monkeypatch):
+        from lk_ultravox_bridge.config import SipTrunk
+
+        monkeypatch.setenv("SIP_TRUNK_ID_BR", "ST_a")
+        monkeypatch.setenv("SIP_FROM_NUMBER_BR", "+551130000000")
+        monkeypatch.setenv("SIP_FAILOVER_TRUNKS_BR", "ST_b:+551140000000, ST_c")
+        profile = _build_profile("BR", "+55", "twilio")
+        assert profile.sip_trunks() == (SipTrunk("ST_a", "+551130000000"), SipTrunk("ST_b", "+551140000000"),
+                                        SipTrunk("ST_c", "+551130000000"))
+
+    def test_trunk_pool_members_start_with_the_primary(self, monkeypatch):
+        from lk_ultravox_bridge.config import SipTrunk
+
+        monkeypatch.setenv("SIP_TRUNK_ID_BR", "ST_a")
+        monkeypatch.setenv("SIP_FROM_NUMBER_BR", "+551130000000")
+        monkeypatch.setenv("SIP_TRUNK_POOL_BR", "ST_b, :+551150000000")  # caller-id-only entry: primary trunk
+        monkeypatch.setenv("SIP_POOL_STRATEGY_BR", "Least-In-Flight")
+        profile = _build_profile("BR", "+55", "twilio")
+        assert profile.pool_members() == (SipTrunk("ST_a", "+551130000000"), SipTrunk("ST_b", "+551130000000"),
+                                          SipTrunk("ST_a", "+551150000000"))
+        assert profile.sip_pool_strategy == "least-in-flight"
+
+
 class TestEnvFlag:
     @pytest.mark.parametrize("raw", ["1", "true", "TRUE", "yes", " True "])
     def test_truthy_values(self, monkeypatch, raw):
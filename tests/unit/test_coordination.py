@@ -0,0 +1,184 @@
+"""Cluster-wide leases: caps hold across workers sharing a store, and a
+crashed worker's slots come back after one TTL."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+import lk_ultravox_bridge.config as config_module
+from lk_ultravox_bridge.coordination import (
+    CallSlotLeases,
+    LeaseBackend,
+    SqliteLeaseBackend,
+    acquire_cps_lease,
+    build_lease_backend,
+)
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import (
+    BlockingProcessor,
+    FakeClock,
+    MixedQueue,
+    make_config,
+    make_profile,
+    trigger,
+    wait_until,
+)
+
+log = logging.getLogger("test")
+
+
+class MemoryBackend(LeaseBackend):
+    """What a custom COORDINATION_BACKEND factory returns."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+
+def make_memory_backend(cfg):
+    return MemoryBackend(cfg)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    """Two workers' views of one SQLite lease file."""
+    path = str(tmp_path / "leases.sqlite")
+    return SqliteLeaseBackend(path, clock=clock), SqliteLeaseBackend(path, clock=clock)
+
+
+class TestSqliteLeaseBackend:
+    def test_limit_holds_across_workers_sharing_the_file(self, store):
+        a, b = store
+        assert a.acquire("slots:ST", 2, 60) is not None
+        assert b.acquire("slots:ST", 2, 60) is not None
+        assert a.acquire("slots:ST", 2, 60) is None
+        assert b.acquire("slots:OTHER", 2, 60) is not None  # keys are independent
+
+    def test_release_frees_the_slot(self, store):
+        a, b = store
+        lease = a.acquire("slots:ST", 1, 60)
+        assert b.acquire("slots:ST", 1, 60) is None
+        a.release(lease)
+        assert b.acquire("slots:ST", 1, 60) is not None
+
+    def test_crashed_holders_lease_expires_after_its_ttl(self, store, clock):
+        a, b = store
+        a.acquire("slots:ST", 1, 60)  # worker a dies holding it
+        clock.now += 59
+        assert b.acquire("slots:ST", 1, 60) is None
+        clock.now += 2
+        assert b.acquire("slots:ST", 1, 60) is not None
+
+    def test_renewal_keeps_a_lease_alive_until_it_has_expired(self, store, clock):
+        a, b = store
+        lease = a.acquire("slots:ST", 1, 60)
+        clock.now += 50
+        assert a.renew(lease, 60)
+        clock.now += 50
+        assert b.acquire("slots:ST", 1, 60) is None  # renewed: still held
+        clock.now += 11
+        assert not a.renew(lease, 60)
+
+
+class TestBuildLeaseBackend:
+    def test_disabled_by_default(self):
+        assert build_lease_backend(make_config(), log) is None
+
+    def test_sqlite(self, tmp_path):
+        cfg = make_config(coordination_backend="sqlite", coordination_sqlite_path=str(tmp_path / "l.sqlite"))
+        assert isinstance(build_lease_backend(cfg, log), SqliteLeaseBackend)
+
+    def test_custom_factory_by_dotted_path(self):
+        cfg = make_config(coordination_backend="tests.unit.test_coordination:make_memory_backend")
+        backend = build_lease_backend(cfg, log)
+        assert isinstance(backend, MemoryBackend) and backend.cfg is cfg
+
+    def test_malformed_spec_fails_at_startup(self):
+        with pytest.raises(SystemExit):
+            build_lease_backend(make_config(coordination_backend="redis"), log)
+
+
+class TestCallSlotLeases:
+    async def test_lease_lost_before_renewal_is_dropped_with_a_warning(self, store, clock, caplog):
+        a, _ = store
+        leases = CallSlotLeases(make_config(coordination_lease_ttl_s=60), log, a)
+        profile = make_profile(cluster_max_concurrent_calls=1)
+        await leases.acquire(profile)
+        clock.now += 61
+        with caplog.at_level(logging.WARNING):
+            await leases.renew_all()
+        assert leases.heartbeat_gauges() == {"clusterLeases": 0, "clusterDenied": 0}
+        assert "lease expired before renewal key=slots:BR" in caplog.text
+
+    async def test_slots_are_per_country_whatever_trunk_dials(self, store):
+        # The slot is taken before the pool/failover picks the trunk.
+        a, _ = store
+        leases = CallSlotLeases(make_config(), log, a)
+        assert await leases.acquire(make_profile(cluster_max_concurrent_calls=1, sip_trunk_id="ST_a")) is not None
+        assert await leases.acquire(make_profile(cluster_max_concurrent_calls=1, sip_trunk_id="ST_b")) is None
+
+    async def test_cps_window_is_shared_by_every_worker(self, store, clock, monkeypatch):
+        a, b = store
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(seconds):
+            clock.now += seconds
+            await real_sleep(0)
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        profile = make_profile(sip_dial_cps=2.0)
+        start = clock.now
+        assert await acquire_cps_lease(a, profile) == pytest.approx(0.0, abs=0.01)
+        await acquire_cps_lease(b, profile)
+        await acquire_cps_lease(a, profile)  # third dial in the window: waits it out
+        assert clock.now - start == pytest.approx(1.0, abs=0.06)
+
+
+class TestWorkerLoopWithClusterSlots:
+    async def test_country_at_its_cluster_cap_hands_the_message_back(self, store, monkeypatch, caplog):
+        a, b = store
+        br = make_profile(cluster_max_concurrent_calls=1)
+        cl = make_profile(country_code="CL", prefix="+56", sip_trunk_id="ST_test_cl")
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": br, "+56": cl})
+        b.acquire("slots:BR", 1, 60)  # another worker holds the country's only slot
+
+        consumer = MixedQueue([trigger("5511999998888", "br-1"), trigger("56912345678", "cl-1")])
+        proc = BlockingProcessor()
+        leases = CallSlotLeases(make_config(), log, a)
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(make_config(), log, consumer, proc, leases=leases))
+            try:
+                await wait_until(lambda: len(proc.started) == 1)
+            finally:
+                task.cancel()
+
+        assert json.loads(proc.started[0])["id"] == "cl-1"
+        assert len(consumer.returned) == 1
+        assert "country at its cluster cap; message returned to the queue country=BR cap=1" in caplog.text
+        assert leases.denied == 1
+
+    async def test_slot_is_released_when_the_call_ends(self, store, monkeypatch):
+        a, b = store
+        br = make_profile(cluster_max_concurrent_calls=1)
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": br, "+56": make_profile(country_code="CL", prefix="+56")})
+
+        consumer = MixedQueue([trigger("5511999998888", "br-1")])
+        proc = BlockingProcessor()
+        leases = CallSlotLeases(make_config(), log, a)
+        task = asyncio.create_task(run_worker_loop(make_config(), log, consumer, proc, leases=leases))
+        try:
+            await wait_until(lambda: len(proc.started) == 1)
+            assert b.acquire("slots:BR", 1, 60) is None
+            proc.release[proc.started[0]].set()
+            await wait_until(lambda: b.acquire("slots:BR", 1, 60) is not None)
+            assert leases.heartbeat_gauges()["clusterLeases"] == 0
+        finally:
+            task.cancel()
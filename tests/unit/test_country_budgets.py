@@ -0,0 +1,98 @@
+"""Per-country budgets: one country's flood cannot take every call slot."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+import lk_ultravox_bridge.config as config_module
+from lk_ultravox_bridge.country_budgets import COUNTRY_FULL_RETRY_S, CountryBudgets
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, MixedQueue, make_config, make_profile, trigger, wait_until
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture
+def capped_profiles(monkeypatch):
+    br = make_profile(max_concurrent_calls=0)
+    cl = make_profile(country_code="CL", prefix="+56", provider="switch", sip_trunk_id="ST_test_cl",
+                      max_concurrent_calls=1)
+    monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": br, "+56": cl})
+    return {"BR": br, "CL": cl}
+
+
+class TestCountryBudgets:
+    def test_routes_by_destination_and_ignores_unparseable_bodies(self, capped_profiles):
+        budgets = CountryBudgets(make_config())
+        assert budgets.route(trigger("56912345678", "c1")) is capped_profiles["CL"]
+        assert budgets.route(trigger("5511999998888", "b1")) is capped_profiles["BR"]
+        assert budgets.route("not json") is None
+
+    def test_capped_country_fills_while_uncapped_one_never_does(self, capped_profiles):
+        budgets = CountryBudgets(make_config())
+        budgets.acquire(capped_profiles["CL"])
+        assert not budgets.has_room(capped_profiles["CL"])
+        assert budgets.has_room(capped_profiles["BR"])
+        assert not budgets.all_full()
+        budgets.release(capped_profiles["CL"])
+        assert budgets.has_room(capped_profiles["CL"])
+
+    def test_all_full_only_when_every_country_is_capped_and_full(self, capped_profiles, monkeypatch):
+        br = make_profile(max_concurrent_calls=1)
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": br, "+56": capped_profiles["CL"]})
+        budgets = CountryBudgets(make_config())
+        budgets.acquire(capped_profiles["CL"])
+        assert not budgets.all_full()
+        budgets.acquire(br)
+        assert budgets.all_full()  # nothing pulled now could run: stop polling
+
+    def test_node_budget_is_split_between_worker_processes(self, capped_profiles, monkeypatch):
+        cl = make_profile(country_code="CL", prefix="+56", max_concurrent_calls=5)
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": capped_profiles["BR"], "+56": cl})
+        caps = [CountryBudgets(make_config(worker_index=i, worker_count=2)).cap(cl) for i in range(2)]
+        assert caps == [3, 2]
+        assert CountryBudgets(make_config()).cap(capped_profiles["BR"]) is None
+
+
+class TestWorkerLoopWithCountryCaps:
+    async def test_full_country_is_handed_back_while_the_other_keeps_dialing(self, capped_profiles, caplog):
+        consumer = MixedQueue([
+            trigger("56912345678", "cl-1"),
+            trigger("56912345679", "cl-2"),   # CL at its cap of 1: back to the queue
+            trigger("5511999998888", "br-1"),
+        ])
+        proc = BlockingProcessor()
+        cfg = make_config(max_concurrent_calls=4)
+
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc))
+            try:
+                await wait_until(lambda: len(proc.started) == 2)
+                await asyncio.sleep(0.05)
+            finally:
+                task.cancel()
+
+        assert [json.loads(b)["id"] for b in proc.started] == ["cl-1", "br-1"]
+        assert consumer.returned == [COUNTRY_FULL_RETRY_S]
+        assert "country at its cap; message returned to the queue country=CL callsInFlight=1 cap=1" in caplog.text
+        assert "callsBR=0 callsCL=0 countryReleased=0" in caplog.text  # first heartbeat, before any call
+
+    async def test_repeat_hand_backs_wait_longer(self, capped_profiles, caplog):
+        # A message already handed back twice: 15s would DLQ a long flood.
+        consumer = MixedQueue([trigger("56912345678", "cl-1"), trigger("56912345679", "cl-2")],
+                              attributes={"ApproximateReceiveCount": "3"})
+        proc = BlockingProcessor()
+
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(make_config(max_concurrent_calls=4), log, consumer, proc))
+            try:
+                await wait_until(lambda: consumer.returned)
+            finally:
+                task.cancel()
+
+        assert consumer.returned == [COUNTRY_FULL_RETRY_S * 16]
+        assert "retryInS=240" in caplog.text
@@ -0,0 +1,91 @@
+"""Negative dial cache: per-reason TTLs, bounded stores, persistence."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.dial_outcomes import (
+    MemoryDialOutcomeStore,
+    NegativeDialCache,
+    SqliteDialOutcomeStore,
+    build_negative_dial_cache,
+    parse_reason_ttls,
+)
+from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+from tests.conftest import FakeClock, make_config
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryDialOutcomeStore(2, clock=clock)
+    return SqliteDialOutcomeStore(str(tmp_path / "outcomes.sqlite"), 2, clock=clock)
+
+
+class TestParseReasonTtls:
+    def test_reason_seconds_pairs(self):
+        assert parse_reason_ttls("invalid-number:2592000, unavailable:3600") == {
+            "invalid-number": 2592000.0, "unavailable": 3600.0}
+        assert parse_reason_ttls("") == {}
+
+    @pytest.mark.parametrize("spec", ["voicemail:60", "busy:x", "busy:0"])
+    def test_bad_spec_fails_at_startup(self, spec):
+        with pytest.raises(SystemExit):
+            parse_reason_ttls(spec)
+
+    def test_dial_timeout_is_not_cacheable(self):
+        with pytest.raises(ValueError, match="dial-timeout"):
+            parse_reason_ttls("invalid-number:2592000,dial-timeout:60")
+
+
+class TestStores:
+    def test_outcome_expires_with_its_ttl(self, store, clock):
+        store.put("+5511000000001", ("invalid-number", 404), 60)
+        assert store.get(["+5511000000001", "+5511000000002"]) == {"+5511000000001": ("invalid-number", 404)}
+        clock.now += 61
+        assert store.get(["+5511000000001"]) == {}
+
+    def test_size_bound_evicts(self, store):
+        for i, ttl in enumerate((30, 60, 90)):
+            store.put(f"+551100000000{i}", ("unavailable", None), ttl)
+        assert len(store.get([f"+551100000000{i}" for i in range(3)])) == 2
+        assert store.get(["+5511000000002"])  # the newest is kept
+
+    def test_sqlite_survives_a_restart(self, tmp_path, clock):
+        path = str(tmp_path / "outcomes.sqlite")
+        SqliteDialOutcomeStore(path, 10, clock=clock).put("+5511000000001", ("invalid-number", 484), 60)
+        assert SqliteDialOutcomeStore(path, 10, clock=clock).get(["+5511000000001"]) == {
+            "+5511000000001": ("invalid-number", 484)}
+
+
+class TestNegativeDialCache:
+    async def test_only_reasons_with_a_ttl_are_recorded(self):
+        cache = NegativeDialCache(make_config(negative_cache_ttls="invalid-number:60"), MemoryDialOutcomeStore(10))
+        await cache.record("+5511000000001", CallNotAnsweredError("invalid-number", 404))
+        await cache.record("+5511000000002", CallNotAnsweredError("busy", 486))
+        found = await cache.lookup(["+5511000000001", "+5511000000002"])
+        assert list(found) == ["+5511000000001"]
+        assert (found["+5511000000001"].reason, found["+5511000000001"].sip_status) == ("invalid-number", 404)
+
+
+class TestBuild:
+    def test_off_by_default(self):
+        assert build_negative_dial_cache(make_config(), log) is None
+
+    def test_sqlite_backend(self, tmp_path):
+        cfg = make_config(negative_cache_ttls="invalid-number:60", negative_cache_backend="sqlite",
+                          negative_cache_sqlite_path=str(tmp_path / "o.sqlite"))
+        assert isinstance(build_negative_dial_cache(cfg, log), NegativeDialCache)
+
+    def test_unknown_backend_fails_at_startup(self):
+        with pytest.raises(SystemExit):
+            build_negative_dial_cache(make_config(negative_cache_ttls="busy:60", negative_cache_backend="redis"), log)
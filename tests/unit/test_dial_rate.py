@@ -0,0 +1,97 @@
+"""Per-trunk dial pacing: a burst of dials queues behind a token bucket per
+SIP trunk instead of being sent and rejected by the carrier."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.dial_rate import TokenBucket, TrunkDialRateLimiter
+
+from tests.conftest import FakeClock, make_config, make_profile
+
+log = logging.getLogger("test")
+
+
+class TestTokenBucket:
+    def test_burst_goes_immediately_then_callers_queue_in_order(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    def test_refills_at_the_rate_up_to_the_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 10.0  # idle: refills to the burst, not beyond
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+    def test_refund_gives_the_slot_to_the_next_caller(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=1, clock=clock)
+        bucket.reserve()
+        assert bucket.reserve() == 1.0
+        bucket.refund()
+        assert bucket.reserve() == 1.0
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records asyncio.sleep calls instead of waiting."""
+    recorded = []
+
+    async def fake_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+class TestTrunkDialRateLimiter:
+    async def test_unpaced_profile_never_waits(self):
+        limiter = TrunkDialRateLimiter(make_config(), log)
+        profile = make_profile(sip_dial_cps=0.0)
+        assert [await limiter.acquire(profile) for _ in range(5)] == [0.0] * 5
+
+    async def test_profiles_sharing_a_trunk_share_its_bucket(self, sleeps):
+        limiter = TrunkDialRateLimiter(make_config(), log, clock=FakeClock())
+        br = make_profile(sip_trunk_id="ST_shared", sip_dial_cps=4.0)
+        cl = make_profile(country_code="CL", sip_trunk_id="ST_shared", sip_dial_cps=4.0)
+        other = make_profile(country_code="CL", sip_trunk_id="ST_other", sip_dial_cps=4.0)
+
+        assert await limiter.acquire(br) == 0.0
+        assert await limiter.acquire(cl) == 0.25
+        assert await limiter.acquire(other) == 0.0
+        assert sleeps == [0.25]
+
+    async def test_rate_share_scales_the_trunk_rate(self, sleeps, caplog):
+        limiter = TrunkDialRateLimiter(make_config(sip_dial_rate_share=0.5), log, clock=FakeClock())
+        profile = make_profile(sip_dial_cps=4.0)
+        with caplog.at_level(logging.INFO):
+            await limiter.acquire(profile)
+        assert await limiter.acquire(profile) == 0.5  # 2 cps for this process
+        assert "dial pacing trunk=ST_test country=BR cps=2.00 burst=1" in caplog.text
+
+    async def test_cancelled_wait_returns_its_slot(self):
+        limiter = TrunkDialRateLimiter(make_config(), log, clock=FakeClock())
+        profile = make_profile(sip_dial_cps=1.0)
+        await limiter.acquire(profile)
+        waiter = asyncio.ensure_future(limiter.acquire(profile))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # Without the refund the next caller would be 2 s out, not 1 s.
+        assert limiter._buckets["ST_test"].reserve() == 1.0
+
+    async def test_with_a_lease_backend_the_cluster_window_replaces_the_local_bucket(self, tmp_path):
+        from lk_ultravox_bridge.coordination import SqliteLeaseBackend
+
+        backend = SqliteLeaseBackend(str(tmp_path / "leases.sqlite"))
+        limiter = TrunkDialRateLimiter(make_config(sip_dial_rate_share=0.25), log, backend=backend)
+        profile = make_profile(sip_dial_cps=5.0)
+        # No per-process share: all five of the trunk's dials this second are available.
+        assert [round(await limiter.acquire(profile), 1) for _ in range(5)] == [0.0] * 5
+        assert limiter._buckets == {}
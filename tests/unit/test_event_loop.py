@@ -0,0 +1,45 @@
+"""EVENT_LOOP selection: uvloop when asked for and installed, asyncio
+otherwise — never a startup failure over an optional dependency."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+
+import pytest
+
+from lk_ultravox_bridge import event_loop
+
+
+async def running_loop_name():
+    return event_loop.loop_name()
+
+
+class TestLoopSelection:
+    def test_default_is_the_stdlib_loop(self):
+        assert event_loop.loop_factory("asyncio") is None
+        assert event_loop.run(running_loop_name(), "asyncio") == "asyncio"
+
+    def test_uvloop_runs_when_installed(self):
+        pytest.importorskip("uvloop")
+        assert event_loop.run(running_loop_name(), "uvloop") == "uvloop"
+        loop = event_loop.new_event_loop("uvloop")
+        try:
+            assert type(loop).__module__.startswith("uvloop")
+        finally:
+            loop.close()
+
+    def test_missing_uvloop_falls_back_with_a_warning(self, monkeypatch, caplog):
+        monkeypatch.setitem(sys.modules, "uvloop", None)  # import raises ImportError
+        with caplog.at_level(logging.WARNING):
+            assert event_loop.run(running_loop_name(), "uvloop") == "asyncio"
+        assert "uvloop is not installed; using asyncio" in caplog.text
+
+    def test_unknown_value_falls_back_with_a_warning(self, caplog):
+        with caplog.at_level(logging.WARNING):
+            loop = event_loop.new_event_loop("trio")
+        try:
+            assert isinstance(loop, asyncio.AbstractEventLoop)
+        finally:
+            loop.close()
+        assert "unknown EVENT_LOOP='trio'" in caplog.text
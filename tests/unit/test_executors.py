@@ -0,0 +1,114 @@
+"""Dedicated I/O pools: an ack never waits behind a publish, and each pool
+reports how many jobs wait for a thread and for how long."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from lk_ultravox_bridge.call_history import SqsCallHistoryPublisher
+from lk_ultravox_bridge.executors import BoundedExecutor, IoExecutors, format_io_fields
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, QueueOfBodies, make_config, wait_until
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture
+def executors():
+    pools = IoExecutors(make_config(sqs_poll_threads=1, sqs_ack_threads=1, call_history_publish_threads=1))
+    yield pools
+    pools.shutdown()
+
+
+class TestBoundedExecutor:
+    async def test_runs_the_function_in_a_pool_thread(self):
+        pool = BoundedExecutor("ack", 1)
+        try:
+            name = await pool.run(lambda: threading.current_thread().name)
+            assert name.startswith("io-ack")
+        finally:
+            pool.shutdown()
+
+    async def test_queue_depth_counts_jobs_waiting_for_a_thread(self):
+        pool = BoundedExecutor("publish", 1)
+        gate = threading.Event()
+        try:
+            first = asyncio.ensure_future(pool.run(gate.wait))
+            queued = [asyncio.ensure_future(pool.run(lambda: None)) for _ in range(2)]
+            await wait_until(lambda: pool.queued == 2)
+            gate.set()
+            await asyncio.gather(first, *queued)
+            assert pool.queued == 0
+            assert pool.heartbeat_gauges(60)["publishWaitP99Ms"] > 0
+        finally:
+            gate.set()
+            pool.shutdown()
+
+    async def test_cancelled_job_that_never_started_leaves_the_queue(self):
+        pool = BoundedExecutor("publish", 1)
+        gate = threading.Event()
+        try:
+            first = asyncio.ensure_future(pool.run(gate.wait))
+            waiting = asyncio.ensure_future(pool.run(lambda: None))
+            await wait_until(lambda: pool.queued == 1)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            assert pool.queued == 0
+            gate.set()
+            await first
+        finally:
+            gate.set()
+            pool.shutdown()
+
+
+class TestIoIsolation:
+    async def test_ack_is_not_stuck_behind_saturated_publishes(self, executors):
+        gate = threading.Event()
+
+        class SlowSqs:
+            def send_message(self, **kwargs):
+                gate.wait()
+
+        publisher = SqsCallHistoryPublisher(SlowSqs(), "https://sqs.test/q", log, executors.publish)
+        publishes = [asyncio.ensure_future(publisher.publish({"n": i})) for i in range(5)]
+        try:
+            await wait_until(lambda: executors.publish.queued == 4)
+            deleted = []
+            await asyncio.wait_for(executors.ack.run(deleted.append, "rh-1"), timeout=1.0)
+            assert deleted == ["rh-1"]
+            gauges = executors.heartbeat_gauges(60)
+            assert gauges["ackQueue"] == 0 and gauges["publishQueue"] == 4
+        finally:
+            gate.set()
+            await asyncio.gather(*publishes)
+
+    async def test_worker_loop_polls_and_acks_on_the_pools_and_reports_them(self, executors, caplog):
+        class AckingProcessor(BlockingProcessor):
+            async def process_body(self, body, ack=None, receive_count=None):
+                await ack()
+                await super().process_body(body, ack, receive_count)
+
+        consumer = QueueOfBodies(["m1"])
+        proc = AckingProcessor()
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(make_config(), log, consumer, proc, executors=executors))
+            try:
+                await wait_until(lambda: consumer.deleted == ["rh-m1"])
+            finally:
+                task.cancel()
+        assert "ackQueue=0 ackWaitP99Ms=" in caplog.text
+        assert executors.ack.waits.values(60)
+        assert executors.poll.waits.values(60)
+
+
+def test_format_io_fields_order():
+    gauges = {"pollQueue": 0, "pollWaitP99Ms": 0.04, "ackQueue": 1, "ackWaitP99Ms": 2.5,
+              "publishQueue": 7, "publishWaitP99Ms": 130.0}
+    assert format_io_fields(gauges) == (
+        " pollQueue=0 pollWaitP99Ms=0.0 ackQueue=1 ackWaitP99Ms=2.5"
+        " publishQueue=7 publishWaitP99Ms=130.0"
+    )
@@ -0,0 +1,161 @@
+"""Tenant/campaign fair share: deficit round-robin over a look-ahead batch."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.fair_share import DeficitRoundRobin, FairShare, build_fair_share
+from lk_ultravox_bridge.sqs_consumer import SqsMessage
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, make_config, valid_payload, wait_until
+
+log = logging.getLogger("test")
+
+
+def trigger(call_id: str, tenant: str = "tenant-1", campaign: str = "cmp-1") -> str:
+    payload = valid_payload(id=call_id, tenantId=tenant)
+    payload["metadata"]["campaignId"] = campaign
+    return json.dumps(payload)
+
+
+def message(body: str, receives: int = 1) -> SqsMessage:
+    return SqsMessage(receipt_handle=f"rh-{json.loads(body)['id']}", body=body,
+                      attributes={"ApproximateReceiveCount": str(receives)})
+
+
+class RedeliveringQueue:
+    """Sync SQS fake: batch receives, and a released message is available
+    again at once (at the back).  Counts receives per message."""
+
+    def __init__(self, bodies):
+        self._pending = list(bodies)
+        self._in_flight = {}
+        self.batches = []
+        self.released = []
+        self.receives = {}
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        batch, self._pending = self._pending[:max_messages], self._pending[max_messages:]
+        if not batch:
+            import time
+            time.sleep(0.005)
+            return []
+        self.batches.append(len(batch))
+        for body in batch:
+            self.receives[body] = self.receives.get(body, 0) + 1
+        msgs = [message(body, self.receives[body]) for body in batch]
+        self._in_flight.update((m.receipt_handle, m.body) for m in msgs)
+        return msgs
+
+    def delete(self, receipt_handle):
+        self._in_flight.pop(receipt_handle, None)
+
+    def change_visibility(self, receipt_handle, visibility_timeout):
+        self.released.append((receipt_handle, visibility_timeout))
+        self._pending.append(self._in_flight.pop(receipt_handle))
+
+
+class TestDeficitRoundRobin:
+    def test_flows_take_turns(self):
+        drr = DeficitRoundRobin()
+        assert drr.pick({"A": ["a1", "a2", "a3"], "B": ["b1"], "C": ["c1", "c2"]}, 5) == ["a1", "b1", "c1", "a2", "c2"]
+
+    def test_round_resumes_where_the_previous_batch_stopped(self):
+        drr = DeficitRoundRobin()
+        backlog = {"A": ["a"] * 9, "B": ["b"]}
+        assert [drr.pick(backlog, 1) for _ in range(4)] == [["a"], ["b"], ["a"], ["b"]]
+
+    def test_flow_that_goes_idle_saves_no_credit(self):
+        drr = DeficitRoundRobin(quantum=2)
+        drr.pick({"A": ["a1"], "B": ["b1", "b2", "b3"]}, 2)  # A spends 1 of its 2
+        drr.pick({"B": ["b4"]}, 1)  # A idle: leaves the round
+        assert drr.pick({"A": ["a2", "a3", "a4"], "B": ["b5", "b6"]}, 4) == ["b5", "b6", "a2", "a3"]
+
+
+class TestFairShare:
+    def test_flow_key(self):
+        body = trigger("m1", tenant="t1", campaign="c1")
+        assert FairShare(make_config(fair_share_key="tenant")).flow(body) == "t1"
+        assert FairShare(make_config(fair_share_key="tenant,campaign")).flow(body) == "t1/c1"
+        assert FairShare(make_config(fair_share_key="campaign")).flow("not json") == "-"
+
+    def test_split_starts_the_free_slots_and_releases_the_rest(self):
+        fair = FairShare(make_config(fair_share_key="tenant"))
+        msgs = [message(trigger(f"a{i}", tenant="A")) for i in range(3)] + [message(trigger("b0", tenant="B"))]
+        start, release, flows = fair.split(msgs, 2)
+        assert [m.receipt_handle for m in start] == ["rh-a0", "rh-b0"]
+        assert [m.receipt_handle for m in release] == ["rh-a1", "rh-a2"]
+        assert flows == {"A": 3, "B": 1}
+        assert fair.heartbeat_gauges() == {"fairReleased": 2}
+
+    def test_batch_is_the_free_slots_plus_a_margin_until_one_flow_is_seen(self):
+        fair = FairShare(make_config(fair_share_key="tenant"))
+        assert fair.batch_size(3) == 5 and fair.batch_size(9) == 10
+        fair.split([message(trigger(f"a{i}", tenant="A")) for i in range(5)], 3)
+        assert fair.batch_size(3) == 3  # nobody to be fair to: release nothing
+        for _ in range(7):
+            fair.split([message(trigger("a", tenant="A"))], 1)
+        assert fair.batch_size(3) == 5  # look again for other flows
+
+    def test_message_close_to_the_dlq_starts_first_or_waits(self):
+        fair = FairShare(make_config(fair_share_key="tenant", sqs_max_receive_count=5))
+        msgs = [message(trigger("a0", tenant="A")), message(trigger("a1", tenant="A"), receives=4),
+                message(trigger("a2", tenant="A"), receives=4)]
+        start, release, _ = fair.split(msgs, 1)
+        assert [m.receipt_handle for m in start] == ["rh-a1"]
+        assert [(m.receipt_handle, fair.release_delay_s(m)) for m in release] == [("rh-a0", 0), ("rh-a2", 960)]
+
+    def test_lookahead_is_capped_at_the_sqs_batch_size(self):
+        assert FairShare(make_config(fair_share_key="tenant", fair_share_lookahead=50)).lookahead == 10
+
+    def test_off_by_default_and_bad_key_fails_at_startup(self):
+        assert build_fair_share(make_config()) is None
+        with pytest.raises(SystemExit):
+            build_fair_share(make_config(fair_share_key="customer"))
+
+
+class TestWorkerLoopWithFairShare:
+    async def test_flooding_tenant_shares_slots_and_unstarted_messages_go_back(self, caplog):
+        bodies = ([trigger(f"a{i}", tenant="A") for i in range(4)] + [trigger(f"b{i}", tenant="B") for i in range(2)]
+                  + [trigger(f"a{i}", tenant="A") for i in range(4, 8)])
+        consumer = RedeliveringQueue(bodies)
+        proc = BlockingProcessor()
+        cfg = make_config(max_concurrent_calls=4, fair_share_key="tenant")
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, fair_share=build_fair_share(cfg)))
+            try:
+                await wait_until(lambda: len(proc.started) == 4)
+                await asyncio.sleep(0.05)
+            finally:
+                task.cancel()
+
+        assert sorted(json.loads(b)["tenantId"] for b in proc.started) == ["A", "A", "B", "B"]
+        assert consumer.batches[0] == 6  # 4 free slots + the look-ahead margin
+        assert consumer.released[:2] == [("rh-a2", 0), ("rh-a3", 0)]
+        assert "[SQS] fair share started=4 released=2 flows=A:4|B:2" in caplog.text
+
+    async def test_single_tenant_backlog_stays_under_the_receive_limit(self):
+        class QuickProcessor:
+            def __init__(self):
+                self.started = []
+
+            async def process_body(self, body, ack=None, receive_count=None):
+                self.started.append(body)
+                await asyncio.sleep(0.001)
+                await ack()
+
+        bodies = [trigger(f"a{i}", tenant="A") for i in range(60)]
+        consumer = RedeliveringQueue(bodies)
+        proc = QuickProcessor()
+        cfg = make_config(max_concurrent_calls=2, fair_share_key="tenant")
+        task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, fair_share=build_fair_share(cfg)))
+        try:
+            await wait_until(lambda: len(proc.started) == 60, timeout=5)
+        finally:
+            task.cancel()
+
+        assert max(consumer.receives.values()) < cfg.sqs_max_receive_count
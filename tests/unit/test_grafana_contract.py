@@ -30,6 +30,23 @@ WATCHED = [
     ("receiveCount=", "sqs_worker.py"),             # DLQ-bound stat (redrive at 5)
     ("receive failed", "sqs_worker.py"),            # failures: infra
     ("crashed unexpectedly", "sqs_worker.py"),
+    ("teardownPending=", "sqs_worker.py"),          # background room deletions
+    ("teardownFailed=", "sqs_worker.py"),
+    ("loopLagP50Ms=", "loop_monitor.py"),           # event-loop scheduling delay
+    ("loopLagP99Ms=", "loop_monitor.py"),
+    ("[Loop] event loop blocked", "loop_monitor.py"),
+    ("ackWaitP99Ms=", "executors.py"),             # dedicated I/O pools
+    ("publishWaitP99Ms=", "executors.py"),
+    ("countryReleased=", "country_budgets.py"),    # per-country budgets
+    ("fairReleased=", "sqs_worker.py"),             # tenant/campaign fair share
+    ("duplicate TRIGGER_CALL skipped", "sqs_worker.py"),  # idempotency store
+    ("poison message", "sqs_worker.py"),            # invalid payloads settled on delivery
+    ("known-unreachable number", "sqs_worker.py"),  # negative dial cache
+    ("trunk failover", "livekit_client.py"),  # SIP trunk failover
+    ("CreateSIPParticipant to=", "livekit_client.py"),  # trunk pool members
+    ("[Breaker] open name=", "circuit_breakers.py"),  # circuit breakers
+    ("retrying call creation", "ultravox_client.py"),  # Ultravox retries
+    ("hedging call creation", "ultravox_client.py"),  # Ultravox hedging
     ("buffer overflow", "audio_bridge.py"),         # audio quality
     ("watchdog", "audio_bridge.py"),
     ("[LiveKit][SIP] ok", "livekit_client.py"),     # time-to-answer
@@ -0,0 +1,91 @@
+"""Idempotency store: claim / complete / release semantics, expiry, and the
+shared SQLite backend seen from two processes."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.idempotency import (
+    DONE,
+    IN_PROGRESS,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+    TriggerIdempotency,
+    build_trigger_idempotency,
+)
+
+from tests.conftest import FakeClock, make_config
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def stores(request, tmp_path, clock):
+    """Two workers' views of one store (the same object for memory)."""
+    if request.param == "memory":
+        store = MemoryIdempotencyStore(100, clock=clock)
+        return store, store
+    path = str(tmp_path / "triggers.sqlite")
+    return SqliteIdempotencyStore(path, clock=clock), SqliteIdempotencyStore(path, clock=clock)
+
+
+class TestStores:
+    def test_claim_then_duplicate_sees_its_state(self, stores):
+        a, b = stores
+        assert a.claim("msg-1", 300) is None
+        assert b.claim("msg-1", 300) == IN_PROGRESS
+        a.complete("msg-1", 86400)
+        assert b.claim("msg-1", 300) == DONE
+
+    def test_release_lets_the_retry_dial_but_keeps_a_final_outcome(self, stores):
+        a, b = stores
+        a.claim("msg-1", 300)
+        a.release("msg-1")
+        assert b.claim("msg-1", 300) is None
+        b.complete("msg-1", 86400)
+        b.release("msg-1")
+        assert a.claim("msg-1", 300) == DONE
+
+    def test_crashed_claim_and_old_outcome_expire(self, stores, clock):
+        a, b = stores
+        a.claim("msg-1", 300)  # worker dies mid-dial
+        clock.now += 301
+        assert b.claim("msg-1", 300) is None
+        b.complete("msg-1", 86400)
+        clock.now += 86401
+        assert a.claim("msg-1", 300) is None
+
+
+class TestMemoryStore:
+    def test_least_recently_used_ids_are_evicted(self):
+        store = MemoryIdempotencyStore(2)
+        for key in ("a", "b", "c"):
+            store.complete(key, 60)
+        assert len(store) == 2
+        assert store.claim("a", 60) is None
+        assert store.claim("c", 60) == DONE
+
+
+class TestBuild:
+    def test_memory_by_default(self):
+        assert isinstance(build_trigger_idempotency(make_config(), log), TriggerIdempotency)
+
+    def test_off(self):
+        assert build_trigger_idempotency(make_config(idempotency_backend="off"), log) is None
+
+    async def test_sqlite_runs_in_a_thread(self, tmp_path):
+        cfg = make_config(idempotency_backend="sqlite", idempotency_sqlite_path=str(tmp_path / "t.sqlite"))
+        guard = build_trigger_idempotency(cfg, log)
+        assert await guard.claim("msg-1") is None
+        await guard.complete("msg-1")
+        assert await guard.claim("msg-1") == DONE
+
+    def test_unknown_backend_fails_at_startup(self):
+        with pytest.raises(SystemExit):
+            build_trigger_idempotency(make_config(idempotency_backend="redis"), log)
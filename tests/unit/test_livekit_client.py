@@ -161,6 +161,89 @@ class TestDialFailureClassification:
         assert "failed to create SIP participant" in caplog.text
 
 
+class TestTrunkFailover:
+    """SIP 5xx / trunk auth on one trunk: the same dial moves to the next."""
+
+    @staticmethod
+    def install_sip_api(monkeypatch, errors):
+        """errors: trunk id -> exception (absent = answered); returns the trunks tried."""
+        tried = []
+
+        class FakeAPI:
+            def __init__(self, *a):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            @property
+            def sip(self):
+                class SipService:
+                    async def create_sip_participant(self, req):
+                        tried.append((req.sip_trunk_id, req.sip_number))
+                        if req.sip_trunk_id in errors:
+                            raise errors[req.sip_trunk_id]
+
+                return SipService()
+
+        monkeypatch.setattr(lk_module.api, "LiveKitAPI", FakeAPI)
+        return tried
+
+    @staticmethod
+    def profile():
+        from lk_ultravox_bridge.config import SipTrunk
+
+        return make_profile(sip_failover_trunks=(SipTrunk("ST_b", "+5511888880000"), SipTrunk("ST_c", "+5511999990000")))
+
+    @staticmethod
+    def sip_error(status):
+        return FakeSipError(status=500, message=f"INVITE failed: sip status: {status}: X",
+                            metadata={"sip_status_code": str(status)})
+
+    async def test_5xx_and_auth_fail_over_with_each_trunks_caller_id(self, monkeypatch, caplog):
+        from lk_ultravox_bridge.sip_trunks import TrunkHealth
+        from tests.conftest import make_config
+
+        tried = self.install_sip_api(monkeypatch, {"ST_test": self.sip_error(503), "ST_b": self.sip_error(403)})
+        health = TrunkHealth(make_config(), log)
+        with caplog.at_level(logging.WARNING):
+            carrier = await LiveKitSipDialer(log, trunk_health=health).dial_out("room-x", "+5511999998888",
+                                                                                self.profile())
+
+        assert carrier.trunk_id == "ST_c"
+
+        assert tried == [("ST_test", "+5511999990000"), ("ST_b", "+5511888880000"), ("ST_c", "+5511999990000")]
+        assert "trunk failover to=+5511999998888 room=room-x failedTrunk=ST_test sipStatus=503 nextTrunk=ST_b" in caplog.text
+        assert [t.trunk_id for t in health.order(self.profile())] == ["ST_c", "ST_test", "ST_b"]
+
+    async def test_callee_outcomes_do_not_fail_over(self, monkeypatch):
+        tried = self.install_sip_api(monkeypatch, {"ST_test": self.sip_error(486)})
+        with pytest.raises(CallNotAnsweredError) as info:
+            await LiveKitSipDialer(log).dial_out("room-x", "+5511999998888", self.profile())
+        assert [t for t, _ in tried] == ["ST_test"]
+        assert info.value.trunk.trunk_id == "ST_test"
+
+    async def test_last_trunk_failure_is_raised(self, monkeypatch):
+        self.install_sip_api(monkeypatch, {t: self.sip_error(502) for t in ("ST_test", "ST_b", "ST_c")})
+        with pytest.raises(FakeSipError):
+            await LiveKitSipDialer(log).dial_out("room-x", "+5511999998888", self.profile())
+
+    async def test_failover_trunks_are_paced(self, monkeypatch):
+        self.install_sip_api(monkeypatch, {"ST_test": self.sip_error(500)})
+        paced = []
+
+        class Limiter:
+            async def acquire(self, profile, trunk_id=None):
+                paced.append(trunk_id)
+                return 0.0
+
+        await LiveKitSipDialer(log, dial_limiter=Limiter()).dial_out("room-x", "+5511999998888", self.profile())
+        assert paced == ["ST_b"]  # the caller paces the first trunk
+
+
 class TestRoomTerminator:
     async def test_deletes_room_using_profile_credentials(self, monkeypatch):
         deleted = []
@@ -205,3 +288,89 @@ class TestRoomTerminator:
         with caplog.at_level(logging.WARNING):
             await LiveKitRoomTerminator(log).terminate("room-x", make_profile())
         assert "failed to delete room" in caplog.text
+
+
+class RecordingLiveKitAPI:
+    """Stands in for api.LiveKitAPI: records construction and closing."""
+
+    instances: list = []
+
+    def __init__(self, url, key, secret, *, session=None):
+        self.creds = (url, key, secret)
+        self.session = session
+        self.closed = False
+        self.deleted: list = []
+        RecordingLiveKitAPI.instances.append(self)
+
+    async def aclose(self):
+        self.closed = True
+
+    @property
+    def room(self):
+        api_self = self
+
+        class RoomService:
+            async def delete_room(self, req):
+                api_self.deleted.append(req.room)
+
+        return RoomService()
+
+
+class TestLiveKitApiPool:
+    """One long-lived client per profile instead of a new aiohttp session
+    (and TLS handshake) for every dial-out and room deletion."""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        from tests.conftest import make_config
+
+        RecordingLiveKitAPI.instances = []
+        monkeypatch.setattr(lk_module.api, "LiveKitAPI", RecordingLiveKitAPI)
+        return lk_module.LiveKitApiPool(make_config(livekit_api_max_connections=4), log)
+
+    async def test_client_is_created_lazily_once_per_profile(self, pool):
+        br = make_profile()
+        cl = make_profile(country_code="CL", prefix="+56", livekit_url="https://test-cl.livekit.cloud")
+        assert RecordingLiveKitAPI.instances == []  # nothing until first use
+
+        first = pool.get(br)
+        assert pool.get(br) is first
+        assert pool.get(cl) is not first
+        assert [c.creds[0] for c in RecordingLiveKitAPI.instances] == [
+            "https://test-br.livekit.cloud", "https://test-cl.livekit.cloud",
+        ]
+        assert first.session.connector.limit == 4  # per-profile connection cap
+        await pool.aclose()
+
+    async def test_aclose_closes_clients_and_their_sessions(self, pool):
+        client = pool.get(make_profile())
+        await pool.aclose()
+        assert client.closed
+        assert client.session.closed
+
+    async def test_terminator_reuses_the_pooled_client(self, pool):
+        profile = make_profile()
+        terminator = LiveKitRoomTerminator(log, pool)
+        await terminator.terminate("room-a", profile)
+        await terminator.terminate("room-b", profile)
+
+        (client,) = RecordingLiveKitAPI.instances
+        assert client.deleted == ["room-a", "room-b"]
+        assert not client.closed  # the pool, not the call, owns the client
+        await pool.aclose()
+
+    async def test_room_already_gone_counts_as_deleted(self, monkeypatch):
+        class NotFoundAPI(RecordingLiveKitAPI):
+            @property
+            def room(self):
+                class RoomService:
+                    async def delete_room(self, req):
+                        raise FakeSipError(status=404, code="not_found", message="room not found")
+
+                return RoomService()
+
+        monkeypatch.setattr(lk_module.api, "LiveKitAPI", NotFoundAPI)
+        from tests.conftest import make_config
+        pool = lk_module.LiveKitApiPool(make_config(), log)
+        await LiveKitRoomTerminator(log, pool).delete("room-x", make_profile())  # must not raise
+        await pool.aclose()
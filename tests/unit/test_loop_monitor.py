@@ -0,0 +1,103 @@
+"""Loop-lag sampling (heartbeat histogram/percentiles) and the blocking-call
+detector that logs the loop thread's stack while it is stuck."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from lk_ultravox_bridge.loop_monitor import BlockingCallDetector, LoopLagSampler, SampleWindow, percentile
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, QueueOfBodies, make_config, wait_until
+
+log = logging.getLogger("test")
+
+
+def blocking_json_parse():
+    # Stands in for synchronous work on the loop (a big json.loads, a boto3
+    # client build...): the detector must point at this function.
+    time.sleep(0.25)
+
+
+class TestLoopLagSampler:
+    def test_percentile_is_nearest_rank(self):
+        assert percentile([], 95) == 0.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 95) == 4.0
+
+    async def test_sampler_measures_a_blocked_loop(self):
+        sampler = LoopLagSampler(interval_s=0.01)
+        task = asyncio.create_task(sampler.run())
+        try:
+            await asyncio.sleep(0.02)
+            time.sleep(0.08)
+            await asyncio.sleep(0.03)
+        finally:
+            task.cancel()
+        assert sampler.window.percentile(100, 60) >= 0.05
+
+    def test_histogram_buckets_and_resets_per_heartbeat(self):
+        sampler = LoopLagSampler()
+        for lag_ms in (0.5, 0.8, 3, 30, 2000):
+            sampler.record(lag_ms / 1000.0)
+
+        fields = sampler.heartbeat_fields(60)
+        assert " loopLagP50Ms=3.0 " in fields
+        assert " loopLagPeakMs=2000.0 " in fields
+        assert "loopLagHist=1:2|5:1|10:0|20:0|50:1|100:0|250:0|1000:0|inf:1" in fields
+        assert sum(sampler.take_histogram()) == 0  # counted once
+
+    def test_window_capacity_only_grows_and_keeps_samples(self):
+        window = SampleWindow(maxlen=2)
+        window.add(0.001)
+        window.ensure_capacity(4)
+        window.ensure_capacity(3)
+        for _ in range(3):
+            window.add(0.002)
+        assert window.maxlen == 4
+        assert window.values(60) == [0.001, 0.002, 0.002, 0.002]
+
+    async def test_heartbeat_carries_loop_lag_fields_after_the_gauge(self, caplog):
+        sampler = LoopLagSampler()
+        sampler.record(0.002)
+        cfg = make_config(max_concurrent_calls=2)
+
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(
+                run_worker_loop(cfg, log, QueueOfBodies([]), BlockingProcessor(), loop_lag=sampler)
+            )
+            try:
+                await wait_until(lambda: "loopLagP99Ms=" in caplog.text)
+            finally:
+                loop_task.cancel()
+        assert "[HB] alive inFlight=0 max=2 loopLagP50Ms=2.0 loopLagP99Ms=2.0" in caplog.text
+
+
+class TestBlockingCallDetector:
+    async def test_logs_the_stack_of_the_blocking_callback(self, caplog):
+        detector = BlockingCallDetector(log, threshold_ms=50)
+        task = asyncio.create_task(detector.run())
+        try:
+            with caplog.at_level(logging.WARNING):
+                await asyncio.sleep(0.05)
+                blocking_json_parse()
+                await asyncio.sleep(0.1)  # let the watchdog see the recovery
+        finally:
+            task.cancel()
+
+        assert detector.stalls == 1
+        assert "[Loop] event loop blocked for >" in caplog.text
+        assert "blocking_json_parse" in caplog.text  # the culprit, from the stack
+        assert "[Loop] event loop stall ended blockedMs=" in caplog.text
+
+    async def test_healthy_loop_reports_nothing(self, caplog):
+        detector = BlockingCallDetector(log, threshold_ms=50)
+        task = asyncio.create_task(detector.run())
+        try:
+            with caplog.at_level(logging.WARNING):
+                await asyncio.sleep(0.2)
+        finally:
+            task.cancel()
+        assert detector.stalls == 0
+        assert "[Loop]" not in caplog.text
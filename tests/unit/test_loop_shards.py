@@ -0,0 +1,121 @@
+"""Loop shards: each call runs on one of K loops in their own threads, the
+SQS ack still runs on the main loop, and shutdown closes every shard's
+loop-bound clients on their own loop."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from types import SimpleNamespace
+
+from lk_ultravox_bridge.loop_shards import ShardedProcessor
+
+log = logging.getLogger("test")
+
+
+class ThreadRecordingProcessor:
+    def __init__(self, gate: threading.Event):
+        self.gate = gate
+        self.threads: list = []
+        self.active_rooms: set = set()
+
+    async def process_body(self, body, ack=None, receive_count=None):
+        self.threads.append(threading.get_ident())
+        self.active_rooms.add(f"call-{body}")
+        # Block this shard's loop thread (not the main loop) until released.
+        await asyncio.get_running_loop().run_in_executor(None, self.gate.wait)
+        if ack is not None:
+            await ack()
+        self.active_rooms.discard(f"call-{body}")
+
+    async def end_active_calls(self, reason):
+        self.ended = (reason, threading.get_ident())
+        return len(self.active_rooms)
+
+
+def make_factory(gate, stacks):
+    async def factory():
+        closed = []
+
+        async def aclose():
+            closed.append(threading.get_ident())
+
+        stack = SimpleNamespace(
+            processor=ThreadRecordingProcessor(gate),
+            reaper=SimpleNamespace(pending=1, failed=0),
+            aclose=aclose,
+            closed=closed,
+            loop_thread=threading.get_ident(),
+        )
+        stacks.append(stack)
+        return stack
+
+    return factory
+
+
+class TestShardedProcessor:
+    async def test_calls_spread_over_shard_threads_and_ack_on_the_main_loop(self):
+        gate = threading.Event()
+        stacks: list = []
+        sharded = await ShardedProcessor.start(log, 2, make_factory(gate, stacks))
+        main_thread = threading.get_ident()
+        acks = []
+
+        async def ack():
+            acks.append(threading.get_ident())
+
+        try:
+            calls = [asyncio.create_task(sharded.process_body(b, ack)) for b in ("m1", "m2")]
+            deadline = asyncio.get_running_loop().time() + 2
+            while sum(len(s.processor.threads) for s in stacks) < 2:
+                assert asyncio.get_running_loop().time() < deadline
+                await asyncio.sleep(0.01)
+
+            # Least-loaded placement: one call per shard, each on its own thread.
+            assert [len(s.processor.threads) for s in stacks] == [1, 1]
+            assert {s.processor.threads[0] for s in stacks} == {s.loop_thread for s in stacks}
+            assert main_thread not in {s.loop_thread for s in stacks}
+            assert sharded.active_rooms == {"call-m1", "call-m2"}
+            assert sharded.reapers.pending == 2
+
+            gate.set()
+            await asyncio.gather(*calls)
+            assert acks == [main_thread, main_thread]  # SQS delete stays on the main loop
+        finally:
+            await sharded.aclose()
+
+        # Each shard's clients were closed on that shard's own loop thread.
+        assert [s.closed for s in stacks] == [[s.loop_thread] for s in stacks]
+
+    async def test_cancelling_the_call_cancels_it_on_its_shard(self):
+        gate = threading.Event()
+        stacks: list = []
+        sharded = await ShardedProcessor.start(log, 1, make_factory(gate, stacks))
+        try:
+            call = asyncio.create_task(sharded.process_body("m1"))
+            await asyncio.sleep(0.05)
+            call.cancel()
+            try:
+                await call
+            except asyncio.CancelledError:
+                pass
+            gate.set()
+            await asyncio.sleep(0.05)
+            assert sharded._shards[0].in_flight == 0
+        finally:
+            await sharded.aclose()
+
+    async def test_shutdown_hangs_up_calls_on_every_shard_loop(self):
+        gate = threading.Event()
+        stacks: list = []
+        sharded = await ShardedProcessor.start(log, 2, make_factory(gate, stacks))
+        try:
+            calls = [asyncio.create_task(sharded.process_body(b)) for b in ("m1", "m2")]
+            while len(sharded.active_rooms) < 2:
+                await asyncio.sleep(0.01)
+            assert await sharded.end_active_calls("worker-shutdown") == 2
+            assert [s.processor.ended for s in stacks] == [("worker-shutdown", s.loop_thread) for s in stacks]
+            gate.set()
+            await asyncio.gather(*calls)
+        finally:
+            await sharded.aclose()
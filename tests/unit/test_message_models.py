@@ -16,36 +16,7 @@ from lk_ultravox_bridge.message_models import (
     TriggerCallMetadata,
 )
 
-
-def valid_payload(**overrides) -> dict:
-    """The canonical TRIGGER_CALL payload, as produced by the telephony backend."""
-    payload = {
-        "id": "msg-001",
-        "messageType": "TRIGGER_CALL",
-        "source": "campaign-engine",
-        "organizationId": "org-1",
-        "tenantId": "tenant-1",
-        "createdAt": "2026-07-13T12:00:00Z",
-        "metadata": {
-            "workflowId": "wf-1",
-            "campaignId": "cmp-1",
-            "customerId": "cust-1",
-            "userId": "user-1",
-            "telephonyProvider": "twilio",
-            "externalCustomerId": "ext-1",
-            "fullName": "Maria Silva",
-            "direction": "OUTBOUND",
-            "phoneNumbers": [{"number": "5511999998888", "order": 1}],
-            "subject": {
-                "prompt": {
-                    "text": "You are a collections agent.",
-                    "greetingMessage": "Olá!",
-                }
-            },
-        },
-    }
-    payload.update(overrides)
-    return payload
+from tests.conftest import valid_payload
 
 
 @pytest.fixture
@@ -155,6 +126,15 @@ class TestPhoneNumbers:
         msg = parser.parse(payload)
         assert msg.primary_phone_number() == "+5511000000001"
 
+    def test_ordered_numbers_for_fallback(self, parser):
+        payload = valid_payload()
+        payload["metadata"]["phoneNumbers"] = [
+            {"number": "5511000000002", "order": 2},
+            {"number": "5511000000001", "order": 1},
+            {"number": "5511000000001", "order": 3},  # same number listed twice
+        ]
+        assert parser.parse(payload).ordered_phone_numbers() == ["+5511000000001", "+5511000000002"]
+
     def test_primary_prefixes_plus(self, parser):
         assert parser.parse(valid_payload()).primary_phone_number() == "+5511999998888"
 
@@ -0,0 +1,43 @@
+"""Poison-message parking queue."""
+from __future__ import annotations
+
+import json
+import logging
+
+from lk_ultravox_bridge.poison import SqsPoisonQueue, build_poison_queue
+
+from tests.conftest import make_config
+
+log = logging.getLogger("test")
+
+
+class FakeSqs:
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def send_message(self, **kwargs):
+        if self.error:
+            raise self.error
+        self.sent.append(kwargs)
+
+
+class TestSqsPoisonQueue:
+    async def test_body_is_parked_unchanged_with_the_error(self):
+        sqs = FakeSqs()
+        error = json.JSONDecodeError("Expecting value", "{oops", 0)
+        assert await SqsPoisonQueue(sqs, "https://q/Parking", log).park("{oops", error)
+        [sent] = sqs.sent
+        assert sent["QueueUrl"] == "https://q/Parking" and sent["MessageBody"] == "{oops"
+        assert sent["MessageAttributes"]["errorType"]["StringValue"] == "JSONDecodeError"
+        assert sent["MessageAttributes"]["error"]["StringValue"].startswith("Expecting value")
+
+    async def test_send_failure_is_reported_not_raised(self):
+        queue = SqsPoisonQueue(FakeSqs(error=ConnectionError("sqs down")), "https://q/Parking", log)
+        assert not await queue.park("{}", ValueError())
+
+
+def test_off_unless_configured():
+    assert build_poison_queue(make_config(), FakeSqs(), log) is None
+    queue = build_poison_queue(make_config(poison_queue_name="TriggerCallParking"), FakeSqs(), log)
+    assert isinstance(queue, SqsPoisonQueue)
@@ -0,0 +1,142 @@
+"""Orphaned-room sweeper against a fake LiveKit room API: it must delete
+exactly the rooms a crashed worker left behind, and never a room that a
+live call (in this process or another replica) still owns."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+import lk_ultravox_bridge.config as config_module
+from lk_ultravox_bridge.room_sweeper import OrphanRoomSweeper
+
+from tests.conftest import make_config, make_profile
+
+log = logging.getLogger("test")
+
+NOW = 1_000_000.0
+
+
+class FakeRoomApi:
+    """In-memory LiveKit room service: rooms with creation times and participants."""
+
+    def __init__(self, rooms, *, delete_errors=None, gate=None):
+        # rooms: {name: (age_s, [participant identities])}
+        self.rooms = dict(rooms)
+        self.deleted: list = []
+        self.delete_errors = dict(delete_errors or {})
+        self.gate = gate
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def list_rooms(self, req):
+        return SimpleNamespace(rooms=[
+            SimpleNamespace(name=name, creation_time=int(NOW - age))
+            for name, (age, _) in self.rooms.items()
+        ])
+
+    async def list_participants(self, req):
+        _, identities = self.rooms[req.room]
+        return SimpleNamespace(participants=[SimpleNamespace(identity=i) for i in identities])
+
+    async def delete_room(self, req):
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            if req.room in self.delete_errors:
+                raise self.delete_errors[req.room]
+            self.deleted.append(req.room)
+            self.rooms.pop(req.room, None)
+        finally:
+            self.concurrent -= 1
+
+
+class FakePool:
+    def __init__(self, room_api):
+        self.client = SimpleNamespace(room=room_api)
+        self.requested: list = []
+
+    def get(self, profile):
+        self.requested.append(profile.country_code)
+        return self.client
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    import lk_ultravox_bridge.room_sweeper as sweeper_module
+    monkeypatch.setattr(sweeper_module.time, "time", lambda: NOW)
+
+
+def make_sweeper(room_api, live=(), **cfg_overrides) -> OrphanRoomSweeper:
+    return OrphanRoomSweeper(make_config(**cfg_overrides), log, FakePool(room_api), lambda: set(live))
+
+
+class TestFindOrphans:
+    async def test_selects_only_ownerless_gateway_rooms_past_the_grace_period(self, frozen_time):
+        room_api = FakeRoomApi({
+            "call-dead01": (600, ["sip-+5511999998888"]),          # crashed worker: SIP leg alone
+            "call-empty1": (600, []),                               # empty leftover
+            "call-live01": (600, ["lk-uv-bridge-abc123", "sip-+55"]),  # another replica's live call
+            "call-young1": (30, ["sip-+55"]),                       # may still be setting up
+            "call-mine01": (600, ["sip-+55"]),                      # this process's own call
+            "support-room": (600, []),                              # not ours at all
+        })
+        sweeper = make_sweeper(room_api, live={"call-mine01"}, orphan_room_min_age_s=120)
+
+        orphans = await sweeper.find_orphans(make_profile())
+
+        assert sorted(orphans) == ["call-dead01", "call-empty1"]
+
+
+class TestSweep:
+    async def test_deletes_orphans_with_bounded_concurrency(self, frozen_time):
+        gate = asyncio.Event()
+        room_api = FakeRoomApi({f"call-o{i}": (600, []) for i in range(5)}, gate=gate)
+        sweeper = make_sweeper(room_api, orphan_sweep_concurrency=2)
+
+        task = asyncio.create_task(sweeper.sweep([make_profile()]))
+        await asyncio.sleep(0.02)
+        assert room_api.concurrent == 2  # batch bounded, not 5 at once
+        gate.set()
+
+        assert await task == 5
+        assert room_api.max_concurrent == 2
+        assert sorted(room_api.deleted) == [f"call-o{i}" for i in range(5)]
+
+    async def test_failed_delete_is_left_for_the_next_sweep(self, frozen_time, caplog):
+        room_api = FakeRoomApi(
+            {"call-ok0001": (600, []), "call-bad001": (600, [])},
+            delete_errors={"call-bad001": ConnectionError("503")},
+        )
+        sweeper = make_sweeper(room_api)
+
+        with caplog.at_level(logging.WARNING):
+            assert await sweeper.sweep([make_profile()]) == 1
+        assert room_api.deleted == ["call-ok0001"]
+        assert "failed to delete orphan room=call-bad001" in caplog.text
+
+    async def test_listing_failure_is_not_fatal(self, frozen_time, caplog):
+        class BrokenApi(FakeRoomApi):
+            async def list_rooms(self, req):
+                raise ConnectionError("livekit unreachable")
+
+        sweeper = make_sweeper(BrokenApi({}))
+        with caplog.at_level(logging.WARNING):
+            assert await sweeper.sweep([make_profile()]) == 0
+        assert "sweep failed country=BR" in caplog.text
+
+    async def test_sweeps_each_configured_profile_once(self, frozen_time, monkeypatch):
+        br = make_profile()
+        cl = make_profile(country_code="CL", prefix="+56", provider="switch")
+        unconfigured = make_profile(country_code="AR", prefix="+54", livekit_url="")
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": br, "+56": cl, "+54": unconfigured})
+        room_api = FakeRoomApi({})
+        sweeper = make_sweeper(room_api)
+
+        await sweeper.sweep()
+
+        assert sweeper._api_pool.requested == ["BR", "CL"]  # AR has no credentials: skipped
@@ -0,0 +1,87 @@
+"""Trunk pools (member selection, in-flight counts) and per-trunk health."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from lk_ultravox_bridge import config as config_module
+from lk_ultravox_bridge.config import SipTrunk
+from lk_ultravox_bridge.sip_trunks import TrunkHealth, TrunkPool
+
+from tests.conftest import FakeClock, make_config, make_profile
+
+log = logging.getLogger("test")
+
+A, B, C = SipTrunk("ST_test", "+5511999990000"), SipTrunk("ST_b", "+5511888880000"), SipTrunk("ST_c", "+5511777770000")
+PROFILE = make_profile(sip_failover_trunks=(B, C))
+
+
+def test_failed_trunk_goes_last_until_its_cooldown_ends():
+    clock = FakeClock()
+    health = TrunkHealth(make_config(sip_trunk_cooldown_s=30), log, clock=clock)
+    assert health.order(PROFILE) == [A, B, C]
+
+    health.record_failure(A)
+    clock.now += 1
+    health.record_failure(B)
+    assert health.order(PROFILE) == [C, A, B]  # down trunks: soonest to recover first
+
+    clock.now += 30
+    assert health.order(PROFILE) == [A, B, C]
+
+
+def test_success_clears_the_mark(caplog):
+    health = TrunkHealth(make_config(), log)
+    health.record_failure(A)
+    with caplog.at_level(logging.INFO):
+        health.record_success(A)
+    assert health.order(PROFILE) == [A, B, C]
+    assert "trunk healthy again trunk=ST_test after failures=1" in caplog.text
+
+
+class TestTrunkPool:
+    P2, P3 = SipTrunk("ST_test", "+5511666660000"), SipTrunk("ST_d", "+5511555550000")
+
+    def pool_profile(self, strategy, **overrides):
+        return make_profile(sip_trunk_pool=(self.P2, self.P3), sip_pool_strategy=strategy, **overrides)
+
+    def test_round_robin_rotates_members_before_failover_trunks(self):
+        pool = TrunkPool(make_config(), log)
+        profile = self.pool_profile("round-robin", sip_failover_trunks=(B,))
+        assert [pool.order(profile) for _ in range(4)] == [
+            [A, self.P2, self.P3, B], [self.P2, self.P3, A, B], [self.P3, A, self.P2, B], [A, self.P2, self.P3, B]]
+
+    def test_least_in_flight_prefers_the_idle_member(self):
+        pool = TrunkPool(make_config(), log)
+        profile = self.pool_profile("least-in-flight")
+        pool.start("room-1", A)
+        pool.start("room-2", self.P2)
+        assert pool.order(profile)[0] == self.P3
+        pool.start("room-2", self.P3)  # failed over: the call moves members
+        assert (pool.in_flight(self.P2), pool.in_flight(self.P3)) == (0, 1)
+        pool.finish("room-1")
+        pool.finish("room-1")  # idempotent
+        assert pool.in_flight(A) == 0
+        assert pool.order(profile)[0] in (A, self.P2)
+
+    def test_answer_rate_weights_the_pick_by_caller_id(self):
+        draws = iter([0.0, 0.99])
+        pool = TrunkPool(make_config(), log, rng=lambda: next(draws))
+        for _ in range(10):
+            pool.record(A, answered=False)
+            pool.record(self.P3, answered=True)
+        profile = self.pool_profile("answer-rate")
+        assert pool.order(profile) == [A, self.P3, self.P2]  # low draw: first member, rest by rate
+        assert pool.order(profile)[0] == self.P3
+
+    def test_members_on_a_down_trunk_go_last(self):
+        pool = TrunkPool(make_config(), log)
+        pool.health.record_failure(A)
+        # Health is per trunk: P2 is a second caller id on A's trunk.
+        assert pool.order(self.pool_profile("round-robin")) == [self.P3, A, self.P2]
+
+    def test_unknown_strategy_fails_at_startup(self, monkeypatch):
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {"+55": self.pool_profile("random")})
+        with pytest.raises(SystemExit):
+            TrunkPool(make_config(), log)
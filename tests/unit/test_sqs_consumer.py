@@ -7,10 +7,13 @@ import boto3
 import pytest
 
 from lk_ultravox_bridge.sqs_consumer import (
+    SQS_MAX_VISIBILITY_S,
     SqsClientFactory,
     SqsLongPollConsumer,
     SqsMessage,
     SqsQueueResolver,
+    hand_back_delay_s,
+    receive_count,
 )
 
 from tests.conftest import make_config
@@ -75,12 +78,25 @@ class TestSqsQueueResolver:
         url = SqsQueueResolver(cfg, log).resolve_queue_url()
         assert url == "https://sqs.sa-east-1.amazonaws.com/111122223333/MyQueue"
 
+    def test_trigger_queues_default_to_the_single_queue(self):
+        cfg = make_config(aws_region="sa-east-1", aws_account_id="111122223333", sqs_queue_name="MyQueue")
+        assert SqsQueueResolver(cfg, log).resolve_trigger_queues() == [
+            ("MyQueue", "https://sqs.sa-east-1.amazonaws.com/111122223333/MyQueue", 1)]
+
+    def test_sqs_queues_overrides_the_queue_name(self):
+        cfg = make_config(aws_region="sa-east-1", aws_account_id="111122223333", sqs_queue_name="MyQueue",
+                          sqs_queues="Callbacks:4,Campaigns")
+        queues = SqsQueueResolver(cfg, log).resolve_trigger_queues()
+        assert [(name, weight) for name, _, weight in queues] == [("Callbacks", 4), ("Campaigns", 1)]
+        assert queues[0][1].endswith("/111122223333/Callbacks")
+
 
 class FakeSqsClient:
     def __init__(self, response=None):
         self.response = response or {}
         self.receive_calls = []
         self.delete_calls = []
+        self.visibility_calls = []
 
     def receive_message(self, **kwargs):
         self.receive_calls.append(kwargs)
@@ -89,6 +105,9 @@ class FakeSqsClient:
     def delete_message(self, **kwargs):
         self.delete_calls.append(kwargs)
 
+    def change_message_visibility(self, **kwargs):
+        self.visibility_calls.append(kwargs)
+
 
 class TestSqsLongPollConsumer:
     QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123/TestQueue"
@@ -130,3 +149,22 @@ class TestSqsLongPollConsumer:
         consumer = SqsLongPollConsumer(client, self.QUEUE_URL, log)
         consumer.delete("rh-42")
         assert client.delete_calls == [{"QueueUrl": self.QUEUE_URL, "ReceiptHandle": "rh-42"}]
+
+    def test_change_visibility_hands_the_message_back(self):
+        client = FakeSqsClient()
+        consumer = SqsLongPollConsumer(client, self.QUEUE_URL, log)
+        consumer.change_visibility("rh-42", 15)
+        assert client.visibility_calls == [
+            {"QueueUrl": self.QUEUE_URL, "ReceiptHandle": "rh-42", "VisibilityTimeout": 15},
+        ]
+
+
+class TestHandBack:
+    def test_receive_count_reads_the_attribute(self):
+        assert receive_count(SqsMessage("rh", "", {"ApproximateReceiveCount": "3"})) == 3
+        assert receive_count(SqsMessage("rh", "", {})) == 0
+        assert receive_count(SqsMessage("rh", "", {"ApproximateReceiveCount": "x"})) == 0
+
+    def test_delay_grows_with_receives_up_to_the_sqs_max(self):
+        assert [hand_back_delay_s(15, n) for n in (0, 1, 2, 3, 4)] == [15, 15, 60, 240, 960]
+        assert hand_back_delay_s(15, 50) == SQS_MAX_VISIBILITY_S
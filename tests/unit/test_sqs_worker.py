@@ -13,8 +13,16 @@ import lk_ultravox_bridge.sqs_worker as worker_module
 from lk_ultravox_bridge.sqs_consumer import SqsMessage
 from lk_ultravox_bridge.sqs_worker import TriggerCallProcessor, run_worker_loop
 
-from tests.conftest import make_config, make_profile
-from tests.unit.test_message_models import valid_payload
+from tests.conftest import (
+    BlockingProcessor,
+    QueueOfBodies,
+    RecordingPublisher,
+    make_config,
+    make_profile,
+    trigger,
+    valid_payload,
+    wait_until,
+)
 
 log = logging.getLogger("test")
 
@@ -27,7 +35,7 @@ EVENTS: list = []
 class FakeAgent:
     instances: list = []
 
-    def __init__(self, cfg, log, room_name, profile):
+    def __init__(self, cfg, log, room_name, profile, api_pool=None, reaper=None):
         self.room_name = room_name
         self.profile = profile
         self.log = log
@@ -56,6 +64,7 @@ class FakeUltravox:
     def __init__(self, error=None):
         self.error = error
         self.calls = []
+        self.discarded = []
 
     async def create_ws_call_join_url(self, *, system_prompt=None, voice=None, metadata=None,
                                       greeting_message=None, country_code=None, language_hint=None):
@@ -67,6 +76,9 @@ class FakeUltravox:
         from lk_ultravox_bridge.ultravox_client import UltravoxCall
         return UltravoxCall(join_url="wss://uv.test/join/xyz", call_id="uv-call-1")
 
+    async def discard(self, call):
+        self.discarded.append(call.call_id)
+
 
 class FakeDialer:
     def __init__(self, error=None, hang=False):
@@ -74,7 +86,7 @@ class FakeDialer:
         self.hang = hang  # simulate a phone that rings forever (never answered)
         self.dials = []
 
-    async def dial_out(self, room_name, to_number, profile):
+    async def dial_out(self, room_name, to_number, profile, trunks=None):
         self.dials.append((room_name, to_number, profile))
         if self.hang:
             await asyncio.sleep(3600)
@@ -191,6 +203,24 @@ class TestProcessBodyHappyPath:
         assert agent.log.extra["call_id"] == "msg-001"
         assert agent.log.extra["room"] == agent.room_name
 
+    async def test_room_is_registered_as_active_only_while_the_call_runs(self, processor):
+        # The orphan sweeper skips active rooms; a finished call must not
+        # shield its room forever.
+        seen = []
+
+        async def recording_run_bridge(agent_self, join_url, *, remote_track_timeout=None):
+            seen.append(set(processor.active_rooms))
+
+        processor_agent_run = FakeAgent.run_bridge
+        FakeAgent.run_bridge = recording_run_bridge
+        try:
+            await processor.process_body(json.dumps(valid_payload()))
+        finally:
+            FakeAgent.run_bridge = processor_agent_run
+
+        assert seen == [{FakeAgent.instances[0].room_name}]
+        assert processor.active_rooms == set()
+
     async def test_message_voice_id_overrides_profile_voice(self, processor):
         payload = valid_payload()
         payload["metadata"]["voiceId"] = "voice-from-message"
@@ -205,20 +235,357 @@ class TestProcessBodyHappyPath:
         assert processor._uv.calls[0]["language_hint"] == "es-CL"
         assert processor._dialer.dials[0][2] is processor.profiles["CL"]
 
+    async def test_trunk_pacing_wait_happens_before_ultravox_and_is_logged(self, processor, caplog):
+        order = []
+
+        class PacedLimiter:
+            async def acquire(self, profile, trunk_id=None):
+                order.append(("paced", trunk_id))
+                return 0.25
+
+        processor._dial_limiter = PacedLimiter()
+        create = processor._uv.create_ws_call_join_url
+
+        async def recording_create(**kwargs):
+            order.append("ultravox")
+            return await create(**kwargs)
+
+        processor._uv.create_ws_call_join_url = recording_create
+        with caplog.at_level(logging.INFO):
+            await processor.process_body(json.dumps(valid_payload()))
+        assert order == [("paced", "ST_test"), "ultravox"]
+        assert "dial paced id=msg-001" in caplog.text
+        assert "cpsWaitMs=250" in caplog.text
+
+
+class TestTrunkPool:
+    """Each dial starts on a member of the profile's trunk pool, counted in
+    flight until the call ends."""
+
+    class MemberDialer:
+        def __init__(self, pool, error=None):
+            self.pool = pool
+            self.error = error
+            self.started_on = []  # (member, its in-flight count while dialing)
+
+        async def dial_out(self, room_name, to_number, profile, trunks=None):
+            self.started_on.append((trunks[0], self.pool.in_flight(trunks[0])))
+            if self.error:
+                raise self.error
+            return trunks[0]
+
+    async def test_round_robin_over_members_and_in_flight_released(self, processor, monkeypatch):
+        from lk_ultravox_bridge.config import SipTrunk
+
+        b = SipTrunk("ST_test", "+5511888880000")
+        monkeypatch.setattr(config_module, "_PROFILE_MAP", {**config_module._PROFILE_MAP,
+                                                          "+55": make_profile(sip_trunk_pool=(b,))})
+        pool = processor._trunk_pool
+        processor._dialer = dialer = self.MemberDialer(pool)
+        for _ in range(3):
+            await processor.process_body(json.dumps(valid_payload()), AckRecorder())
+
+        a = SipTrunk("ST_test", "+5511999990000")
+        assert dialer.started_on == [(a, 1), (b, 1), (a, 1)]
+        assert pool.in_flight(a) == pool.in_flight(b) == 0
+
+    async def test_not_answered_feeds_the_caller_id_rate(self, processor):
+        from lk_ultravox_bridge.config import SipTrunk
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        processor._dialer = self.MemberDialer(processor._trunk_pool, CallNotAnsweredError("no-answer", 408))
+        await processor.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert processor._trunk_pool._caller_rates.rate("+5511999990000") < 0.5
+        assert processor._trunk_pool.in_flight(SipTrunk("ST_test", "+5511999990000")) == 0
+
+
+class TestCircuitBreakerOutcomes:
+    """Each upstream step reports its outcome to the breakers."""
+
+    class Recorder:
+        def __init__(self):
+            self.outcomes = []
+
+        def record(self, upstream, ok, profile=None):
+            self.outcomes.append((upstream, ok, profile.country_code if profile else None))
+
+    async def test_answered_call_reports_every_step_ok(self, processor):
+        processor._breakers = breakers = self.Recorder()
+        await processor.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert breakers.outcomes == [("livekit-rtc", True, "BR"), ("ultravox", True, None),
+                                     ("livekit-sip", True, "BR")]
+
+    async def test_ultravox_failure_is_not_blamed_on_the_dial(self, processor):
+        processor._breakers = breakers = self.Recorder()
+        processor._uv = FakeUltravox(error=ConnectionError("uv down"))
+        with pytest.raises(ConnectionError):
+            await processor.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert breakers.outcomes == [("livekit-rtc", True, "BR"), ("ultravox", False, None)]
+
+    async def test_not_answered_is_a_working_dial_but_a_hung_one_is_not(self, processor):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        processor._breakers = breakers = self.Recorder()
+        for reason in ("busy", "dial-timeout"):
+            processor._dialer = FakeDialer(error=CallNotAnsweredError(reason))
+            await processor.process_body(json.dumps(valid_payload(id=reason)), AckRecorder())
+        assert [o for o in breakers.outcomes if o[0] == "livekit-sip"] == [("livekit-sip", True, "BR"),
+                                                                          ("livekit-sip", False, "BR")]
+
+
+class TestPoisonMessages:
+    """A payload that fails validation is settled on its first delivery,
+    before any RTC/REST work, instead of being retried until the DLQ."""
+
+    class ParkingQueue:
+        def __init__(self, ok=True):
+            self.ok = ok
+            self.parked = []
+
+        async def park(self, body, error):
+            self.parked.append((body, type(error).__name__))
+            return self.ok
+
+    async def test_invalid_json_is_acked_without_an_event(self, processor, caplog):
+        ack = AckRecorder()
+        with caplog.at_level(logging.WARNING):
+            await processor.process_body("{not json", ack, receive_count=1)
+        assert ack.count == 1
+        assert EVENTS == ["ack"] and FakeAgent.instances == []
+        assert "[SQS] poison message acked errorType=JSONDecodeError receiveCount=1" in caplog.text
+
+    async def test_wrong_message_type_is_acked_with_sip_call_failed(self, processor):
+
+        pub = processor._events = RecordingPublisher()
+        ack = AckRecorder()
+        await processor.process_body(json.dumps(valid_payload(messageType="OTHER")), ack, receive_count=2)
+
+        assert ack.count == 1
+        assert processor._uv.calls == [] and FakeAgent.instances == []  # no side effect
+        [event] = pub.published
+        assert event["metadata"]["status"] == "SIP_CALL_FAILED"
+        assert event["metadata"]["callId"] == "msg-001"
+        detail = json.loads(event["metadata"]["metadataJson"])
+        assert detail["reason"] == "invalid-payload" and detail["attempt"] == 2
+        assert "messageType" in detail["error"]
+
+    async def test_missing_phone_number_goes_to_the_parking_queue(self, processor):
+        parking = processor._poison_queue = self.ParkingQueue()
+        body = json.dumps(valid_payload(metadata={**valid_payload()["metadata"], "phoneNumbers": []}))
+        ack = AckRecorder()
+        await processor.process_body(body, ack)
+        assert parking.parked == [(body, "ValueError")]
+        assert ack.count == 1 and EVENTS == ["ack"]
+
+    async def test_failed_park_leaves_the_message_in_the_queue(self, processor):
+        processor._poison_queue = self.ParkingQueue(ok=False)
+        ack = AckRecorder()
+        await processor.process_body("[]", ack)
+        assert ack.count == 0
+
+
+class TestPhoneFallback:
+    """PHONE_FALLBACK_REASONS: the contact's next number is dialed within the
+    same message, reusing the room (and a fresh-enough Ultravox call)."""
+
+    class ScriptedDialer(FakeDialer):
+        def __init__(self, outcomes):
+            super().__init__()
+            self.outcomes = outcomes  # number -> exception (absent = answers)
+
+        async def dial_out(self, room_name, to_number, profile, trunks=None):
+            self.dials.append((room_name, to_number, profile))
+            if to_number in self.outcomes:
+                raise self.outcomes[to_number]
+
+    @staticmethod
+    def contact(*numbers):
+        payload = valid_payload()
+        payload["metadata"]["phoneNumbers"] = [{"number": n, "order": i} for i, n in enumerate(numbers)]
+        return json.dumps(payload)
+
+    @pytest.fixture
+    def fallback(self, processor):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        processor._fallback_reasons = {"invalid-number", "unavailable"}
+        processor._dialer = self.ScriptedDialer({
+            "+5511000000001": CallNotAnsweredError("invalid-number", 404),
+            "+5511000000002": CallNotAnsweredError("unavailable", 480),
+            "+5511000000009": CallNotAnsweredError("busy", 486),
+        })
+        processor._events = RecordingPublisher()
+        return processor
+
+    async def test_next_number_answers_in_the_same_room(self, fallback):
+        ack = AckRecorder()
+        await fallback.process_body(self.contact("5511000000001", "5511000000002", "5511000000003"), ack)
+
+        rooms = {room for room, _, _ in fallback._dialer.dials}
+        assert [n for _, n, _ in fallback._dialer.dials] == ["+5511000000001", "+5511000000002", "+5511000000003"]
+        assert len(rooms) == 1 and len(FakeAgent.instances) == 1
+        assert len(fallback._uv.calls) == 1  # fast failures: Ultravox call reused
+        attempts = [e["metadata"] for e in fallback._events.published
+                    if e["metadata"]["status"] == "CALL_ATTEMPT_STARTED"]
+        assert [json.loads(a["metadataJson"]).get("fallbackReason") for a in attempts] == [
+            None, "invalid-number", "unavailable"]
+        assert ack.count == 1 and FakeAgent.instances[0].bridged_join_url
+
+    async def test_reason_not_listed_ends_the_walk(self, fallback):
+        ack = AckRecorder()
+        await fallback.process_body(self.contact("5511000000009", "5511000000003"), ack)
+        assert [n for _, n, _ in fallback._dialer.dials] == ["+5511000000009"]
+        assert fallback._events.published[-1]["metadata"]["status"] == "CALL_NOT_ANSWERED"
+        assert ack.count == 1
+
+    async def test_exhausted_list_reports_the_last_number(self, fallback):
+        await fallback.process_body(self.contact("5511000000001", "5511000000002"), AckRecorder())
+        last = fallback._events.published[-1]["metadata"]
+        detail = json.loads(last["metadataJson"])
+        assert last["status"] == "CALL_NOT_ANSWERED"
+        assert detail["toNumber"] == "+5511000000002" and detail["numbersDialed"] == 2
+
+    async def test_stale_ultravox_call_is_replaced_and_deleted(self, fallback, monkeypatch):
+        import httpx
+        import respx
+        from lk_ultravox_bridge.ultravox_client import UltravoxCallClient
+
+        monkeypatch.setattr(worker_module, "ULTRAVOX_CALL_REUSE_MAX_AGE_S", -1.0)
+        cfg = make_config()
+        created = iter(["uv-0", "uv-1"])
+        async with httpx.AsyncClient() as http:
+            fallback._uv = UltravoxCallClient(cfg, log, http)
+            with respx.mock:
+                posts = respx.post(cfg.ultravox_calls_url).mock(side_effect=lambda request: httpx.Response(
+                    201, json={"callId": next(created), "joinUrl": "wss://uv.test/join"}))
+                deleted = respx.delete(f"{cfg.ultravox_calls_url}/uv-0").mock(return_value=httpx.Response(204))
+                await fallback.process_body(self.contact("5511000000001", "5511000000003"), AckRecorder())
+        assert posts.call_count == 2
+        assert deleted.called  # the stale call does not wait out its joinTimeout
+
+    async def test_numbers_routed_to_another_country_are_skipped(self, fallback):
+        await fallback.process_body(self.contact("5511000000001", "56900000001"), AckRecorder())
+        assert [n for _, n, _ in fallback._dialer.dials] == ["+5511000000001"]
+
+    def test_off_by_default_and_unknown_reason_fails_at_startup(self):
+        assert worker_module.parse_fallback_reasons("") == set()
+        with pytest.raises(SystemExit):
+            worker_module.parse_fallback_reasons("invalid-number,voicemail")
+
+    def test_dial_timeout_is_not_a_fallback_reason(self):
+        with pytest.raises(ValueError, match="dial-timeout"):
+            worker_module.parse_fallback_reasons("unavailable,dial-timeout")
+
+
+class TestNegativeDialCache:
+    @pytest.fixture
+    def cached(self, processor):
+        from lk_ultravox_bridge.dial_outcomes import MemoryDialOutcomeStore, NegativeDialCache
+
+        cfg = make_config(negative_cache_ttls="invalid-number:3600")
+        processor._negative_cache = NegativeDialCache(cfg, MemoryDialOutcomeStore(100))
+        processor._events = RecordingPublisher()
+        return processor
+
+    async def test_known_dead_number_is_not_dialed_again(self, cached, caplog):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        cached._dialer = FakeDialer(error=CallNotAnsweredError("invalid-number", 404))
+        await cached.process_body(json.dumps(valid_payload()), AckRecorder())
+        ack = AckRecorder()
+        with caplog.at_level(logging.WARNING):
+            await cached.process_body(json.dumps(valid_payload()), ack)
+
+        assert len(cached._dialer.dials) == 1 and len(FakeAgent.instances) == 1
+        assert len(cached._uv.calls) == 1
+        last = cached._events.published[-1]["metadata"]
+        assert last["status"] == "CALL_NOT_ANSWERED"
+        assert json.loads(last["metadataJson"]) | {"room": None} == {
+            "room": None, "toNumber": "+5511999998888", "country": "BR", "provider": "twilio",
+            "reason": "invalid-number", "sipStatus": 404, "cached": True}
+        assert ack.count == 1
+        assert "known-unreachable number" in caplog.text
+
+    async def test_reasons_without_a_ttl_keep_dialing(self, cached):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        cached._dialer = FakeDialer(error=CallNotAnsweredError("no-answer", 408))
+        for _ in range(2):
+            await cached.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert len(cached._dialer.dials) == 2
+
+    async def test_fallback_skips_a_cached_number(self, cached):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        await cached._negative_cache.record("+5511000000001", CallNotAnsweredError("invalid-number", 404))
+        cached._fallback_reasons = {"invalid-number"}
+        await cached.process_body(TestPhoneFallback.contact("5511000000001", "5511000000002"), AckRecorder())
+
+        assert [n for _, n, _ in cached._dialer.dials] == ["+5511000000002"]
+        attempt = json.loads(cached._events.published[0]["metadata"]["metadataJson"])
+        assert attempt["fallbackFrom"] == "+5511000000001" and attempt["fallbackReason"] == "invalid-number"
+
+    async def test_cache_outage_dials_anyway(self, cached):
+        class Broken:
+            async def lookup(self, numbers):
+                raise OSError("disk full")
+
+            async def record(self, number, error):
+                raise OSError("disk full")
+
+        cached._negative_cache = Broken()
+        await cached.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert len(cached._dialer.dials) == 1
+
+
+class TestAnswerRateRanking:
+    @pytest.fixture
+    def ranked(self, processor):
+        from lk_ultravox_bridge.answer_rates import AnswerRates
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
+
+        processor._cfg = make_config(answer_rate_ranking=True)
+        processor._answer_rates = AnswerRates(processor._cfg)
+        processor._fallback_reasons = {"no-answer"}
+        processor._dialer = TestPhoneFallback.ScriptedDialer({"+5511000000001": CallNotAnsweredError("no-answer", 408)})
+        return processor
+
+    async def test_outcomes_feed_the_store_and_reorder_the_next_message(self, ranked, caplog):
+        body = TestPhoneFallback.contact("5511000000001", "5511000000002")
+        await ranked.process_body(body, AckRecorder())
+        assert [n for _, n, _ in ranked._dialer.dials] == ["+5511000000001", "+5511000000002"]
+
+        with caplog.at_level(logging.INFO):
+            await ranked.process_body(body, AckRecorder())
+        assert [n for _, n, _ in ranked._dialer.dials][2:] == ["+5511000000002"]
+        assert "numbers re-ranked by answer rate id=msg-001" in caplog.text
+
+    async def test_ranking_stays_on_the_country_the_budgets_charged(self, ranked):
+        # The worker loop charged this contact to BR (its primary): a better
+        # Chilean number must not move the dial to the CL route.
+        from lk_ultravox_bridge.country_budgets import CountryBudgets
+
+        ranked._answer_rates.record("+56912345678", answered=True)
+        ranked._answer_rates.record("+5511000000002", answered=True)
+        ranked._dialer = FakeDialer()
+        body = TestPhoneFallback.contact("5511000000001", "56912345678", "5511000000002")
+        await ranked.process_body(body, AckRecorder())
+        assert ranked._dialer.dials[0][1] == "+5511000000002"
+        assert ranked._dialer.dials[0][2] is CountryBudgets(ranked._cfg).route(body)
+
+    async def test_producer_order_without_ranking(self, ranked):
+        ranked._cfg = make_config()
+        ranked._answer_rates.record("+5511000000002", answered=True)
+        ranked._dialer = FakeDialer()
+        await ranked.process_body(TestPhoneFallback.contact("5511000000001", "5511000000002"), AckRecorder())
+        assert ranked._dialer.dials[0][1] == "+5511000000001"
+        assert ranked._answer_rates.rate("+5511000000001") > 0.5  # the answer was still recorded
+
 
 class TestProcessBodyErrorSemantics:
     """Before the dial is answered, raising == the message is retried (no ack).
     After answer, the message is acked first and failures only end this call."""
 
-    async def test_invalid_json_raises(self, processor):
-        with pytest.raises(json.JSONDecodeError):
-            await processor.process_body("{not json")
-
-    async def test_wrong_message_type_raises(self, processor):
-        with pytest.raises(ValueError, match="messageType"):
-            await processor.process_body(json.dumps(valid_payload(messageType="OTHER")))
-        assert processor._uv.calls == []  # rejected before any side effect
-
     async def test_ultravox_failure_raises_without_ack_and_tears_down(self, processor):
         processor._uv = FakeUltravox(error=ConnectionError("uv 500"))
         ack = AckRecorder()
@@ -229,6 +596,28 @@ class TestProcessBodyErrorSemantics:
         assert ack.count == 0  # message stays in the queue → retried
         assert FakeAgent.instances[0].torn_down  # room not leaked
 
+    async def test_pacing_backend_failure_is_a_system_error(self, processor):
+        # e.g. the shared CPS store is locked: the room must not be orphaned.
+
+        class BrokenLimiter:
+            async def acquire(self, profile, trunk_id=None):
+                raise OSError("database is locked")
+
+        processor._dial_limiter = BrokenLimiter()
+        pub = processor._events = RecordingPublisher()
+        ack = AckRecorder()
+
+        with pytest.raises(OSError, match="database is locked"):
+            await processor.process_body(json.dumps(valid_payload()), ack, receive_count=2)
+
+        assert ack.count == 0
+        assert FakeAgent.instances[0].torn_down
+        assert processor._uv.calls == []
+        [event] = pub.published
+        detail = json.loads(event["metadata"]["metadataJson"])
+        assert event["metadata"]["status"] == "SIP_CALL_FAILED"
+        assert detail["reason"] == "system-error" and detail["errorType"] == "OSError" and detail["attempt"] == 2
+
     async def test_dial_failure_raises_without_ack_and_tears_down(self, processor):
         # e.g. trunk 403: retryable — nobody's phone rang to completion.
         processor._dialer = FakeDialer(error=ConnectionError("trunk 403"))
@@ -309,47 +698,53 @@ class TestProcessBodyErrorSemantics:
         assert EVENTS == ["answered", "bridge"]
 
 
-class QueueOfBodies:
-    """Sync fake of SqsLongPollConsumer fed by a list of message bodies."""
-
-    def __init__(self, bodies):
-        self._pending = list(bodies)
-        self.deleted = []
-
-    def receive(self, max_messages, wait_seconds, visibility_timeout):
-        if self._pending:
-            body = self._pending.pop(0)
-            return [SqsMessage(receipt_handle=f"rh-{body}", body=body, attributes={})]
-        import time
-        time.sleep(0.005)  # idle long-poll: avoid a busy spin in the test loop
-        return []
-
-    def delete(self, receipt_handle):
-        self.deleted.append(receipt_handle)
+class TestProcessBodyIdempotency:
+    """A redelivery of a trigger whose outcome is final never dials again."""
 
+    @pytest.fixture
+    def deduped(self, processor):
+        from lk_ultravox_bridge.idempotency import MemoryIdempotencyStore, TriggerIdempotency
 
-class BlockingProcessor:
-    """Records started calls and holds each one until the test releases it."""
+        processor._idempotency = TriggerIdempotency(make_config(), MemoryIdempotencyStore(100))
+        return processor
 
-    def __init__(self):
-        self.started: list = []
-        self.release: dict = {}
+    async def test_redelivery_after_a_failed_ack_is_acked_and_skipped(self, deduped, caplog):
+        await deduped.process_body(json.dumps(valid_payload()), AckRecorder(error=ConnectionError("sqs down")))
+        ack = AckRecorder()
+        with caplog.at_level(logging.WARNING):
+            await deduped.process_body(json.dumps(valid_payload()), ack)
 
-    async def process_body(self, body, ack=None, receive_count=None):
-        evt = asyncio.Event()
-        self.release[body] = evt
-        self.started.append(body)
-        await evt.wait()
-        if ack is not None:
-            await ack()
+        assert ack.count == 1
+        assert len(FakeAgent.instances) == 1  # no RTC work for the duplicate
+        assert len(deduped._uv.calls) == 1 and len(deduped._dialer.dials) == 1
+        assert "duplicate TRIGGER_CALL skipped id=msg-001" in caplog.text
 
+    async def test_unanswered_outcome_is_final_too(self, deduped):
+        from lk_ultravox_bridge.livekit_client import CallNotAnsweredError
 
-async def wait_until(predicate, timeout=2.0):
-    deadline = asyncio.get_running_loop().time() + timeout
-    while not predicate():
-        if asyncio.get_running_loop().time() > deadline:
-            raise AssertionError("condition not met within timeout")
-        await asyncio.sleep(0.01)
+        deduped._dialer = FakeDialer(error=CallNotAnsweredError("busy", 486))
+        await deduped.process_body(json.dumps(valid_payload()), AckRecorder())
+        await deduped.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert len(deduped._dialer.dials) == 1
+
+    async def test_retryable_failure_lets_the_retry_dial(self, deduped):
+        deduped._uv = FakeUltravox(error=ConnectionError("uv 500"))
+        with pytest.raises(ConnectionError):
+            await deduped.process_body(json.dumps(valid_payload()), AckRecorder())
+        deduped._uv = FakeUltravox()
+        await deduped.process_body(json.dumps(valid_payload()), AckRecorder())
+        assert len(deduped._dialer.dials) == 1
+
+    async def test_delivery_of_a_trigger_being_dialed_is_left_in_the_queue(self, deduped):
+        deduped._dialer = FakeDialer(hang=True)
+        first = asyncio.create_task(deduped.process_body(json.dumps(valid_payload()), AckRecorder()))
+        await wait_until(lambda: deduped._dialer.dials)
+        ack = AckRecorder()
+        await deduped.process_body(json.dumps(valid_payload()), ack)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert ack.count == 0 and len(deduped._dialer.dials) == 1
 
 
 class TestRunWorkerLoopConcurrency:
@@ -474,3 +869,161 @@ class TestRunWorkerLoopConcurrency:
             await wait_until(lambda: consumer.deleted == ["rh-good"])
         finally:
             loop_task.cancel()
+
+    async def test_heartbeat_reports_teardown_reaper_gauges(self, caplog):
+        class StubReaper:
+            pending = 2
+            failed = 1
+
+        consumer = QueueOfBodies([])
+        cfg = make_config(max_concurrent_calls=3)
+
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(
+                run_worker_loop(cfg, log, consumer, BlockingProcessor(), reaper=StubReaper())
+            )
+            try:
+                await wait_until(lambda: "teardownPending=2 teardownFailed=1" in caplog.text)
+            finally:
+                loop_task.cancel()
+        assert "[HB] alive inFlight=0 max=3 teardownPending=2" in caplog.text
+
+
+class LongPollQueue(QueueOfBodies):
+    """Hands out its bodies, then blocks in a long poll until `unblock` is
+    set and returns one late message."""
+
+    def __init__(self, bodies):
+        super().__init__(bodies)
+        import threading
+        self.polling = threading.Event()
+        self.unblock = threading.Event()
+        self.returned = []
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        if self._pending:
+            return super().receive(max_messages, wait_seconds, visibility_timeout)
+        self.polling.set()
+        self.unblock.wait(5)
+        return [SqsMessage(receipt_handle="rh-late", body="late", attributes={})]
+
+    def change_visibility(self, receipt_handle, visibility_timeout):
+        self.returned.append((receipt_handle, visibility_timeout))
+
+
+class HangUpProcessor(BlockingProcessor):
+    """BlockingProcessor whose calls can be hung up by a worker shutdown."""
+
+    def __init__(self):
+        super().__init__()
+        self.ended_with = None
+
+    async def end_active_calls(self, reason):
+        self.ended_with = reason
+        for evt in self.release.values():
+            evt.set()
+        return len(self.release)
+
+
+class TestGracefulDrain:
+    async def test_stop_cancels_the_poll_and_waits_for_live_calls(self, caplog):
+        consumer = LongPollQueue(["m1"])
+        proc = HangUpProcessor()
+        stop = asyncio.Event()
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(run_worker_loop(make_config(max_concurrent_calls=2), log, consumer,
+                                                            proc, stop=stop))
+            try:
+                await wait_until(lambda: proc.started == ["m1"] and consumer.polling.is_set())
+                stop.set()
+                await asyncio.sleep(0.05)
+                assert not loop_task.done()  # m1 still talking
+                proc.release["m1"].set()
+                consumer.unblock.set()
+                await asyncio.wait_for(loop_task, 1)
+            finally:
+                consumer.unblock.set()
+                loop_task.cancel()
+
+        assert proc.ended_with is None
+        assert "draining: intake stopped inFlight=1" in caplog.text
+        # The abandoned long poll's message goes straight back to the queue.
+        assert consumer.returned == [("rh-late", 0)]
+        assert proc.started == ["m1"]
+
+    async def test_idle_worker_waits_out_the_poll_and_hands_its_message_back(self, caplog):
+        # Nothing in flight: the drain would otherwise return at once and the
+        # late message would stay invisible for the visibility timeout.
+        consumer = LongPollQueue([])
+        stop = asyncio.Event()
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(run_worker_loop(make_config(), log, consumer, BlockingProcessor(),
+                                                            stop=stop))
+            try:
+                await wait_until(consumer.polling.is_set)
+                stop.set()
+                await asyncio.sleep(0.05)
+                assert not loop_task.done()  # waiting for the poll
+                consumer.unblock.set()
+                await asyncio.wait_for(loop_task, 1)
+            finally:
+                consumer.unblock.set()
+                loop_task.cancel()
+
+        assert consumer.returned == [("rh-late", 0)]
+        assert "returning messages received during shutdown count=1" in caplog.text
+
+    async def test_calls_still_up_at_the_deadline_are_hung_up(self, caplog):
+        consumer = LongPollQueue(["m1", "m2"])
+        proc = HangUpProcessor()
+        stop = asyncio.Event()
+        cfg = make_config(max_concurrent_calls=2, shutdown_drain_timeout_s=0.05)
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, stop=stop))
+            try:
+                await wait_until(lambda: len(proc.started) == 2)
+                stop.set()
+                await asyncio.wait_for(loop_task, 1)
+            finally:
+                consumer.unblock.set()
+                loop_task.cancel()
+
+        assert proc.ended_with == "worker-shutdown"
+        assert "drain deadline reached; ending calls inFlight=2 answered=2 endReason=worker-shutdown" in caplog.text
+        assert "drain complete cancelled=0" in caplog.text
+
+    async def test_calls_that_do_not_end_are_cancelled_after_the_grace(self, monkeypatch, caplog):
+        monkeypatch.setattr(worker_module, "SHUTDOWN_END_GRACE_S", 0.01)
+        consumer = LongPollQueue(["m1"])
+        proc = BlockingProcessor()  # cannot hang up: still dialing
+        stop = asyncio.Event()
+        cfg = make_config(shutdown_drain_timeout_s=0.01)
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(run_worker_loop(cfg, log, consumer, proc, stop=stop))
+            try:
+                await wait_until(lambda: proc.started == ["m1"])
+                stop.set()
+                await asyncio.wait_for(loop_task, 1)
+            finally:
+                consumer.unblock.set()
+                loop_task.cancel()
+
+        assert "drain complete cancelled=1" in caplog.text
+        assert consumer.deleted == []  # unacked: redelivered to another worker
+
+    async def test_sigterm_sets_the_stop_event(self, caplog):
+        import os
+        import signal
+
+        loop = asyncio.get_running_loop()
+        stop = worker_module.install_shutdown_handlers(log)
+        try:
+            with caplog.at_level(logging.INFO):
+                os.kill(os.getpid(), signal.SIGTERM)
+                await asyncio.wait_for(stop.wait(), 1)
+                os.kill(os.getpid(), signal.SIGTERM)
+                await wait_until(lambda: "SIGTERM received while draining; ignored" in caplog.text)
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+        assert "SIGTERM received; stopping intake and draining calls" in caplog.text
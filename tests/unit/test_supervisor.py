@@ -0,0 +1,157 @@
+"""Multi-process supervisor: budget split, crash restarts that leave the
+other workers alone, and one node-level heartbeat from the children's."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+
+import pytest
+
+from lk_ultravox_bridge.budgets import split_budget
+from lk_ultravox_bridge.supervisor import (
+    RESTART_BACKOFF_S,
+    WorkerSupervisor,
+    aggregate_heartbeats,
+    child_overrides,
+)
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+
+from tests.conftest import BlockingProcessor, FakeClock, QueueOfBodies, make_config, wait_until
+
+log = logging.getLogger("test")
+
+
+class FakeProcess:
+    _next_pid = 100
+
+    def __init__(self, index, overrides):
+        FakeProcess._next_pid += 1
+        self.pid = FakeProcess._next_pid
+        self.index = index
+        self.overrides = overrides
+        self.alive = True
+        self.exitcode = None
+        self.terminated = False
+
+    def is_alive(self):
+        return self.alive
+
+    def crash(self, code=1):
+        self.alive = False
+        self.exitcode = code
+
+    def terminate(self):
+        self.terminated = True
+        self.crash(-15)
+
+    def join(self, timeout=None):
+        pass
+
+    def kill(self):
+        self.crash(-9)
+
+
+def make_supervisor(**cfg_overrides):
+    spawned = []
+
+    def spawn(index, overrides, heartbeats):
+        proc = FakeProcess(index, overrides)
+        spawned.append(proc)
+        return proc
+
+    clock = FakeClock()
+    sup = WorkerSupervisor(make_config(**cfg_overrides), log, spawn=spawn, heartbeats=queue.Queue(), clock=clock)
+    return sup, spawned, clock
+
+
+class TestBudget:
+    def test_split_is_near_equal_and_sums_to_the_total(self):
+        assert split_budget(10, 4) == [3, 3, 2, 2]
+        assert split_budget(4, 4) == [1, 1, 1, 1]
+
+    def test_only_the_first_child_sweeps_orphan_rooms(self):
+        cfg = make_config(max_concurrent_calls=8, orphan_sweep_interval_s=300.0)
+        overrides = child_overrides(cfg, 3)
+        assert [o["max_concurrent_calls"] for o in overrides] == [3, 3, 2]
+        assert [o["orphan_sweep_interval_s"] for o in overrides] == [300.0, 0.0, 0.0]
+        assert [o["sip_dial_rate_share"] for o in overrides] == [pytest.approx(1 / 3)] * 3
+
+    def test_never_more_processes_than_call_slots(self, caplog):
+        with caplog.at_level(logging.WARNING):
+            sup, _, _ = make_supervisor(worker_processes=4, max_concurrent_calls=2)
+        assert sup.processes == 2
+        assert "WORKER_PROCESSES=4 > MAX_CONCURRENT_CALLS=2" in caplog.text
+
+
+class TestRestarts:
+    def test_crashed_child_is_restarted_after_backoff_alone(self, caplog):
+        sup, spawned, clock = make_supervisor(worker_processes=3, max_concurrent_calls=6)
+        sup.start()
+        first, second, third = spawned
+
+        with caplog.at_level(logging.ERROR):
+            second.crash()
+            sup.check_children()
+        assert "worker 1 exited" in caplog.text
+        assert len(spawned) == 3  # not before the backoff
+
+        clock.now += RESTART_BACKOFF_S
+        sup.check_children()
+        assert len(spawned) == 4
+        assert spawned[3].index == 1
+        assert spawned[3].overrides == second.overrides  # same budget share
+        assert first.alive and third.alive  # siblings (and their calls) untouched
+        assert sup.restarts == 1
+
+    def test_stop_terminates_children_and_does_not_restart_them(self):
+        sup, spawned, clock = make_supervisor(worker_processes=2, max_concurrent_calls=2)
+        sup.start()
+        sup.stop()
+        assert all(p.terminated for p in spawned)
+        clock.now += RESTART_BACKOFF_S
+        sup.check_children()
+        sup.check_children()
+        assert len(spawned) == 2
+
+
+class TestNodeHeartbeat:
+    def test_counts_add_up_and_lag_reports_the_worst_child(self):
+        node = aggregate_heartbeats([
+            {"inFlight": 2, "max": 3, "teardownPending": 1, "teardownFailed": 0,
+             "loopLagP50Ms": 1.0, "loopLagP99Ms": 4.0, "loopLagPeakMs": 9.0, "loopLagHist": [5, 1, 0]},
+            {"inFlight": 1, "max": 3, "teardownPending": 0, "teardownFailed": 2,
+             "loopLagP50Ms": 2.0, "loopLagP99Ms": 30.0, "loopLagPeakMs": 60.0, "loopLagHist": [3, 0, 1]},
+        ])
+        assert node["inFlight"] == 3 and node["max"] == 6
+        assert node["teardownPending"] == 1 and node["teardownFailed"] == 2
+        assert node["loopLagP99Ms"] == 30.0
+        assert node["loopLagHist"] == [8, 1, 1]
+
+    def test_node_line_keeps_the_dashboard_fields(self, caplog):
+        sup, spawned, _ = make_supervisor(worker_processes=2, max_concurrent_calls=4)
+        sup.start()
+        sup._heartbeats.put((0, {"inFlight": 2, "max": 2, "teardownPending": 0, "teardownFailed": 0}))
+        sup._heartbeats.put((1, {"inFlight": 1, "max": 2, "teardownPending": 1, "teardownFailed": 0}))
+        sup.drain_heartbeats()
+        spawned[1].crash()
+
+        with caplog.at_level(logging.INFO):
+            sup.log_node_heartbeat()
+        assert ("[HB] alive inFlight=3 max=4 teardownPending=1 teardownFailed=0 workers=1/2"
+                in caplog.text)
+
+    async def test_supervised_child_reports_instead_of_logging_hb_alive(self, caplog):
+        beats = []
+        cfg = make_config(max_concurrent_calls=2)
+        with caplog.at_level(logging.INFO):
+            loop_task = asyncio.create_task(
+                run_worker_loop(cfg, log, QueueOfBodies([]), BlockingProcessor(), heartbeat_sink=beats.append)
+            )
+            try:
+                await wait_until(lambda: beats)
+            finally:
+                loop_task.cancel()
+        assert beats[0] == {"inFlight": 0, "max": 2, "callsBR": 0, "callsCL": 0, "countryReleased": 0}
+        assert "[HB] alive" not in caplog.text  # the supervisor owns that line
+        assert "[HB] worker inFlightNow=0 limit=2" in caplog.text
@@ -0,0 +1,125 @@
+"""Background teardown: a finished call must free its slot without waiting
+for RTC disconnect + DeleteRoom, and a failing deletion must be retried and
+counted (each one is a SIP leg that may still be billing)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.agent import BridgeAgent
+from lk_ultravox_bridge.livekit_client import LiveKitSession
+from lk_ultravox_bridge.teardown import RoomTeardownReaper
+
+from tests.conftest import FakeAudioSource, make_config, make_profile
+
+log = logging.getLogger("test")
+
+
+class FakeRoom:
+    def __init__(self):
+        self.disconnect_calls = 0
+
+    async def disconnect(self):
+        self.disconnect_calls += 1
+
+
+class ScriptedTerminator:
+    """delete() fails `failures` times, then succeeds; optionally blocks."""
+
+    def __init__(self, failures=0, gate=None):
+        self.failures = failures
+        self.gate = gate
+        self.attempts: list = []
+
+    async def delete(self, room_name, profile):
+        self.attempts.append(room_name)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("livekit api 503")
+
+
+def make_reaper(terminator, **cfg_overrides) -> RoomTeardownReaper:
+    reaper = RoomTeardownReaper(make_config(**cfg_overrides), log, retry_backoff_s=0.001)
+    reaper._terminator = terminator
+    return reaper
+
+
+def session_with(room) -> LiveKitSession:
+    return LiveKitSession(room=room, audio_source=FakeAudioSource(), local_track=None)
+
+
+class TestRoomTeardownReaper:
+    async def test_submit_returns_immediately_and_work_runs_in_background(self):
+        gate = asyncio.Event()
+        terminator = ScriptedTerminator(gate=gate)
+        reaper = make_reaper(terminator)
+        room = FakeRoom()
+
+        reaper.submit("room-a", make_profile(), session_with(room))
+        assert reaper.pending == 1  # queued, not awaited by the call
+
+        await asyncio.sleep(0.01)
+        assert room.disconnect_calls == 1
+        gate.set()
+        await reaper.drain(1.0)
+        assert terminator.attempts == ["room-a"]
+        assert reaper.pending == 0
+        assert reaper.failed == 0
+
+    async def test_failed_deletion_is_retried_until_it_succeeds(self):
+        terminator = ScriptedTerminator(failures=2)
+        reaper = make_reaper(terminator, teardown_max_attempts=3)
+
+        reaper.submit("room-a", make_profile(), None)
+        await reaper.drain(1.0)
+
+        assert terminator.attempts == ["room-a"] * 3
+        assert reaper.failed == 0
+
+    async def test_exhausted_retries_are_counted_and_logged(self, caplog):
+        terminator = ScriptedTerminator(failures=10)
+        reaper = make_reaper(terminator, teardown_max_attempts=2)
+
+        with caplog.at_level(logging.ERROR):
+            reaper.submit("room-a", make_profile(), None)
+            await reaper.drain(1.0)
+
+        assert terminator.attempts == ["room-a"] * 2
+        assert reaper.failed == 1
+        assert reaper.pending == 0
+        assert "room deletion failed room=room-a" in caplog.text
+
+    async def test_concurrency_is_bounded(self):
+        gate = asyncio.Event()
+        terminator = ScriptedTerminator(gate=gate)
+        reaper = make_reaper(terminator, teardown_max_concurrency=2)
+
+        for name in ("r1", "r2", "r3"):
+            reaper.submit(name, make_profile(), None)
+        await asyncio.sleep(0.02)
+        assert terminator.attempts == ["r1", "r2"]  # r3 waits for a free slot
+
+        gate.set()
+        await reaper.drain(1.0)
+        assert sorted(terminator.attempts) == ["r1", "r2", "r3"]
+
+
+class TestAgentHandOff:
+    async def test_teardown_with_reaper_hands_off_without_awaiting(self):
+        gate = asyncio.Event()
+        terminator = ScriptedTerminator(gate=gate)
+        reaper = make_reaper(terminator)
+        profile = make_profile()
+        agent = BridgeAgent(make_config(), log, "room-test", profile, reaper=reaper)
+        agent.session = session_with(FakeRoom())
+
+        await asyncio.wait_for(agent.teardown(), timeout=0.5)  # DeleteRoom still blocked
+        assert reaper.pending == 1
+
+        gate.set()
+        await reaper.drain(1.0)
+        assert terminator.attempts == ["room-test"]
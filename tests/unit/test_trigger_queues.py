@@ -0,0 +1,91 @@
+"""Weighted fair polling across several TRIGGER_CALL queues."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from lk_ultravox_bridge.sqs_worker import run_worker_loop
+from lk_ultravox_bridge.trigger_queues import (
+    TriggerQueue,
+    WeightedQueueScheduler,
+    format_queue_fields,
+    parse_queue_weights,
+)
+
+from tests.conftest import BlockingProcessor, QueueOfBodies, make_config, wait_until
+
+log = logging.getLogger("test")
+
+
+class TestParseQueueWeights:
+    def test_names_with_optional_weights(self):
+        assert parse_queue_weights("Callbacks:4, Campaigns") == [("Callbacks", 4), ("Campaigns", 1)]
+        assert parse_queue_weights("") == []
+
+    @pytest.mark.parametrize("spec", ["A:x", "A:0"])
+    def test_bad_weight_fails_at_startup(self, spec):
+        with pytest.raises(SystemExit):
+            parse_queue_weights(spec)
+
+
+def scheduler(**weights):
+    return WeightedQueueScheduler([TriggerQueue(name, consumer=None, weight=w) for name, w in weights.items()])
+
+
+def serve(sched, rounds, busy=None):
+    """Admit `rounds` calls, each from the first queue in order that has messages."""
+    served = []
+    for _ in range(rounds):
+        queue = next(q for q in sched.order() if busy is None or q.name in busy)
+        sched.admit(queue)
+        served.append(queue.name)
+    return served
+
+
+class TestWeightedQueueScheduler:
+    def test_backlogged_queues_share_slots_by_weight(self):
+        served = serve(scheduler(urgent=3, bulk=1), 40)
+        assert served.count("urgent") == 30 and served.count("bulk") == 10
+
+    def test_idle_queue_banks_no_credit(self):
+        sched = scheduler(urgent=1, bulk=1)
+        serve(sched, 20, busy={"bulk"})  # urgent empty for a long time
+        served = serve(sched, 10)
+        # Back to 1:1 right away, not ten urgent calls in a row.
+        assert served[:4] in (["urgent", "urgent", "bulk", "urgent"], ["urgent", "bulk", "urgent", "bulk"])
+        assert served.count("urgent") <= 6
+
+    def test_heartbeat_fields(self):
+        sched = scheduler(urgent=3, bulk=1)
+        sched.queues[0].received, sched.queues[0].calls = 12, 1
+        assert format_queue_fields(sched.heartbeat_gauges()) == " queueReceived=urgent:12|bulk:0 queueCalls=urgent:1|bulk:0"
+        assert format_queue_fields({"inFlight": 0}) == ""
+
+
+class TestWorkerLoopWithSeveralQueues:
+    async def test_slots_follow_the_weights_and_acks_go_to_the_source_queue(self, caplog):
+        urgent = QueueOfBodies([f"u{i}" for i in range(10)])
+        bulk = QueueOfBodies([f"b{i}" for i in range(10)])
+        queues = WeightedQueueScheduler([TriggerQueue("urgent", urgent, 3), TriggerQueue("bulk", bulk, 1)])
+
+        class AckingProcessor(BlockingProcessor):
+            async def process_body(self, body, ack=None, receive_count=None):
+                await ack()
+                await super().process_body(body, ack, receive_count)
+
+        proc = AckingProcessor()
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(run_worker_loop(make_config(max_concurrent_calls=8), log, None, proc,
+                                                       queues=queues))
+            try:
+                await wait_until(lambda: len(proc.started) == 8)
+            finally:
+                task.cancel()
+
+        assert sum(b.startswith("u") for b in proc.started) == 6
+        assert all(h.startswith("rh-u") for h in urgent.deleted)
+        assert all(h.startswith("rh-b") for h in bulk.deleted)
+        assert "received message queue=urgent" in caplog.text
+        assert "queueReceived=urgent:0|bulk:0 queueCalls=urgent:0|bulk:0" in caplog.text
@@ -2,6 +2,7 @@
 layer (respx) — no network, but the real request/response path runs."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 
@@ -182,3 +183,178 @@ class TestResponseHandling:
             )
             with pytest.raises(RuntimeError, match="joinUrl"):
                 await make_client().create_ws_call_join_url()
+
+
+class TestSharedHttpClient:
+    """The SQS worker shares one pooled AsyncClient across every call."""
+
+    async def test_shared_client_is_used_and_left_open(self, calls_api):
+        http = httpx.AsyncClient()
+        try:
+            client = UltravoxCallClient(make_config(), log, http)
+            await client.create_ws_call_join_url()
+            await client.create_ws_call_join_url()
+            assert calls_api.call_count == 2
+            assert not http.is_closed  # the worker owns its lifecycle, not the call
+        finally:
+            await http.aclose()
+
+    async def test_builder_applies_pool_limits(self):
+        from lk_ultravox_bridge.ultravox_client import build_ultravox_http_client
+
+        http = build_ultravox_http_client(
+            make_config(ultravox_http_max_connections=7, ultravox_http_keepalive_s=15.0), log,
+        )
+        try:
+            pool = http._transport._pool
+            assert pool._max_connections == 7
+            assert pool._keepalive_expiry == 15.0
+        finally:
+            await http.aclose()
+
+    async def test_http2_without_h2_falls_back_to_http1(self, monkeypatch, caplog):
+        import builtins
+        from lk_ultravox_bridge.ultravox_client import build_ultravox_http_client
+
+        real_import = builtins.__import__
+
+        def no_h2(name, *args, **kwargs):
+            if name == "h2":
+                raise ImportError("No module named 'h2'")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_h2)
+        with caplog.at_level(logging.WARNING):
+            http = build_ultravox_http_client(make_config(ultravox_http2=True), log)
+        try:
+            assert "h2 is not installed" in caplog.text
+            assert http._transport._pool._http2 is False
+        finally:
+            await http.aclose()
+
+
+class TestRetries:
+    async def test_gateway_errors_and_timeouts_are_retried(self, caplog):
+        with respx.mock:
+            route = respx.post(CALLS_URL).mock(side_effect=[
+                httpx.Response(503, json={"error": "unavailable"}),
+                httpx.ConnectTimeout("connect timed out"),
+                httpx.Response(201, json=OK_RESPONSE),
+            ])
+            with caplog.at_level(logging.WARNING):
+                call = await make_client(ultravox_retry_backoff_s=0).create_ws_call_join_url()
+        assert call.call_id == "call-123" and route.call_count == 3
+        assert "retrying call creation attempt=2/3 errorType=HTTPStatusError status=503" in caplog.text
+        assert "attempt=3/3 errorType=ConnectTimeout status=None" in caplog.text
+
+    async def test_retries_are_bounded(self):
+        with respx.mock:
+            route = respx.post(CALLS_URL).mock(return_value=httpx.Response(502))
+            with pytest.raises(httpx.HTTPStatusError):
+                await make_client(ultravox_retries=1, ultravox_retry_backoff_s=0).create_ws_call_join_url()
+        assert route.call_count == 2
+
+    async def test_final_statuses_are_not_retried(self):
+        with respx.mock:
+            route = respx.post(CALLS_URL).mock(return_value=httpx.Response(400, json={"error": "bad voice"}))
+            with pytest.raises(httpx.HTTPStatusError):
+                await make_client(ultravox_retry_backoff_s=0).create_ws_call_join_url()
+        assert route.call_count == 1
+
+    async def test_read_timeout_is_not_retried(self):
+        # The POST may have created a call whose id never came back.
+        with respx.mock:
+            route = respx.post(CALLS_URL).mock(side_effect=httpx.ReadTimeout("read timed out"))
+            with pytest.raises(httpx.ReadTimeout):
+                await make_client(ultravox_retry_backoff_s=0).create_ws_call_join_url()
+        assert route.call_count == 1
+
+    async def test_creation_has_one_overall_deadline(self, caplog):
+        with respx.mock:
+            route = respx.post(CALLS_URL).mock(return_value=httpx.Response(503))
+            with caplog.at_level(logging.WARNING), pytest.raises(asyncio.TimeoutError):
+                await make_client(ultravox_retries=100, ultravox_retry_backoff_s=0.02,
+                                  ultravox_create_budget_s=0.1).create_ws_call_join_url()
+        assert 1 < route.call_count < 100
+        assert "call creation out of budget budgetS=0" in caplog.text
+
+    async def test_call_created_after_the_deadline_is_deleted(self, caplog):
+        async def slow_create(request):
+            await asyncio.sleep(0.1)
+            return httpx.Response(201, json=OK_RESPONSE)
+
+        http = httpx.AsyncClient()
+        client = UltravoxCallClient(make_config(ultravox_create_budget_s=0.02), log, http)
+        try:
+            with respx.mock:
+                respx.post(CALLS_URL).mock(side_effect=slow_create)
+                deleted = respx.delete(f"{CALLS_URL}/call-123").mock(return_value=httpx.Response(204))
+                with caplog.at_level(logging.INFO):
+                    with pytest.raises(asyncio.TimeoutError):
+                        await client.create_ws_call_join_url()
+                    await asyncio.sleep(0.2)
+            assert deleted.called
+            assert "unused call discarded callId=call-123 status=204" in caplog.text
+        finally:
+            await http.aclose()
+
+    async def test_builder_uses_the_timeout_budget(self):
+        from lk_ultravox_bridge.ultravox_client import build_ultravox_http_client
+
+        http = build_ultravox_http_client(make_config(ultravox_connect_timeout_s=2, ultravox_read_timeout_s=7), log)
+        try:
+            assert (http.timeout.connect, http.timeout.read) == (2, 7)
+        finally:
+            await http.aclose()
+
+
+class TestHedging:
+    @staticmethod
+    def responder(delays):
+        """POST side effect: the n-th request answers after delays[n] with call-n."""
+        count = 0
+
+        async def respond(request):
+            nonlocal count
+            n, count = count, count + 1
+            await asyncio.sleep(delays[n])
+            return httpx.Response(201, json={"callId": f"call-{n}", "joinUrl": f"wss://uv.test/join/{n}"})
+
+        return respond
+
+    async def test_slow_first_request_is_hedged_and_the_loser_deleted(self, caplog):
+        http = httpx.AsyncClient()
+        client = UltravoxCallClient(make_config(ultravox_hedge=True, ultravox_hedge_min_delay_s=0.02), log, http)
+        try:
+            with respx.mock:
+                respx.post(CALLS_URL).mock(side_effect=self.responder([0.2, 0.0]))
+                deleted = respx.delete(f"{CALLS_URL}/call-0").mock(return_value=httpx.Response(204))
+                with caplog.at_level(logging.INFO):
+                    call = await client.create_ws_call_join_url()
+                    assert call.call_id == "call-1"
+                    await asyncio.sleep(0.3)
+            assert deleted.called
+            assert "hedging call creation delayMs=20" in caplog.text
+            assert "unused call discarded callId=call-0 status=204" in caplog.text
+        finally:
+            await http.aclose()
+
+    async def test_fast_request_is_not_hedged(self):
+        http = httpx.AsyncClient()
+        client = UltravoxCallClient(make_config(ultravox_hedge=True, ultravox_hedge_min_delay_s=0.5), log, http)
+        try:
+            with respx.mock:
+                route = respx.post(CALLS_URL).mock(side_effect=self.responder([0.0]))
+                await client.create_ws_call_join_url()
+            assert route.call_count == 1
+        finally:
+            await http.aclose()
+
+    def test_delay_follows_the_recent_p95(self):
+        client = make_client(ultravox_hedge_min_delay_s=0.1)
+        client._latencies.extend([0.2] * 19)
+        assert client.hedge_delay_s() == 0.1  # too few samples yet
+        client._latencies.extend([0.2] * 80 + [3.0] * 1)
+        assert client.hedge_delay_s() == 0.2
+        client._latencies.extend([3.0] * 10)
+        assert client.hedge_delay_s() == 3.0